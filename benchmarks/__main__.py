@@ -0,0 +1,68 @@
+"""
+    python -m benchmarks run [--scale small|full] [--repeat N] [--case NAME ...] [-o results.json]
+    python -m benchmarks compare baseline.json current.json [--threshold 0.10]
+
+`compare` exits with status 1 when any benchmark regressed.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.corpora import SCALES
+from benchmarks.suite import CASES, run_suite, compare
+
+
+def print_results(report: dict) -> None:
+    print(f"{'benchmark':<30}{'tokens/s':>13}{'nodes/s':>13}{'p50 us':>11}{'p99 us':>11}{'peak KiB':>10}")
+    for key, result in report["results"].items():
+        if "latency_us" not in result:
+            print(f"{key:<30}{'skipped: ' + str(len(result['errors'])) + ' errors':>58}")
+            continue
+        latency = result["latency_us"]
+        nodes = "-" if result["nodes_per_s"] is None else f"{result['nodes_per_s']:.0f}"
+        print(
+            f"{key:<30}{result['tokens_per_s']:>13.0f}{nodes:>13}"
+            f"{latency['p50']:>11.1f}{latency['p99']:>11.1f}{result['peak_kib']:>10.1f}"
+        )
+
+
+def main(argv=None) -> int:
+    args = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = args.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite and store results as JSON")
+    run.add_argument("--scale", choices=sorted(SCALES), default="small")
+    run.add_argument("--repeat", type=int, default=20, help="timed calls per text")
+    run.add_argument("--case", action="append", choices=sorted(CASES), help="only run these cases")
+    run.add_argument("-o", "--output", help="JSON file to write")
+
+    diff = commands.add_parser("compare", help="compare two stored runs")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+
+    options = args.parse_args(argv)
+
+    if options.command == "run":
+        report = run_suite(options.scale, options.repeat, options.case)
+        print_results(report)
+        if options.output:
+            with open(options.output, "w") as f:
+                json.dump(report, f, indent=2)
+        return 0
+
+    with open(options.baseline) as f:
+        baseline = json.load(f)
+    with open(options.current) as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current, options.threshold)
+    print(f"{'benchmark':<30}{'p50 ratio':>11}{'peak ratio':>12}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['benchmark']:<30}{row['latency_ratio']:>11.2f}{row['memory_ratio']:>12.2f}{flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
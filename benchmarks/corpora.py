@@ -0,0 +1,64 @@
+"""
+Generated benchmark inputs. Every generator draws from its own Random seeded
+with SEED, so a scale yields byte-identical corpora on every run and
+revision, and changing one generator leaves the other corpora as they were.
+"""
+import ast
+import random
+from pathlib import Path
+from typing import Dict, List
+
+SEED = 1729
+SCHEMA_TESTS = Path(__file__).resolve().parent.parent / "tests" / "test_schema_parser.py"
+
+OPERATORS = ["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!="]
+
+SCALES = {
+    "small": {"terms": 200, "depth": 50, "texts": 4},
+    "full": {"terms": 2000, "depth": 1000, "texts": 16},
+}
+
+
+def flat_chain(rng: random.Random, terms: int) -> str:
+    parts = [str(rng.randrange(1000))]
+    for _ in range(terms - 1):
+        parts += [rng.choice(OPERATORS), rng.choice((str(rng.randrange(1000)), f"col_{rng.randrange(50)}"))]
+    return " ".join(parts)
+
+
+def deep_parens(rng: random.Random, depth: int) -> str:
+    return "(" * depth + str(rng.randrange(1000)) + "".join(f" {rng.choice('+-*')} {rng.randrange(1, 1000)})" for _ in range(depth))
+
+
+def float_heavy(rng: random.Random, terms: int) -> str:
+    return " + ".join(f"{rng.uniform(0, 1e6):.6f}" for _ in range(terms))
+
+
+def ddl_scripts() -> List[str]:
+    """
+    The CREATE scripts of test_schema_parser.py. They scan but are not
+    expressions, so the suite only runs scanner cases on them.
+    """
+    module = ast.parse(SCHEMA_TESTS.read_text())
+    return [
+        node.value for node in ast.walk(module)
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and "CREATE" in node.value
+    ]
+
+
+# corpora of SQL statements rather than expressions
+STATEMENT_CORPORA = {"ddl"}
+
+
+def generate(scale: str = "small") -> Dict[str, List[str]]:
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale: {scale}")
+    size = SCALES[scale]
+
+    chain_rng, parens_rng, float_rng = (random.Random(SEED) for _ in range(3))
+    return {
+        "flat_chain": [flat_chain(chain_rng, size["terms"]) for _ in range(size["texts"])],
+        "deep_parens": [deep_parens(parens_rng, size["depth"]) for _ in range(size["texts"])],
+        "float_heavy": [float_heavy(float_rng, size["terms"]) for _ in range(size["texts"])],
+        "ddl": ddl_scripts(),
+    }
@@ -0,0 +1,34 @@
+"""
+Throughput of parallel.parse_many by worker count.
+
+    python -m benchmarks.parse_many [expressions]
+"""
+import os
+import sys
+import time
+
+from parallel import parse_many
+
+
+def corpus(size: int):
+    for i in range(size):
+        yield f"(price_{i % 17} * {i} + {i}.25) / 3 >= qty - {i % 11} == NOT archived"
+
+
+def main(size: int = 200_000) -> None:
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+
+    baseline = None
+    print(f"{'workers':>8}{'expr/s':>12}{'speedup':>10}")
+    for workers in counts:
+        started = time.perf_counter()
+        for _ in parse_many(corpus(size), workers=workers, chunksize=512):
+            pass
+        rate = size / (time.perf_counter() - started)
+        baseline = baseline or rate
+        print(f"{workers:>8}{rate:>12.0f}{rate / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,129 @@
+"""
+Per-token parse cost of the precedence-climbing engine against the
+five-level recursive descent chain it replaced.
+
+    python -m benchmarks.parser_engines
+"""
+import sys
+import timeit
+from typing import Callable, List, Tuple
+
+from cursor import Cursor
+from parser import parse_expression
+from scaner import Token, TokenType, Operators, scan
+from tree import TreeNode
+
+EQUALITY = (Operators.EQUAL, Operators.NOT_EQUAL)
+COMPARISON = (Operators.LESS, Operators.LESS_OR_EQUAL, Operators.GREATER, Operators.GREATER_OR_EQUAL)
+TERM = (Operators.PLUS, Operators.MINUS)
+FACTOR = (Operators.DIVIDE, Operators.MULTIPLY)
+UNARY = (Operators.NOT, Operators.MINUS)
+
+
+# Reference: the descent chain as it was, down to its own unary and primary,
+# with the early `return` inside each `while` removed and identifiers accepted
+# so both engines consume the same tokens.
+def match_any(cur: Cursor[Token], operators) -> bool:
+    if not cur.peek():
+        return False
+    for operator in operators:
+        if (t := cur.peek()) and t.value == operator:
+            cur.next()
+            return True
+    return False
+
+
+def descent_level(cur: Cursor[Token], operators, operand: Callable) -> TreeNode[Token]:
+    left = operand(cur)
+    while match_any(cur, operators=list(operators)):
+        node = TreeNode(cur.previous())
+        node.add(left)
+        node.add(operand(cur))
+        left = node
+    return left
+
+
+def descent_equality(cur):
+    return descent_level(cur, EQUALITY, descent_comparison)
+
+
+def descent_comparison(cur):
+    return descent_level(cur, COMPARISON, descent_term)
+
+
+def descent_term(cur):
+    return descent_level(cur, TERM, descent_factor)
+
+
+def descent_factor(cur):
+    return descent_level(cur, FACTOR, descent_unary)
+
+
+def descent_unary(cur):
+    if match_any(cur, operators=list(UNARY)):
+        unary = TreeNode(cur.previous())
+        unary.add(descent_unary(cur))
+        return unary
+    return descent_primary(cur)
+
+
+def descent_primary(cur):
+    t = cur.peek()
+    if t is None:
+        raise ValueError("Unexpected end of input")
+
+    if t.type == TokenType.LITERAL or t.type == TokenType.IDENTIFIER:
+        cur.next()
+        return TreeNode(cur.previous())
+
+    if t.type == TokenType.OPERATOR and t.value == Operators.LEFT_PAREN:
+        cur.next()
+        group = TreeNode(cur.previous())
+        group.add(descent_equality(cur))
+        cur.consume(Token.create(Operators.RIGHT_PAREN))
+        return group
+
+    raise ValueError(f"Unexpected token: {t}")
+
+
+CORPORA: List[Tuple[str, str]] = [
+    ("flat chain", " + ".join(str(i) for i in range(200))),
+    ("mixed", " == ".join(f"{i} * 2 + {i} / 3 <= {i} - 1" for i in range(40))),
+    ("unary", " * ".join(f"-{i}" for i in range(200))),
+]
+
+
+def count_calls(fn: Callable[[], object]) -> int:
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event == 'call':
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        fn()
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+def main(repeat: int = 200) -> None:
+    engines = [
+        ("descent", descent_equality),
+        ("pratt", parse_expression),
+    ]
+
+    print(f"{'corpus':<12}{'engine':<10}{'ns/token':>10}{'calls/token':>13}")
+    for name, text in CORPORA:
+        tokens = scan(text)
+        for engine_name, engine in engines:
+            run = lambda: engine(Cursor(tokens))
+            seconds = min(timeit.repeat(run, number=repeat, repeat=3)) / repeat
+            calls = count_calls(run)
+            print(f"{name:<12}{engine_name:<10}{seconds / len(tokens) * 1e9:>10.0f}{calls / len(tokens):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
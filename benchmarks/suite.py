@@ -0,0 +1,195 @@
+"""
+Scanner and parser benchmark suite over the generated corpora.
+
+Each case is timed once per call across every text of a corpus, so latency
+percentiles are per call. Texts a case can't handle (scan errors, recursion
+limits) are listed under `errors` instead of being timed. Statement corpora
+are not expressions, so only the SCAN_CASES run on them.
+"""
+import io
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.corpora import STATEMENT_CORPORA, generate
+from cursor import Cursor
+from parser import parse
+from scaner import scan
+from token_buffer import scan_buffer
+from tree import display, preorder
+
+Prepared = Callable[[], object]
+
+
+def prepare_scan(text: str) -> Prepared:
+    return lambda: scan(text)
+
+
+def prepare_scan_buffer(text: str) -> Prepared:
+    return lambda: scan_buffer(text)
+
+
+def prepare_parse(text: str) -> Prepared:
+    tokens = scan(text)
+    return lambda: parse(tokens)
+
+
+def prepare_parse_iterative(text: str) -> Prepared:
+    tokens = scan(text)
+    return lambda: parse(tokens, iterative=True)
+
+
+def prepare_cursor(text: str) -> Prepared:
+    tokens = scan(text)
+
+    def run():
+        cur = Cursor(tokens)
+        while cur.peek() is not None:
+            cur.next()
+
+    return run
+
+
+def prepare_display(text: str) -> Prepared:
+    tree = parse(scan(text), iterative=True)
+
+    def run():
+        with redirect_stdout(io.StringIO()):
+            display(tree)
+
+    return run
+
+
+CASES: Dict[str, Callable[[str], Prepared]] = {
+    "scan": prepare_scan,
+    "scan_buffer": prepare_scan_buffer,
+    "parse": prepare_parse,
+    "parse_iterative": prepare_parse_iterative,
+    "cursor": prepare_cursor,
+    "display": prepare_display,
+}
+
+
+# cases that need no expression parse, the only ones run on STATEMENT_CORPORA
+SCAN_CASES = {"scan", "scan_buffer", "cursor"}
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def measure(prepare: Callable[[str], Prepared], texts: List[str], repeat: int, expressions: bool = True) -> dict:
+    """
+    Times `prepare(text)()` over `texts`. Node rates are only reported for
+    `expressions`, texts the expression parser reads.
+    """
+    latencies: List[float] = []
+    errors: List[str] = []
+    tokens = nodes = 0
+    peak = 0
+
+    for text in texts:
+        try:
+            run = prepare(text)
+            run()
+            text_tokens = len(scan_buffer(text))
+            text_nodes = sum(1 for _ in preorder(parse(scan(text), iterative=True))) if expressions else 0
+        except (ValueError, RecursionError) as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            continue
+
+        tracemalloc.start()
+        run()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            run()
+            latencies.append(time.perf_counter_ns() - started)
+
+        tokens += text_tokens * repeat
+        nodes += text_nodes * repeat
+
+    result = {"calls": len(latencies), "errors": errors}
+    if not latencies:
+        return result
+
+    seconds = sum(latencies) / 1e9
+    ordered = sorted(latencies)
+    result.update({
+        "tokens_per_s": tokens / seconds,
+        "nodes_per_s": nodes / seconds if expressions else None,
+        "latency_us": {
+            "mean": statistics.fmean(ordered) / 1e3,
+            "p50": percentile(ordered, 0.50) / 1e3,
+            "p90": percentile(ordered, 0.90) / 1e3,
+            "p99": percentile(ordered, 0.99) / 1e3,
+        },
+        "peak_kib": peak / 1024,
+    })
+    return result
+
+
+def revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(scale: str = "small", repeat: int = 20, only: Optional[List[str]] = None) -> dict:
+    """
+    Runs every case on every corpus; results are keyed "case/corpus".
+    """
+    corpora = generate(scale)
+    results = {}
+    for case, prepare in CASES.items():
+        if only and case not in only:
+            continue
+        for corpus, texts in corpora.items():
+            expressions = corpus not in STATEMENT_CORPORA
+            if expressions or case in SCAN_CASES:
+                results[f"{case}/{corpus}"] = measure(prepare, texts, repeat, expressions)
+
+    return {
+        "meta": {
+            "revision": revision(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> List[dict]:
+    """
+    Per benchmark present in both runs: the p50 latency and peak memory
+    ratios, flagged as regressions when either grows by more than
+    `threshold`.
+    """
+    rows = []
+    for key, new in current["results"].items():
+        old = baseline["results"].get(key)
+        if not old or "latency_us" not in old or "latency_us" not in new:
+            continue
+
+        latency = new["latency_us"]["p50"] / old["latency_us"]["p50"]
+        memory = new["peak_kib"] / old["peak_kib"] if old["peak_kib"] else 1.0
+        rows.append({
+            "benchmark": key,
+            "latency_ratio": latency,
+            "memory_ratio": memory,
+            "regression": latency > 1 + threshold or memory > 1 + threshold,
+        })
+    return rows
@@ -0,0 +1,235 @@
+import mmap
+import struct
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+from parser import to_flat
+from scaner import Token, TokenType, Operators, Keywords
+from tree import FlatTree, TreeNode, NO_NODE
+
+# File layout (little endian):
+#
+#   header   MAGIC, version u16, reserved u16
+#   records  one per expression, back to back
+#   index    u64 offset of every record
+#   footer   index offset u64, record count u64, MAGIC
+#
+# Record: node count u32, root i32, payload size u32, then one NODE entry per
+# node followed by the payload area holding typed literal values.
+#
+# NODE: kind u8 (ExpressionType value), operator code u8 (position in
+# Operators, NO_OPERATOR otherwise), literal tag u8, pad, first child i32,
+# next sibling i32, payload offset u32.
+
+MAGIC = b'PAST'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHH')
+FOOTER = struct.Struct('<QQ4s')
+OFFSET = struct.Struct('<Q')
+RECORD = struct.Struct('<IiI')
+NODE = struct.Struct('<BBBxiiI')
+
+INT64 = struct.Struct('<q')
+FLOAT64 = struct.Struct('<d')
+LENGTH = struct.Struct('<I')
+
+OPERATORS = list(Operators)
+OPERATOR_CODES = {op: code for code, op in enumerate(OPERATORS)}
+NO_OPERATOR = 0xFF
+
+# literal tags
+NO_VALUE = 0
+INT = 1
+FLOAT = 2
+TRUE = 3
+FALSE = 4
+BIG_INT = 5
+IDENTIFIER = 6
+KEYWORD = 7
+STRING = 8
+
+INT64_RANGE = range(-(1 << 63), 1 << 63)
+
+
+def encode_payload(t: Token, payload: bytearray) -> Tuple[int, int]:
+    """
+    Appends the value of `t` to `payload`; returns (operator code, literal tag).
+    """
+    if t.type is TokenType.OPERATOR:
+        return OPERATOR_CODES[t.value], NO_VALUE
+
+    if t.type is TokenType.IDENTIFIER or t.type is TokenType.KEYWORD:
+        raw = (t.value if t.type is TokenType.IDENTIFIER else t.value.name).encode()
+        payload += LENGTH.pack(len(raw)) + raw
+        return NO_OPERATOR, IDENTIFIER if t.type is TokenType.IDENTIFIER else KEYWORD
+
+    value = t.value
+    if isinstance(value, str):
+        raw = value.encode()
+        payload += LENGTH.pack(len(raw)) + raw
+        return NO_OPERATOR, STRING
+    if isinstance(value, bool):
+        return NO_OPERATOR, TRUE if value else FALSE
+    if isinstance(value, float):
+        payload += FLOAT64.pack(value)
+        return NO_OPERATOR, FLOAT
+    if value in INT64_RANGE:
+        payload += INT64.pack(value)
+        return NO_OPERATOR, INT
+
+    raw = value.to_bytes((value.bit_length() + 8) // 8, 'little', signed=True)
+    payload += LENGTH.pack(len(raw)) + raw
+    return NO_OPERATOR, BIG_INT
+
+
+def decode_payload(buffer, offset: int, code: int, tag: int) -> Token:
+    if code != NO_OPERATOR:
+        return Token.create(OPERATORS[code])
+    if tag == INT:
+        return Token.create(INT64.unpack_from(buffer, offset)[0])
+    if tag == FLOAT:
+        return Token.create(FLOAT64.unpack_from(buffer, offset)[0])
+    if tag == TRUE or tag == FALSE:
+        return Token.create(tag == TRUE)
+
+    length, = LENGTH.unpack_from(buffer, offset)
+    raw = bytes(buffer[offset + LENGTH.size:offset + LENGTH.size + length])
+    if tag == BIG_INT:
+        return Token.create(int.from_bytes(raw, 'little', signed=True))
+    if tag == IDENTIFIER:
+        return Token.create(raw.decode())
+    if tag == KEYWORD:
+        return Token.create(Keywords[raw.decode()])
+    if tag == STRING:
+        return Token.from_literal(raw.decode())
+    raise ValueError(f"Unknown literal tag: {tag}")
+
+
+def encode_tree(tree: Union[TreeNode[Token], FlatTree[Token]]) -> bytes:
+    flat = to_flat(tree) if isinstance(tree, TreeNode) else tree
+
+    nodes = bytearray(NODE.size * len(flat))
+    payload = bytearray()
+    for i in range(len(flat)):
+        offset = len(payload)
+        code, tag = encode_payload(flat.value(i), payload)
+        NODE.pack_into(nodes, i * NODE.size, flat.kinds[i], code, tag, flat.first_child[i], flat.next_sibling[i], offset)
+
+    return RECORD.pack(len(flat), flat.root, len(payload)) + nodes + payload
+
+
+def decode_tree(buffer, offset: int = 0) -> FlatTree[Token]:
+    """
+    Decodes the record at `offset` into a FlatTree whose data holds one token
+    per node. Only this record is read.
+    """
+    count, root, _ = RECORD.unpack_from(buffer, offset)
+    nodes_offset = offset + RECORD.size
+    payload_offset = nodes_offset + count * NODE.size
+
+    data: List[Token] = []
+    tree = FlatTree(data)
+    for i in range(count):
+        kind, code, tag, first_child, next_sibling, value_offset = NODE.unpack_from(buffer, nodes_offset + i * NODE.size)
+        tree.add(kind, i)
+        tree.first_child[i] = first_child
+        tree.next_sibling[i] = next_sibling
+        data.append(decode_payload(buffer, payload_offset + value_offset, code, tag))
+
+    tree.root = root if count else NO_NODE
+    return tree
+
+
+class ASTWriter:
+    """
+    Streams encoded trees to a file; the index and footer are written on close.
+    """
+
+    def __init__(self, path: str):
+        self.file: BinaryIO = open(path, 'wb')
+        self.offsets: List[int] = []
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0))
+
+    def write(self, tree: Union[TreeNode[Token], FlatTree[Token]]) -> int:
+        self.offsets.append(self.file.tell())
+        self.file.write(encode_tree(tree))
+        return len(self.offsets) - 1
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        for offset in self.offsets:
+            self.file.write(OFFSET.pack(offset))
+        self.file.write(FOOTER.pack(index_offset, len(self.offsets), MAGIC))
+        self.file.close()
+
+    def __enter__(self) -> 'ASTWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ASTReader:
+    """
+    Memory-maps a file written by ASTWriter. Opening reads only the header and
+    footer; each lookup decodes just the requested record.
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            self.file.close()
+            raise ValueError(f"Not a parsed AST file: {path}")
+
+        if len(self.buffer) < HEADER.size + FOOTER.size:
+            self.close()
+            raise ValueError(f"Not a parsed AST file: {path}")
+
+        magic, version, _ = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a parsed AST file: {path}")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported AST file version: {version}")
+
+        self.index_offset, self.count, magic = FOOTER.unpack_from(self.buffer, len(self.buffer) - FOOTER.size)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Truncated AST file: {path}")
+
+    def offset(self, index: int) -> int:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("record index out of range")
+        return OFFSET.unpack_from(self.buffer, self.index_offset + index * OFFSET.size)[0]
+
+    def flat(self, index: int) -> FlatTree[Token]:
+        return decode_tree(self.buffer, self.offset(index))
+
+    def __getitem__(self, index: int) -> TreeNode[Token]:
+        return self.flat(index).to_node()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[TreeNode[Token]]:
+        for i in range(self.count):
+            yield self[i]
+
+    def close(self) -> None:
+        if not self.buffer.closed:
+            self.buffer.close()
+        self.file.close()
+
+    def __enter__(self) -> 'ASTReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,26 +1,152 @@
-import re
+"""
+Extracts the Function/Format/Syntax Rules/... sections of ISO 9075-2 chapters
+into ./docs/parsed/<topic>/<subtopic>/<section> files.
+
+    python bnf_spec_extract.py docs/sqlFoundation.pdf --chapter 11 [--chapter 5 ...]
+
+Pages are extracted in a process pool and their text lines cached under
+--cache-dir keyed by a hash of the page's content streams, so a rerun only
+extracts pages that changed. Section files are written as soon as the
+section ends instead of after the whole chapter.
+
+pdfplumber (and the pdfminer it builds on) is imported only where a PDF is
+read, so the module and its section writer work without it.
+"""
+import argparse
+import hashlib
+import json
 import os
-from typing import List
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+CHAPTERS = {
+    "5": range(154, 184),
+    "6": range(184, 317),
+    "7": range(316, 396),
+    "11": range(542, 753),
+}
+
+SUBTOPICS = ["Function", "Format", "Syntax Rules", 'Access Rules', 'General Rules', 'Conformance Rules']
 
-import pdfplumber
+# bump when the extraction itself changes so cached pages are redone
+EXTRACTOR_VERSION = 1
 
-pdf = pdfplumber.open("./docs/sqlFoundation.pdf")
+PageLines = Tuple[int, List[str]]
 
-chapter_5 = slice(154, 184)
-chapter_6 = slice(184, 317)
-chapter_7 = slice(316, 396)
-chapter_11 = slice(542, 753)
 
+def page_key(page) -> str:
+    from pdfminer.pdftypes import resolve1
 
+    digest = hashlib.sha256(f"{EXTRACTOR_VERSION}".encode())
+    contents = page.page_obj.contents or []
+    for stream in contents:
+        digest.update(resolve1(stream).get_data())
+    return digest.hexdigest()
 
-chapter_lines: List[str] = []
-for page in pdf.pages[chapter_11]:
-    chapter_lines.extend(x.get("text") for x in page.extract_text_lines(return_chars=False))
-    print(page.extract_text())
 
+class PageCache:
+    """
+    One JSON file of text lines per page content hash.
+    """
 
+    def __init__(self, directory: Optional[str]):
+        self.directory = directory
 
-def clean_header(lines: List[str]) -> List[str]:
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[str]]:
+        if not self.directory:
+            return None
+        try:
+            with open(self.path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, lines: List[str]) -> None:
+        if not self.directory:
+            return
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", 'w') as f:
+            json.dump(lines, f)
+        os.replace(path + ".tmp", path)
+
+
+def extract_pages(pdf_path: str, numbers: List[int]) -> List[PageLines]:
+    """
+    Worker entry point: opens the PDF once per chunk of pages.
+    """
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return [
+            (number, [line.get("text") for line in pdf.pages[number].extract_text_lines(return_chars=False)])
+            for number in numbers
+        ]
+
+
+def page_keys(pdf_path: str, pages: List[int]) -> Dict[int, str]:
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return {number: page_key(pdf.pages[number]) for number in pages}
+
+
+def chunked(numbers: List[int], chunksize: int) -> Iterator[List[int]]:
+    for start in range(0, len(numbers), chunksize):
+        yield numbers[start:start + chunksize]
+
+
+def page_lines(
+        pdf_path: str,
+        pages: Iterable[int],
+        cache: PageCache,
+        workers: int = 1,
+        chunksize: int = 8
+) -> Iterator[str]:
+    """
+    Text lines of `pages` in page order. Cached pages are yielded right
+    away; the rest are extracted in chunks across `workers` processes and
+    yielded as soon as every page before them is available.
+    """
+    pages = list(pages)
+    keys = page_keys(pdf_path, pages)
+
+    lines: Dict[int, List[str]] = {}
+    for number in pages:
+        if (cached := cache.get(keys[number])) is not None:
+            lines[number] = cached
+    missing = [number for number in pages if number not in lines]
+
+    def store(results: List[PageLines]) -> None:
+        for number, extracted in results:
+            cache.put(keys[number], extracted)
+            lines[number] = extracted
+
+    if workers == 1 or len(missing) <= chunksize:
+        for number in pages:
+            if number not in lines:
+                store(extract_pages(pdf_path, [number]))
+            yield from lines.pop(number)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for chunk in chunked(missing, chunksize):
+            future = executor.submit(extract_pages, pdf_path, chunk)
+            for number in chunk:
+                pending[number] = future
+
+        for number in pages:
+            if number not in lines:
+                store(pending[number].result())
+            yield from lines.pop(number)
+
+
+def clean_header(lines: Iterable[str]) -> Iterator[str]:
     skip_next = False
     for x in lines:
         if skip_next:
@@ -36,48 +162,72 @@ def clean_header(lines: List[str]) -> List[str]:
 
         yield x
 
-def is_topic(x: str) -> bool:
-    return bool(re.match(r'^(11(?!\)).*?)(?:\.\d+)*.*', x))
-
-
-chapter = {}
-subtopics = ["Function", "Format", "Syntax Rules", 'Access Rules', 'General Rules', 'Conformance Rules']
 
-chapter_lines = list(clean_header(chapter_lines))
-current_topic = "NOT FOUND TOPIC"
-current_subtopic = "NOT FOUND SUBTOPIC"
-
-for line in chapter_lines:
-    if is_topic(line):
-        chapter[line] = {}
-        current_topic = line
-    elif line in subtopics:
-        try:
-            current_subtopic = line
-            chapter[current_topic][current_subtopic] = []
-        except Exception as e:
-            print(str(e))
-    else:
-        try:
-            chapter[current_topic][current_subtopic].append(line)
-        except Exception as e:
-            pass
-
-
-pdf.close()
-main_topic = "NOT FOUND"
-for topic, subtopics in chapter.items():
-    if not subtopics:
-        print(f"Create topic dir {topic}")
-        main_topic = topic
-        os.makedirs(f"./docs/parsed/{topic}", exist_ok=True)
-        continue
-
-    dir = f"./docs/parsed/{main_topic}/{topic}"
-
-    os.makedirs(dir, exist_ok=True)
-    for subtopic in subtopics:
-        if not subtopics[subtopic] or subtopics[subtopic][0] == "None.":
-            continue
-        with open(dir + "/" + subtopic, 'w+') as f:
-            f.writelines('\n'.join(subtopics[subtopic]))
+def topic_pattern(chapter: str) -> re.Pattern:
+    return re.compile(rf'^({re.escape(chapter)}(?!\)).*?)(?:\.\d+)*.*')
+
+
+def write_topics(lines: Iterable[str], chapter: str, output: str) -> Iterator[str]:
+    """
+    Writes each section as soon as the next topic or section starts and
+    yields the paths written. Topics without sections become directories
+    for the topics that follow them.
+    """
+    is_topic = topic_pattern(chapter).match
+    main_topic = "NOT FOUND"
+    topic: Optional[str] = None
+    topic_has_sections = False
+    subtopic: Optional[str] = None
+    content: List[str] = []
+
+    def flush() -> Iterator[str]:
+        if topic is None or subtopic is None or not content or content[0] == "None.":
+            return
+        directory = os.path.join(output, main_topic, topic)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, subtopic)
+        with open(path, 'w') as f:
+            f.write('\n'.join(content))
+        yield path
+
+    for line in clean_header(lines):
+        if is_topic(line):
+            yield from flush()
+            if topic is not None and not topic_has_sections:
+                main_topic = topic
+                os.makedirs(os.path.join(output, main_topic), exist_ok=True)
+            topic, topic_has_sections = line, False
+            subtopic, content = None, []
+        elif line in SUBTOPICS and topic is not None:
+            yield from flush()
+            subtopic, content = line, []
+            topic_has_sections = True
+        elif subtopic is not None:
+            content.append(line)
+
+    yield from flush()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = argparse.ArgumentParser(description="Extract ISO 9075-2 chapter sections from the standard's PDF")
+    args.add_argument("pdf", nargs="?", default="./docs/sqlFoundation.pdf")
+    args.add_argument("--chapter", action="append", choices=sorted(CHAPTERS, key=int),
+                      help="chapter to extract, repeatable (default: 11)")
+    args.add_argument("--output", default="./docs/parsed")
+    args.add_argument("--cache-dir", default="./docs/.page_cache", help="empty string disables the cache")
+    args.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    args.add_argument("--chunksize", type=int, default=8, help="pages per worker task")
+    args.add_argument("--quiet", action="store_true")
+    options = args.parse_args(argv)
+
+    cache = PageCache(options.cache_dir or None)
+    workers = options.workers or os.cpu_count() or 1
+    for chapter in options.chapter or ["11"]:
+        lines = page_lines(options.pdf, CHAPTERS[chapter], cache, workers, options.chunksize)
+        for path in write_topics(lines, chapter, options.output):
+            if not options.quiet:
+                print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import mmap
+import re
+import time
+from array import array
+from typing import List, Optional, Tuple, Union
+
+from diagnostics import Diagnostic
+from instrumentation import HOOKS, SCAN, CallStats, emit
+from scaner import OPERATOR_TOKENS
+from token_buffer import TokenBuffer, OPERATOR_CODES, INT_KIND, FLOAT_KIND, STRING_KIND, word_kind
+
+Source = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# TOKEN_PATTERN over UTF-8 bytes. Words and numbers are ASCII, string literals
+# are decoded only when their token is; an unknown character is taken whole so
+# its error shows the character, not one byte.
+BYTE_TOKEN_PATTERN = re.compile(
+    rb"(?P<NUMBER>\d[\d.]*)"
+    rb"|(?P<WORD>[A-Za-z][A-Za-z0-9_]*)"
+    rb"|(?P<STRING>'[^']*(?:''[^']*)*'?)"
+    rb"|(?P<OPERATOR>" + b'|'.join(
+        re.escape(op.encode()) for op in sorted(OPERATOR_TOKENS, key=len, reverse=True)
+    ) + rb")"
+    rb"|(?P<SPACE>\s+)"
+    rb"|(?P<UNKNOWN>[\xc0-\xff][\x80-\xbf]*|.)",
+    re.DOTALL
+)
+
+OPERATOR_BYTE_CODES = {op.encode(): code for op, code in OPERATOR_CODES.items()}
+
+UTF8_BOM = b"\xef\xbb\xbf"
+CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+
+def count_chars(data: bytes) -> int:
+    """
+    Characters in a run of UTF-8: every byte but the continuation bytes.
+    """
+    return len(data.translate(None, CONTINUATION_BYTES))
+
+
+class OffsetIndex:
+    """
+    Maps byte offsets of a UTF-8 buffer to character offsets counted from
+    byte `start` (past a BOM, say). Character counts are checkpointed every
+    `step` bytes, filled in only as far as lookups reach, so a lookup counts
+    at most `step` bytes and nothing is decoded.
+    """
+
+    def __init__(self, source: Source, start: int = 0, step: int = 1 << 16):
+        self.source = source
+        self.start = start
+        self.step = step
+        self.checkpoints = array('q', [0])
+
+    def char_offset(self, offset: int) -> int:
+        start = self.start
+        if not start <= offset <= len(self.source):
+            raise ValueError(f"Offset out of range: {offset}")
+
+        step, checkpoints = self.step, self.checkpoints
+        block = (offset - start) // step
+        while len(checkpoints) <= block:
+            done = start + (len(checkpoints) - 1) * step
+            checkpoints.append(checkpoints[-1] + count_chars(self.source[done:done + step]))
+
+        return checkpoints[block] + count_chars(self.source[start + block * step:offset])
+
+
+class ByteTokenBuffer(TokenBuffer):
+    """
+    TokenBuffer over UTF-8 bytes (an mmap of a file, typically): offsets are
+    byte offsets and only the lexemes that become values are decoded.
+    Character offsets count from byte `start`, where the text begins.
+    """
+
+    __slots__ = ('offsets',)
+
+    def __init__(self, source: Source, start: int = 0):
+        super().__init__(source)
+        self.offsets = OffsetIndex(source, start)
+
+    def text(self, index: int) -> str:
+        return self.source[self.starts[index]:self.ends[index]].decode('utf-8')
+
+    def char_span(self, index: int) -> Tuple[int, int]:
+        return self.offsets.char_offset(self.starts[index]), self.offsets.char_offset(self.ends[index])
+
+    def __getstate__(self):
+        return super().__getstate__(), self.offsets.start
+
+    def __setstate__(self, state):
+        state, start = state
+        super().__setstate__(state)
+        self.offsets = OffsetIndex(self.source, start)
+
+    def __repr__(self):
+        return f"ByteTokenBuffer(tokens={len(self)}, source_bytes={len(self.source)})"
+
+
+def match_byte_kind(m: re.Match) -> int:
+    kind = m.lastgroup
+    lexeme = m.group()
+
+    if kind == 'OPERATOR':
+        return OPERATOR_BYTE_CODES[lexeme]
+    if kind == 'NUMBER':
+        points = lexeme.count(b'.')
+        if points > 1:
+            raise ValueError(f"Invalid number: `{lexeme.decode()}`")
+        return FLOAT_KIND if points else INT_KIND
+    if kind == 'WORD':
+        return word_kind(lexeme.decode('ascii'))
+    if kind == 'STRING':
+        if len(lexeme) < 2 or lexeme.count(b"'") % 2:
+            raise ValueError(f"Unterminated string literal: `{lexeme.decode('utf-8', 'replace')}`")
+        return STRING_KIND
+    raise ValueError(f"Unknown token: `{lexeme.decode('utf-8', 'replace')}`")
+
+
+def scan_bytes(
+        source: Source,
+        start: int = 0,
+        stop: Optional[int] = None,
+        errors: Optional[List[Diagnostic]] = None
+) -> ByteTokenBuffer:
+    """
+    scan_buffer over UTF-8 bytes: same tokens, byte offsets. Diagnostics
+    recorded in `errors` carry byte spans as well. Character offsets count
+    from `start`.
+    """
+    started = time.perf_counter() if HOOKS else 0.0
+    buffer = ByteTokenBuffer(source, start)
+    append = buffer.append
+
+    for m in BYTE_TOKEN_PATTERN.finditer(source, start, len(source) if stop is None else stop):
+        if m.lastgroup == 'SPACE':
+            continue
+        if errors is None:
+            append(match_byte_kind(m), m.start(), m.end())
+            continue
+        try:
+            append(match_byte_kind(m), m.start(), m.end())
+        except ValueError as e:
+            errors.append(Diagnostic(str(e), len(buffer), m.span()))
+
+    if HOOKS:
+        emit(CallStats(SCAN, time.perf_counter() - started, tokens=len(buffer)))
+    return buffer
+
+
+def scan_file(path: str, errors: Optional[List[Diagnostic]] = None) -> ByteTokenBuffer:
+    """
+    Scans a UTF-8 file through a read-only mmap, leaving the I/O to the page
+    cache. The map stays open for as long as the buffer refers to it.
+    """
+    with open(path, 'rb') as f:
+        try:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            source = b""
+
+    start = len(UTF8_BOM) if source[:len(UTF8_BOM)] == UTF8_BOM else 0
+    return scan_bytes(source, start, errors=errors)
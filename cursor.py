@@ -1,4 +1,5 @@
-from typing import Optional, Sequence, TypeVar, Callable
+import re
+from typing import Optional, Sequence, TypeVar, Callable, Dict, Tuple, Union
 
 from utils import Str
 
@@ -9,10 +10,12 @@ class Cursor[T]:
     def __init__(
             self,
             seq: Sequence[T],
-            compare: Optional[Callable[[T], bool]] = None
+            compare: Optional[Callable[[T], bool]] = None,
+            start: int = 0,
+            stop: Optional[int] = None
     ):
-        self.current = 0
-        self.total = len(seq)
+        self.current = start
+        self.total = len(seq) if stop is None else stop
         self.seq = seq
 
         default_compare = lambda a, b: a == b
@@ -56,9 +59,66 @@ class Cursor[T]:
             raise ValueError(f"{expected_item} not found: {error_message}")
         return item
 
+    def take_while(self, accept: Callable[[T], bool]) -> Tuple[int, int]:
+        """
+        Advances over the run of items `accept` holds for and returns the
+        run's span.
+        """
+        start = self.current
+        while self.current < self.total and accept(self.seq[self.current]):
+            self.current += 1
+        return start, self.current
+
+    def skip_to(self, item: T) -> bool:
+        """
+        Advances to the next `item` without consuming it; to the end if
+        there is none.
+        """
+        try:
+            self.current = self.seq.index(item, self.current, self.total)
+        except ValueError:
+            self.current = self.total
+            return False
+        return True
+
+    def slice(self, start: int, end: int) -> Sequence[T]:
+        return self.seq[start:end]
+
     @property
     def has_any(self) -> bool:
         return self.current < self.total
 
     def __repr__(self):
         return f"Peek: {self.peek()}; Index: {self.current}; Total: {self.total}"
+
+
+# character class -> pattern matching a run of it
+RUNS: Dict[re.Pattern, re.Pattern] = {}
+
+
+class StrCursor(Cursor[str]):
+    """
+    Cursor over the characters of a str: runs are matched by the regex
+    engine and delimiters found with str.find instead of item by item.
+    take_while also accepts a compiled character class, matching the whole
+    run in one call.
+    """
+
+    def __init__(self, seq: str, start: int = 0, stop: Optional[int] = None):
+        super().__init__(seq, start=start, stop=stop)
+
+    def take_while(self, accept: Union[Callable[[str], bool], re.Pattern]) -> Tuple[int, int]:
+        if not isinstance(accept, re.Pattern):
+            return super().take_while(accept)
+
+        if (run := RUNS.get(accept)) is None:
+            run = RUNS[accept] = re.compile(f"(?:{accept.pattern})*", accept.flags)
+
+        start = self.current
+        self.current = run.match(self.seq, start, self.total).end()
+        return start, self.current
+
+    def skip_to(self, item: str) -> bool:
+        found = self.seq.find(item, self.current, self.total)
+        self.current = self.total if found < 0 else found
+        return found >= 0
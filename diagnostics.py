@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass
+class Diagnostic:
+    """
+    One problem found while scanning or parsing. `index` is the token the
+    problem was found at; `span` is its [start, end) in the source text when
+    the tokens come from a TokenBuffer.
+    """
+    message: str
+    index: int
+    span: Optional[Tuple[int, int]] = None
@@ -0,0 +1,516 @@
+"""
+Grammar model and LL(k) table generator for the BNF extracted from ISO 9075
+by bnf_spec_extract.py.
+
+    python grammar.py docs/parsed --start "<schema definition>" -o tables.json [-k 2]
+
+Sources are `Format` files (or directories searched for them) holding
+productions in the standard's notation: `<name> ::= ...` with `|`, `[ ]`
+for optional parts, `{ }` for grouping, `...` for one-or-more repetition and
+`!!` comments. Optional, grouped and repeated parts become synthetic helper
+nonterminals; direct left recursion is rewritten into right recursion and
+common prefixes are left-factored. Indirect left recursion (`<a> ::= <b> x`,
+`<b> ::= <a> y`, or `<a>` behind an optional part) is not rewritten: it is
+reported as a ValueError naming the cycle, since no lookahead can parse it.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+TABLES_VERSION = 2
+
+Production = Tuple[str, ...]
+
+# terminal classes the scanner produces as a whole token
+IDENTIFIER = "<identifier>"
+NUMBER = "<number>"
+STRING = "<string>"
+END = "$"
+
+# lexical nonterminals of the standard, matched by one scanned token
+LEXICAL = {
+    "<identifier>": IDENTIFIER,
+    "<actual identifier>": IDENTIFIER,
+    "<regular identifier>": IDENTIFIER,
+    "<delimited identifier>": IDENTIFIER,
+    "<unsigned integer>": NUMBER,
+    "<unsigned numeric literal>": NUMBER,
+    "<exact numeric literal>": NUMBER,
+    "<approximate numeric literal>": NUMBER,
+    "<character string literal>": STRING,
+}
+
+# special characters the standard spells as nonterminals, as the scanner
+# spells their tokens
+SPECIAL = {
+    "<left paren>": "(",
+    "<right paren>": ")",
+    "<comma>": ",",
+    "<semicolon>": ";",
+    "<period>": ".",
+    "<colon>": ":",
+    "<asterisk>": "*",
+    "<plus sign>": "+",
+    "<minus sign>": "-",
+    "<solidus>": "/",
+    "<equals operator>": "=",
+    "<not equals operator>": "!=",
+    "<less than operator>": "<",
+    "<greater than operator>": ">",
+    "<less than or equals operator>": "<=",
+    "<greater than or equals operator>": ">=",
+}
+
+# terminals the scanner reads as another operator
+TERMINAL_ALIASES = {"<>": "!="}
+
+BNF_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<COMMENT>!!.*)"
+    r"|(?P<DEFINE>::=)"
+    r"|(?P<NONTERMINAL><[^<>\n]+>)"
+    r"|(?P<REPEAT>\.\.\.)"
+    r"|(?P<META>[|\[\]{}])"
+    r"|(?P<TERMINAL><>|<=|>=|[^\s|\[\]{}<]+|<)"
+    r")"
+)
+
+
+def tokenize_bnf(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    for m in BNF_TOKEN.finditer(text):
+        if m.lastgroup and m.lastgroup != 'COMMENT':
+            tokens.append((m.lastgroup, m.group(m.lastgroup)))
+    return tokens
+
+
+@dataclass
+class Grammar:
+    start: str
+    rules: Dict[str, List[Production]] = field(default_factory=dict)
+    synthetic: Set[str] = field(default_factory=set)
+
+    def is_terminal(self, symbol: str) -> bool:
+        return symbol not in self.rules
+
+    def terminals(self) -> Set[str]:
+        return {s for productions in self.rules.values() for p in productions for s in p if self.is_terminal(s)}
+
+
+class GrammarBuilder:
+    """
+    Desugars EBNF right-hand sides into plain productions.
+    """
+
+    def __init__(self):
+        self.rules: Dict[str, List[Production]] = {}
+        self.synthetic: Set[str] = set()
+        self.referenced: Set[str] = set()
+        self.counter = 0
+
+    def helper(self, owner: str, productions: List[Production]) -> str:
+        self.counter += 1
+        name = f"{owner[:-1]} #{self.counter}>"
+        self.rules[name] = productions
+        self.synthetic.add(name)
+        return name
+
+    def add_source(self, text: str) -> None:
+        tokens = tokenize_bnf(text)
+        starts = [i for i in range(len(tokens) - 1) if tokens[i][0] == 'NONTERMINAL' and tokens[i + 1][0] == 'DEFINE']
+        for n, start in enumerate(starts):
+            end = starts[n + 1] if n + 1 < len(starts) else len(tokens)
+            name = tokens[start][1]
+            if name in LEXICAL or name in SPECIAL:
+                continue
+            alternatives, position = self.alternatives(name, tokens[start + 2:end], 0)
+            if position != end - start - 2:
+                raise ValueError(f"Unbalanced brackets in {name}")
+            self.rules.setdefault(name, []).extend(alternatives)
+
+    def alternatives(self, owner: str, tokens, position: int) -> Tuple[List[Production], int]:
+        alternatives = []
+        while True:
+            sequence, position = self.sequence(owner, tokens, position)
+            alternatives.append(sequence)
+            if position < len(tokens) and tokens[position] == ('META', '|'):
+                position += 1
+                continue
+            return alternatives, position
+
+    def sequence(self, owner: str, tokens, position: int) -> Tuple[Production, int]:
+        symbols = []
+        while position < len(tokens):
+            kind, text = tokens[position]
+            if kind == 'META' and text in '|]}':
+                break
+
+            position += 1
+            if kind == 'NONTERMINAL':
+                symbol = SPECIAL.get(text) or LEXICAL.get(text) or text
+                if text not in SPECIAL and text not in LEXICAL:
+                    self.referenced.add(text)
+            elif kind == 'TERMINAL':
+                symbol = TERMINAL_ALIASES.get(text, text)
+            elif kind == 'META':
+                closing = ']' if text == '[' else '}'
+                inner, position = self.alternatives(owner, tokens, position)
+                if position >= len(tokens) or tokens[position] != ('META', closing):
+                    raise ValueError(f"Unbalanced brackets in {owner}")
+                position += 1
+                symbol = self.helper(owner, inner + [()] if text == '[' else inner)
+            else:
+                raise ValueError(f"Unexpected `{text}` in {owner}")
+
+            if position < len(tokens) and tokens[position][0] == 'REPEAT':
+                position += 1
+                rest = self.helper(owner, [])
+                self.rules[rest] = [(symbol, rest), ()]
+                symbols += [symbol, rest]
+            else:
+                symbols.append(symbol)
+
+        return tuple(symbols), position
+
+    def remove_left_recursion(self) -> None:
+        for name in list(self.rules):
+            recursive = [p[1:] for p in self.rules[name] if p and p[0] == name]
+            if not recursive:
+                continue
+            rest = self.helper(name, [])
+            self.rules[name] = [p + (rest,) for p in self.rules[name] if not p or p[0] != name]
+            self.rules[rest] = [tail + (rest,) for tail in recursive] + [()]
+
+    def left_factor(self) -> None:
+        """
+        Alternatives sharing a prefix (`A ::= x | x y`) move their differing
+        tails into a helper, so one token of lookahead can choose between them.
+        """
+        pending = list(self.rules)
+        while pending:
+            name = pending.pop()
+            groups: Dict[str, List[Production]] = {}
+            for production in self.rules[name]:
+                if production:
+                    groups.setdefault(production[0], []).append(production)
+
+            for group in groups.values():
+                if len(group) < 2:
+                    continue
+                prefix = group[0]
+                for production in group[1:]:
+                    size = 0
+                    while size < min(len(prefix), len(production)) and prefix[size] == production[size]:
+                        size += 1
+                    prefix = prefix[:size]
+
+                rest = self.helper(name, list(dict.fromkeys(p[len(prefix):] for p in group)))
+                productions = self.rules[name]
+                position = productions.index(group[0])
+                productions = [p for p in productions if p not in group]
+                productions.insert(position, prefix + (rest,))
+                self.rules[name] = productions
+                pending.append(rest)
+
+    def nullable(self) -> Set[str]:
+        nullable: Set[str] = set()
+        changed = True
+        while changed:
+            changed = False
+            for name, productions in self.rules.items():
+                if name not in nullable and any(all(s in nullable for s in p) for p in productions):
+                    nullable.add(name)
+                    changed = True
+        return nullable
+
+    def check_left_recursion(self, start: str) -> None:
+        """
+        Raises on a nonterminal reachable from `start` that can derive itself
+        as its first symbol, directly through a nullable prefix or through
+        other nonterminals.
+        """
+        nullable = self.nullable()
+        corners: Dict[str, List[str]] = {}
+        for name, productions in self.rules.items():
+            names = corners[name] = []
+            for production in productions:
+                for symbol in production:
+                    if symbol in self.rules:
+                        names.append(symbol)
+                    if symbol not in nullable:
+                        break
+
+        reachable = {start}
+        pending = [start]
+        while pending:
+            for production in self.rules[pending.pop()]:
+                for symbol in production:
+                    if symbol in self.rules and symbol not in reachable:
+                        reachable.add(symbol)
+                        pending.append(symbol)
+
+        # iterative depth-first search over left corners; `path` is the
+        # chain of nonterminals being explored
+        done: Set[str] = set()
+        for root in sorted(reachable):
+            if root in done:
+                continue
+            path = [root]
+            on_path = {root}
+            stack = [iter(corners[root])]
+            while stack:
+                symbol = next(stack[-1], None)
+                if symbol is None:
+                    stack.pop()
+                    done.add(path[-1])
+                    on_path.discard(path.pop())
+                elif symbol in on_path:
+                    cycle = path[path.index(symbol):] + [symbol]
+                    raise ValueError(f"Indirect left recursion: {' -> '.join(cycle)}")
+                elif symbol not in done:
+                    path.append(symbol)
+                    on_path.add(symbol)
+                    stack.append(iter(corners[symbol]))
+
+    def build(self, start: str) -> Grammar:
+        self.remove_left_recursion()
+        self.left_factor()
+        if start not in self.rules:
+            raise ValueError(f"Unknown start symbol: {start}")
+
+        undefined = sorted(self.referenced - self.rules.keys())
+        if undefined:
+            raise ValueError(f"Undefined nonterminals: {', '.join(undefined)}")
+        self.check_left_recursion(start)
+        return Grammar(start, self.rules, self.synthetic)
+
+
+def grammar_from_sources(sources: Iterable[str], start: str) -> Grammar:
+    builder = GrammarBuilder()
+    for text in sources:
+        builder.add_source(text)
+    return builder.build(start)
+
+
+Lookahead = Tuple[str, ...]
+
+
+def concat(left: Set[Lookahead], right: Set[Lookahead], k: int) -> Set[Lookahead]:
+    result = set()
+    for prefix in left:
+        if len(prefix) >= k:
+            result.add(prefix)
+            continue
+        for suffix in right:
+            result.add((prefix + suffix)[:k])
+    return result
+
+
+def sequence_first(grammar: Grammar, first: Dict[str, Set[Lookahead]], symbols: Production, k: int) -> Set[Lookahead]:
+    result: Set[Lookahead] = {()}
+    for symbol in symbols:
+        result = concat(result, {(symbol,)} if grammar.is_terminal(symbol) else first[symbol], k)
+        if all(len(prefix) >= k for prefix in result):
+            break
+    return result
+
+
+def first_sets(grammar: Grammar, k: int) -> Dict[str, Set[Lookahead]]:
+    """
+    FIRST_k: every terminal string of up to `k` symbols a nonterminal can
+    start with; shorter strings mean the derivation ends before `k`.
+    """
+    first: Dict[str, Set[Lookahead]] = {name: set() for name in grammar.rules}
+    changed = True
+    while changed:
+        changed = False
+        for name, productions in grammar.rules.items():
+            for production in productions:
+                found = sequence_first(grammar, first, production, k)
+                if not found <= first[name]:
+                    first[name] |= found
+                    changed = True
+    return first
+
+
+def follow_sets(grammar: Grammar, first: Dict[str, Set[Lookahead]], k: int) -> Dict[str, Set[Lookahead]]:
+    follow: Dict[str, Set[Lookahead]] = {name: set() for name in grammar.rules}
+    follow[grammar.start].add((END,))
+    changed = True
+    while changed:
+        changed = False
+        for name, productions in grammar.rules.items():
+            for production in productions:
+                for i, symbol in enumerate(production):
+                    if grammar.is_terminal(symbol):
+                        continue
+                    found = concat(sequence_first(grammar, first, production[i + 1:], k), follow[name], k)
+                    if not found <= follow[symbol]:
+                        follow[symbol] |= found
+                        changed = True
+    return follow
+
+
+Decision = Union[int, Dict[str, 'Decision']]
+
+
+@dataclass
+class ParseTables:
+    """
+    LL(k) prediction tables. `table[nonterminal]` is a trie keyed by the
+    next tokens' terminals whose leaves are indexes into `rules[nonterminal]`;
+    it only goes as deep as needed to tell the alternatives apart. Where `k`
+    tokens are not enough the first production listed wins and the clash is
+    kept in `conflicts`.
+    """
+    start: str
+    k: int
+    rules: Dict[str, List[Production]]
+    table: Dict[str, Decision]
+    synthetic: Set[str]
+    conflicts: List[Tuple[str, str]]
+    fingerprint: str = ""
+
+    def to_json(self) -> dict:
+        return {
+            "version": TABLES_VERSION,
+            "fingerprint": self.fingerprint,
+            "start": self.start,
+            "k": self.k,
+            "rules": {name: [list(p) for p in productions] for name, productions in self.rules.items()},
+            "table": self.table,
+            "synthetic": sorted(self.synthetic),
+            "conflicts": [list(c) for c in self.conflicts],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'ParseTables':
+        if data.get("version") != TABLES_VERSION:
+            raise ValueError(f"Unsupported parse tables version: {data.get('version')}")
+        return cls(
+            start=data["start"],
+            k=data["k"],
+            rules={name: [tuple(p) for p in productions] for name, productions in data["rules"].items()},
+            table=data["table"],
+            synthetic=set(data["synthetic"]),
+            conflicts=[tuple(c) for c in data["conflicts"]],
+            fingerprint=data["fingerprint"],
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f)
+
+    @classmethod
+    def load(cls, path: str) -> 'ParseTables':
+        with open(path) as f:
+            return cls.from_json(json.load(f))
+
+
+def decide(
+        name: str,
+        candidates: List[Tuple[Lookahead, int]],
+        depth: int,
+        k: int,
+        conflicts: List[Tuple[str, str]]
+) -> Decision:
+    productions = {index for _, index in candidates}
+    if depth and len(productions) == 1:
+        return productions.pop()
+    if depth == k:
+        conflicts.append((name, " ".join(candidates[0][0])))
+        return min(productions)
+
+    branches: Dict[str, List[Tuple[Lookahead, int]]] = {}
+    for lookahead, index in candidates:
+        key = lookahead[depth] if depth < len(lookahead) else END
+        branches.setdefault(key, []).append((lookahead, index))
+    return {key: decide(name, branches[key], depth + 1, k, conflicts) for key in sorted(branches)}
+
+
+def build_tables(grammar: Grammar, k: int = 2, fingerprint: str = "") -> ParseTables:
+    if k <= 0:
+        raise ValueError(f"Lookahead must be positive: {k}")
+
+    first = first_sets(grammar, k)
+    follow = follow_sets(grammar, first, k)
+
+    table: Dict[str, Decision] = {}
+    conflicts: List[Tuple[str, str]] = []
+    for name, productions in grammar.rules.items():
+        candidates = [
+            (lookahead, index)
+            for index, production in enumerate(productions)
+            for lookahead in sorted(concat(sequence_first(grammar, first, production, k), follow[name], k))
+        ]
+        table[name] = decide(name, candidates, 0, k, conflicts)
+
+    return ParseTables(grammar.start, k, grammar.rules, table, grammar.synthetic, conflicts, fingerprint)
+
+
+def source_fingerprint(sources: List[str], start: str, k: int) -> str:
+    digest = hashlib.sha256(f"{TABLES_VERSION}\0{start}\0{k}".encode())
+    for text in sources:
+        digest.update(b"\0" + text.encode())
+    return digest.hexdigest()
+
+
+def read_sources(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Text of every given file, and of every `Format` file under a given
+    directory, in a stable order.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            with open(path) as f:
+                yield f.read()
+            continue
+        for directory, subdirectories, files in sorted(os.walk(path)):
+            subdirectories.sort()
+            if "Format" in files:
+                with open(os.path.join(directory, "Format")) as f:
+                    yield f.read()
+
+
+def load_or_build(paths: Iterable[str], start: str, cache: Optional[str] = None, k: int = 2) -> ParseTables:
+    """
+    Tables for the BNF under `paths`, read from `cache` when it was built
+    from the same sources and regenerated (and stored) otherwise.
+    """
+    sources = list(read_sources(paths))
+    fingerprint = source_fingerprint(sources, start, k)
+
+    if cache and os.path.exists(cache):
+        try:
+            tables = ParseTables.load(cache)
+        except (ValueError, KeyError):
+            tables = None
+        if tables is not None and tables.fingerprint == fingerprint:
+            return tables
+
+    tables = build_tables(grammar_from_sources(sources, start), k, fingerprint)
+    if cache:
+        tables.save(cache)
+    return tables
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = argparse.ArgumentParser(description="Generate LL(k) parse tables from extracted ISO 9075 BNF")
+    args.add_argument("sources", nargs="+", help="Format files or directories containing them")
+    args.add_argument("--start", required=True, help="start nonterminal, e.g. '<schema definition>'")
+    args.add_argument("-o", "--output", required=True, help="JSON file to write the tables to")
+    args.add_argument("-k", type=int, default=2, help="tokens of lookahead (default: 2)")
+    options = args.parse_args(argv)
+
+    tables = load_or_build(options.sources, options.start, options.output, options.k)
+    print(f"{len(tables.rules)} nonterminals, {len(tables.conflicts)} LL({tables.k}) conflicts")
+    for name, lookahead in tables.conflicts:
+        print(f"  conflict: {name} on {lookahead}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from operator import neg
+from typing import List, Optional, Sequence, Tuple, overload
+
+from cursor import Cursor
+from diagnostics import Diagnostic
+from parser import BINARY_OPERATORS, ExpressionType, TreeNodeBuilder, parse_expression_iterative
+from scaner import Token, Operators, TOKEN_PATTERN
+from token_buffer import (
+    OPERATOR_CODES, LEFT_PAREN_KIND, RIGHT_PAREN_KIND, INT_KIND, FLOAT_KIND, TRUE_KIND, FALSE_KIND,
+    IDENTIFIER_KIND, STRING_KIND, SHARED_TOKENS, TokenBuffer, decode_token, scan_buffer, match_kind
+)
+from tree import TreeNode
+
+BINARY_KINDS = frozenset(OPERATOR_CODES[op.value] for op in BINARY_OPERATORS)
+MINUS_KIND = OPERATOR_CODES[Operators.MINUS.value]
+# a `-` right after one of these is binary, anywhere else unary
+OPERAND_END_KINDS = frozenset(
+    (INT_KIND, FLOAT_KIND, TRUE_KIND, FALSE_KIND, IDENTIFIER_KIND, STRING_KIND, RIGHT_PAREN_KIND)
+)
+# a lexeme the scanner rejects, kept as a token so its span moves with edits
+UNKNOWN_KIND = len(SHARED_TOKENS)
+
+
+def lex_kind(m: re.Match) -> int:
+    try:
+        return match_kind(m)
+    except ValueError:
+        return UNKNOWN_KIND
+
+
+def scan_all(text: str) -> TokenBuffer:
+    """
+    scan_buffer that keeps rejected lexemes as UNKNOWN_KIND tokens.
+    """
+    try:
+        return scan_buffer(text)
+    except ValueError:
+        pass
+    buffer = TokenBuffer(text)
+    for m in TOKEN_PATTERN.finditer(text):
+        if m.lastgroup != 'SPACE':
+            buffer.append(lex_kind(m), m.start(), m.end())
+    return buffer
+
+
+@dataclass
+class Edit:
+    offset: int
+    deleted: int
+    inserted: str
+
+
+class TokenGap(Sequence[Token]):
+    """
+    Gap buffer of the tokens of a text under edit. Tokens before the gap
+    keep absolute offsets; tokens after it are stacked in reverse with
+    offsets relative to the end of the text, so a length change at the gap
+    shifts them without touching them. Moving the gap costs the tokens it
+    passes, and edits mostly land near the previous one.
+
+    Each token also carries the tree node parsed from it, if any, and
+    `unknown` counts the UNKNOWN_KIND tokens.
+    """
+
+    def __init__(self, buffer: TokenBuffer):
+        self.source = buffer.source
+        self.kinds = array('B', buffer.kinds)
+        self.starts = array('q', buffer.starts)
+        self.ends = array('q', buffer.ends)
+        self.nodes: List[Optional[TreeNode[Token]]] = [None] * len(buffer)
+        self.tail_kinds = array('B')
+        self.tail_starts = array('q')
+        self.tail_ends = array('q')
+        self.tail_nodes: List[Optional[TreeNode[Token]]] = []
+        self.unknown = self.kinds.count(UNKNOWN_KIND)
+
+    def _tail(self, index: int) -> int:
+        return len(self) - 1 - index
+
+    def kind(self, index: int) -> int:
+        if index < len(self.kinds):
+            return self.kinds[index]
+        return self.tail_kinds[self._tail(index)]
+
+    def span(self, index: int) -> Tuple[int, int]:
+        if index < len(self.kinds):
+            return self.starts[index], self.ends[index]
+        t, end = self._tail(index), len(self.source)
+        return self.tail_starts[t] + end, self.tail_ends[t] + end
+
+    def text(self, index: int) -> str:
+        start, end = self.span(index)
+        return self.source[start:end]
+
+    def token(self, index: int) -> Token:
+        kind = self.kind(index)
+        if kind == UNKNOWN_KIND:
+            raise ValueError(f"Unknown token: `{self.text(index)}`")
+        if (shared := SHARED_TOKENS[kind]) is not None:
+            return shared
+        return decode_token(kind, self.text(index))
+
+    def node(self, index: int) -> Optional[TreeNode[Token]]:
+        if index < len(self.nodes):
+            return self.nodes[index]
+        return self.tail_nodes[self._tail(index)]
+
+    def set_node(self, index: int, node: Optional[TreeNode[Token]]) -> None:
+        if index < len(self.nodes):
+            self.nodes[index] = node
+        else:
+            self.tail_nodes[self._tail(index)] = node
+
+    def bisect(self, offset: int, lo: int = 0, ends: bool = False) -> int:
+        """
+        First token from `lo` on whose start (or end) is at least `offset`.
+        """
+        head, tail = (self.ends, self.tail_ends) if ends else (self.starts, self.tail_starts)
+        if head and head[-1] >= offset:
+            return max(lo, bisect_left(head, offset))
+        # the tail stack runs backwards, so its relative offsets descend
+        count = bisect_right(tail, len(self.source) - offset, key=neg)
+        return max(lo, len(self) - count)
+
+    def move_gap(self, index: int) -> None:
+        head, end = len(self.kinds), len(self.source)
+        if index < head:
+            self.tail_kinds.extend(reversed(self.kinds[index:]))
+            self.tail_starts.extend(start - end for start in reversed(self.starts[index:]))
+            self.tail_ends.extend(stop - end for stop in reversed(self.ends[index:]))
+            self.tail_nodes.extend(reversed(self.nodes[index:]))
+            for column in (self.kinds, self.starts, self.ends, self.nodes):
+                del column[index:]
+        elif index > head:
+            count = index - head
+            self.kinds.extend(reversed(self.tail_kinds[-count:]))
+            self.starts.extend(start + end for start in reversed(self.tail_starts[-count:]))
+            self.ends.extend(stop + end for stop in reversed(self.tail_ends[-count:]))
+            self.nodes.extend(reversed(self.tail_nodes[-count:]))
+            for column in (self.tail_kinds, self.tail_starts, self.tail_ends, self.tail_nodes):
+                del column[-count:]
+
+    def replace(self, a: int, b: int, kinds: array, starts: array, ends: array, source: str) -> None:
+        """
+        Replaces tokens [a, b) with new ones whose offsets refer to `source`,
+        the edited text; the gap ends up right after them.
+        """
+        self.move_gap(a)
+        if b > a:
+            self.unknown -= self.tail_kinds[a - b:].count(UNKNOWN_KIND)
+            for column in (self.tail_kinds, self.tail_starts, self.tail_ends, self.tail_nodes):
+                del column[a - b:]
+        self.source = source
+        self.unknown += kinds.count(UNKNOWN_KIND)
+        self.kinds.extend(kinds)
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+        self.nodes.extend([None] * len(kinds))
+
+    def __len__(self) -> int:
+        return len(self.kinds) + len(self.tail_kinds)
+
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Token]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.token(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return self.token(index)
+
+    def __repr__(self):
+        return f"TokenGap(tokens={len(self)}, gap={len(self.kinds)}, source_length={len(self.source)})"
+
+
+class NodeIndexBuilder(TreeNodeBuilder):
+    """
+    Builds TreeNodes and stores each one with the token it was parsed from.
+    """
+
+    def __init__(self, tokens: TokenGap):
+        self.tokens = tokens
+
+    def node(self, kind: ExpressionType, index: int, t: Token) -> TreeNode[Token]:
+        node = TreeNode(t)
+        self.tokens.set_node(index, node)
+        return node
+
+
+class IncrementalDocument:
+    """
+    Keeps the tokens and tree of a text buffer up to date across edits.
+
+    An edit re-scans from the first token it touches until the new tokens
+    line up with an old token boundary again, and splices them in at the
+    gap of a TokenGap, so later tokens are not shifted. Then the smallest
+    subtree that can change is parsed again and its node updated in place:
+
+    - the operand (prefix operators plus a literal, identifier or group)
+      around the edit, if the edit leaves it a single operand;
+    - otherwise the innermost group around the edit, if no paren became
+      unbalanced;
+    - otherwise, at top level, the whole document.
+
+    Finding the subtree walks outward over its own tokens only, so an edit
+    costs about its own size plus the size of that subtree, plus the tokens
+    between it and the previous edit for moving the gap. Tokens left over
+    after a complete expression are an error, as inside a group.
+
+    Text that does not scan or parse, as while typing, is still taken:
+    `tree` is None until it does again, apply() raises ValueError after
+    updating text and tokens, and `errors` lists the rejected lexemes.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = TokenGap(scan_all(text))
+        self.tree: Optional[TreeNode[Token]] = None
+        # token ranges touched by the last edit, for inspection
+        self.last_relexed: Tuple[int, int] = (0, len(self.tokens))
+        self.last_reparsed: Tuple[int, int] = (0, len(self.tokens))
+        if not self.tokens.unknown:
+            try:
+                self.parse_all()
+            except ValueError:
+                pass
+
+    @property
+    def errors(self) -> List[Diagnostic]:
+        """
+        Lexemes the scanner rejects, in order. Walks the tokens, but only
+        while there are any.
+        """
+        tokens = self.tokens
+        if not tokens.unknown:
+            return []
+        return [self.lex_error(i) for i in range(len(tokens)) if tokens.kind(i) == UNKNOWN_KIND]
+
+    def lex_error(self, index: int) -> Diagnostic:
+        span = self.tokens.span(index)
+        try:
+            match_kind(TOKEN_PATTERN.match(self.text, *span))
+        except ValueError as e:
+            return Diagnostic(str(e), index, span)
+        raise ValueError(f"Token {index} is not a lex error")
+
+    def parse_all(self) -> TreeNode[Token]:
+        self.tree = None
+        self.tree = self.reparse(0, len(self.tokens), None)
+        return self.tree
+
+    def apply(self, edit: Edit) -> TreeNode[Token]:
+        if edit.offset < 0 or edit.deleted < 0 or edit.offset + edit.deleted > len(self.text):
+            raise ValueError(f"Edit out of range: {edit}")
+
+        text = self.text[:edit.offset] + edit.inserted + self.text[edit.offset + edit.deleted:]
+        a, b, kinds, starts, ends = self.relex(text, edit)
+        e = a + len(kinds)
+
+        # the operand and paren balance around the edit before it applies
+        operand, root, balanced = None, None, False
+        if self.tree is not None:
+            balanced, binary = self.scan_level(a, b)
+            if balanced and not binary:
+                operand = self.operand_around(a, b)
+                root = self.tokens.node(operand[0])
+
+        self.tokens.replace(a, b, kinds, starts, ends, text)
+        self.text = text
+        self.last_relexed = (a, e)
+
+        if self.tokens.unknown:
+            self.tree = None
+            self.last_reparsed = (a, a)
+            error = self.lex_error(a + kinds.index(UNKNOWN_KIND)) if UNKNOWN_KIND in kinds else self.errors[0]
+            raise ValueError(error.message)
+
+        try:
+            if self.tree is None:
+                return self.parse_all()
+            if a == b == e:
+                self.last_reparsed = (a, a)
+                return self.tree
+            if operand is not None:
+                lo, hi = operand[0], operand[1] + e - b
+                if self.scan_level(lo, hi) == (True, False) and self.is_boundary(hi):
+                    return self.reparse(lo, hi, root)
+            if balanced and self.scan_level(a, e)[0]:
+                group = self.enclosing_group(a, e)
+                if group is not None:
+                    opening, closing = group
+                    return self.reparse(opening, closing + 1, self.tokens.node(opening))
+            return self.parse_all()
+        except ValueError:
+            self.tree = None
+            raise
+
+    def relex(self, text: str, edit: Edit) -> Tuple[int, int, array, array, array]:
+        """
+        Scans `text` from the first old token the edit can touch; returns the
+        replaced old token range [a, b) and the new tokens' arrays.
+        """
+        old = self.tokens
+        n = len(old)
+
+        a = old.bisect(edit.offset, ends=True)
+        pos = min(old.span(a)[0], edit.offset) if a < n else edit.offset
+        edit_end = edit.offset + len(edit.inserted)
+        delta = len(edit.inserted) - edit.deleted
+
+        kinds, new_starts, new_ends = array('B'), array('q'), array('q')
+        b = n
+        while (m := TOKEN_PATTERN.match(text, pos)) is not None:
+            pos = m.end()
+            if m.lastgroup == 'SPACE':
+                continue
+
+            start = m.start()
+            if start >= edit_end:
+                # past the edit, an old token starting here scans the same again
+                j = old.bisect(start - delta, a)
+                if j < n and old.span(j)[0] == start - delta:
+                    b = j
+                    break
+
+            kinds.append(lex_kind(m))
+            new_starts.append(start)
+            new_ends.append(pos)
+
+        # tokens touching the edit were rescanned; drop the ones that came out the same
+        lo, hi = 0, len(kinds)
+        while lo < hi and a < b and new_ends[lo] <= edit.offset and kinds[lo] == old.kind(a) \
+                and (new_starts[lo], new_ends[lo]) == old.span(a):
+            lo, a = lo + 1, a + 1
+        while lo < hi and a < b and new_starts[hi - 1] >= edit_end and kinds[hi - 1] == old.kind(b - 1) \
+                and (new_starts[hi - 1] - delta, new_ends[hi - 1] - delta) == old.span(b - 1):
+            hi, b = hi - 1, b - 1
+
+        return a, b, kinds[lo:hi], new_starts[lo:hi], new_ends[lo:hi]
+
+    def is_binary(self, index: int) -> bool:
+        kind = self.tokens.kind(index)
+        if kind != MINUS_KIND:
+            return kind in BINARY_KINDS
+        return index > 0 and self.tokens.kind(index - 1) in OPERAND_END_KINDS
+
+    def is_boundary(self, index: int) -> bool:
+        return index >= len(self.tokens) or self.tokens.kind(index) == RIGHT_PAREN_KIND or self.is_binary(index)
+
+    def scan_level(self, lo: int, hi: int) -> Tuple[bool, bool]:
+        """
+        Whether the parens in [lo, hi) balance, and whether a binary operator
+        sits outside all of them.
+        """
+        kinds = self.tokens
+        nested, binary = 0, False
+        for i in range(lo, hi):
+            kind = kinds.kind(i)
+            if kind == LEFT_PAREN_KIND:
+                nested += 1
+            elif kind == RIGHT_PAREN_KIND:
+                if not nested:
+                    return False, binary
+                nested -= 1
+            elif not nested and self.is_binary(i):
+                binary = True
+        return not nested, binary
+
+    def outer_left(self, index: int, binary: bool) -> int:
+        """
+        Nearest token at or before `index`, on the level of `index + 1`, that
+        is the enclosing `(` or, with `binary`, a binary operator; -1 if none.
+        """
+        nested = 0
+        for i in range(index, -1, -1):
+            kind = self.tokens.kind(i)
+            if kind == RIGHT_PAREN_KIND:
+                nested += 1
+            elif kind == LEFT_PAREN_KIND:
+                if not nested:
+                    return i
+                nested -= 1
+            elif binary and not nested and self.is_binary(i):
+                return i
+        return -1
+
+    def outer_right(self, index: int, binary: bool) -> int:
+        """
+        Mirror of outer_left: the enclosing `)` or a binary operator at or
+        after `index`; the token count if none.
+        """
+        nested = 0
+        for i in range(index, len(self.tokens)):
+            kind = self.tokens.kind(i)
+            if kind == LEFT_PAREN_KIND:
+                nested += 1
+            elif kind == RIGHT_PAREN_KIND:
+                if not nested:
+                    return i
+                nested -= 1
+            elif binary and not nested and self.is_binary(i):
+                return i
+        return len(self.tokens)
+
+    def operand_around(self, lo: int, hi: int) -> Tuple[int, int]:
+        return self.outer_left(lo - 1, True) + 1, self.outer_right(hi, True)
+
+    def enclosing_group(self, lo: int, hi: int) -> Optional[Tuple[int, int]]:
+        """
+        Token indices of the innermost parens around [lo, hi).
+        """
+        opening = self.outer_left(lo - 1, False)
+        closing = self.outer_right(hi, False)
+        if opening < 0 or closing == len(self.tokens):
+            return None
+        return opening, closing
+
+    def reparse(self, lo: int, hi: int, node: Optional[TreeNode[Token]]) -> TreeNode[Token]:
+        """
+        Parses tokens [lo, hi), all of which must belong to the expression,
+        and moves the result into `node`, the root of the subtree they were
+        parsed into before. Without a node the result is returned as is.
+        """
+        tokens = self.tokens
+        for i in range(lo, hi):
+            tokens.set_node(i, None)
+
+        cur = Cursor(tokens, start=lo, stop=hi)
+        fresh = parse_expression_iterative(cur, NodeIndexBuilder(tokens))
+        if cur.current != hi:
+            raise ValueError(f"Unexpected token: {tokens[cur.current]}")
+
+        self.last_reparsed = (lo, hi)
+        if node is None:
+            return fresh
+        node.data, node.descendants = fresh.data, fresh.descendants
+        tokens.set_node(lo, node)
+        return self.tree
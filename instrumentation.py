@@ -0,0 +1,73 @@
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+SCAN = "scan"
+PARSE = "parse"
+TEMPLATE_CACHE = "template_cache"
+
+
+@dataclass
+class CallStats:
+    """
+    One instrumented call. `max_depth` is the height of the produced tree,
+    which bounds the recursion depth of the recursive parser; `cache_hit` is
+    None for stages without a cache.
+    """
+    stage: str
+    seconds: float
+    tokens: int = 0
+    nodes: int = 0
+    max_depth: int = 0
+    cache_hit: Optional[bool] = None
+
+
+Hook = Callable[[CallStats], None]
+
+# Instrumented call sites test this list before doing any extra work, so
+# with no hooks installed the cost is one truth test per call.
+HOOKS: List[Hook] = []
+
+
+def add_hook(hook: Hook) -> None:
+    HOOKS.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    HOOKS.remove(hook)
+
+
+def emit(stats: CallStats) -> None:
+    for hook in HOOKS:
+        hook(stats)
+
+
+@contextmanager
+def collect() -> Iterator[List[CallStats]]:
+    """
+    Records every instrumented call made inside the block.
+    """
+    records: List[CallStats] = []
+    add_hook(records.append)
+    try:
+        yield records
+    finally:
+        remove_hook(records.append)
+
+
+class LatencyHistogram:
+    """
+    Hook counting calls per stage in power-of-two microsecond buckets; a
+    bucket is keyed by its upper bound, so 8 counts calls of 4 to 8 us.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[str, Counter] = {}
+
+    def __call__(self, stats: CallStats) -> None:
+        micros = int(stats.seconds * 1e6)
+        self.buckets.setdefault(stats.stage, Counter())[1 << micros.bit_length()] += 1
+
+    def export(self) -> Dict[str, Dict[int, int]]:
+        return {stage: dict(sorted(counts.items())) for stage, counts in self.buckets.items()}
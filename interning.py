@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+@dataclass
+class InternStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    capacity: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class InternPool(Generic[K, V]):
+    """
+    Bounded interning: the same key yields the same instance while it stays
+    among the `capacity` most recently used. Capacity 0 turns interning off.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        if capacity < 0:
+            raise ValueError(f"Capacity must not be negative: {capacity}")
+        self.capacity = capacity
+        self.entries: OrderedDict[K, V] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def intern(self, key: K, make: Callable[[K], V]) -> V:
+        entries = self.entries
+        value = entries.get(key)
+        if value is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = make(key)
+        if self.capacity:
+            entries[key] = value
+            if len(entries) > self.capacity:
+                entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def get(self, key: K) -> Optional[V]:
+        return self.entries.get(key)
+
+    def resize(self, capacity: int) -> None:
+        if capacity < 0:
+            raise ValueError(f"Capacity must not be negative: {capacity}")
+        self.capacity = capacity
+        while len(self.entries) > capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> InternStats:
+        return InternStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self.entries),
+            capacity=self.capacity,
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
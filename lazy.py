@@ -0,0 +1,137 @@
+from typing import Dict, List, Optional, Sequence
+
+from cursor import Cursor
+from parser import BINARY_OPERATORS, UNARY_OPERATORS, Associativity
+from scaner import Token, TokenType, Operators, is_paren
+from tree import TreeNode
+
+ParenIndex = Dict[int, int]
+
+
+def match_parens(tokens: Sequence[Token]) -> ParenIndex:
+    """
+    Token index of every `(` mapped to its matching `)`, for token lists
+    scanned without `scan_buffer(parens=...)`. Unbalanced parens are left out.
+    """
+    parens: ParenIndex = {}
+    opened: List[int] = []
+    for index, t in enumerate(tokens):
+        if is_paren(t):
+            opened.append(index)
+        elif t.type is TokenType.OPERATOR and t.value == Operators.RIGHT_PAREN and opened:
+            parens[opened.pop()] = index
+    return parens
+
+
+class LazyGroup(TreeNode[Token]):
+    """
+    Placeholder for a parenthesized group: its contents are parsed the first
+    time `descendants` is read, so errors inside it surface only then.
+    """
+
+    def __init__(self, data: Token, tokens: Sequence[Token], opening: int, closing: int, parens: ParenIndex):
+        super().__init__(data)
+        self._descendants: Optional[List[TreeNode[Token]]] = None
+        self.tokens = tokens
+        self.opening = opening
+        self.closing = closing
+        self.parens = parens
+
+    @property
+    def parsed(self) -> bool:
+        return self._descendants is not None
+
+    @property
+    def descendants(self) -> List[TreeNode[Token]]:
+        if self._descendants is None:
+            cur = Cursor(self.tokens, start=self.opening + 1, stop=self.closing)
+            expression = LazyParser(self.tokens, self.parens).expression(cur)
+            if (t := cur.peek()) is not None:
+                raise ValueError(f"Unexpected token: {t}")
+            self._descendants = [expression]
+        return self._descendants
+
+    @descendants.setter
+    def descendants(self, nodes: List[TreeNode[Token]]) -> None:
+        self._descendants = nodes
+
+
+class LazyParser:
+    """
+    parse_expression with groups left as LazyGroup placeholders: a `(` with
+    a known match is stepped over in one move instead of being parsed.
+    """
+
+    def __init__(self, tokens: Sequence[Token], parens: ParenIndex):
+        self.tokens = tokens
+        self.parens = parens
+
+    def expression(self, cur: Cursor[Token], min_precedence: int = 0) -> TreeNode[Token]:
+        left = self.unary(cur)
+
+        while (
+                (t := cur.peek()) is not None
+                and t.type is TokenType.OPERATOR
+                and (binding := BINARY_OPERATORS.get(t.value))
+        ):
+            precedence, associativity = binding
+            if precedence < min_precedence:
+                break
+
+            cur.next()
+            node = TreeNode(t)
+
+            next_precedence = precedence + 1 if associativity == Associativity.LEFT else precedence
+            right = self.expression(cur, next_precedence)
+            node.add(left)
+            node.add(right)
+
+            left = node
+
+        return left
+
+    def unary(self, cur: Cursor[Token]) -> TreeNode[Token]:
+        t = cur.peek()
+        if t is not None and t.type is TokenType.OPERATOR and t.value in UNARY_OPERATORS:
+            cur.next()
+            unary = TreeNode(t)
+            unary.add(self.expression(cur, UNARY_OPERATORS[t.value]))
+            return unary
+        return self.primary(cur)
+
+    def primary(self, cur: Cursor[Token]) -> TreeNode[Token]:
+        t = cur.peek()
+        if t is None:
+            raise ValueError("Unexpected end of input")
+
+        if t.type is TokenType.LITERAL or t.type is TokenType.IDENTIFIER:
+            cur.next()
+            return TreeNode(t)
+
+        if is_paren(t):
+            opening = cur.current
+            closing = self.parens.get(opening)
+            if closing is None or closing >= cur.total:
+                raise ValueError("Unbalanced '('")
+
+            cur.current = closing + 1
+            return LazyGroup(t, self.tokens, opening, closing, self.parens)
+
+        raise ValueError(f"Unexpected token: {t}")
+
+
+def parse_lazy(tokens: Sequence[Token], parens: Optional[ParenIndex] = None) -> TreeNode[Token]:
+    """
+    Parses only the top level of `tokens`; groups are parsed on first access
+    and then equal what parse(tokens) builds. Pass the index filled by
+    `scan_buffer(parens=...)` to skip the extra pass over the tokens.
+    A `(` without a match and tokens after the top-level expression are
+    errors right away.
+    """
+    if parens is None:
+        parens = match_parens(tokens)
+    cur = Cursor(tokens)
+    expression = LazyParser(tokens, parens).expression(cur)
+    if (t := cur.peek()) is not None:
+        raise ValueError(f"Unexpected token: {t}")
+    return expression
@@ -0,0 +1,96 @@
+from typing import Optional, Sequence, Tuple, Union
+
+from cursor import Cursor
+from grammar import ParseTables, IDENTIFIER, NUMBER, STRING, END
+from scaner import Token, TokenType
+from tree import TreeNode
+
+SyntaxNode = TreeNode[Union[str, Token]]
+
+
+def terminal_keys(t: Optional[Token]) -> Tuple[str, ...]:
+    """
+    Grammar terminals a token can stand for, most specific first. Key words
+    the scanner leaves as identifiers (the non-reserved ones) still match
+    their terminal by spelling.
+    """
+    if t is None:
+        return END,
+    if t.type is TokenType.IDENTIFIER:
+        return t.value.upper(), IDENTIFIER
+    if t.type is TokenType.LITERAL:
+        if isinstance(t.value, bool):
+            return "TRUE" if t.value else "FALSE",
+        if isinstance(t.value, str):
+            return STRING,
+        return NUMBER,
+    return t.value.value,
+
+
+class LLParser:
+    """
+    Table-driven predictive parser over ParseTables: at most k dict lookups
+    per expanded nonterminal, an explicit stack instead of recursion.
+
+    The result is a concrete syntax tree whose inner nodes hold nonterminal
+    names and whose leaves hold tokens; synthetic helper nonterminals are
+    spliced into their parent.
+    """
+
+    def __init__(self, tables: ParseTables):
+        self.tables = tables
+
+    @classmethod
+    def load(cls, path: str) -> 'LLParser':
+        return cls(ParseTables.load(path))
+
+    def parse(self, tokens: Sequence[Token], start: Optional[str] = None) -> SyntaxNode:
+        rules, synthetic = self.tables.rules, self.tables.synthetic
+        start = start or self.tables.start
+        if start not in rules:
+            raise ValueError(f"Unknown start symbol: {start}")
+
+        cur = Cursor(tokens)
+        root = TreeNode(start)
+        stack = [(symbol, root) for symbol in reversed(rules[start][self.predict(start, cur)])]
+
+        while stack:
+            symbol, parent = stack.pop()
+            t = cur.peek()
+
+            if symbol not in rules:
+                if symbol not in terminal_keys(t):
+                    raise ValueError(f"Unexpected {'end of input' if t is None else f'token: {t}'}, expected {symbol}")
+                parent.add(TreeNode(t))
+                cur.next()
+                continue
+
+            production = rules[symbol][self.predict(symbol, cur)]
+            node = parent
+            if symbol not in synthetic:
+                node = TreeNode(symbol)
+                parent.add(node)
+            stack.extend((s, node) for s in reversed(production))
+
+        if (t := cur.peek()) is not None:
+            raise ValueError(f"Unexpected token: {t}")
+        return root
+
+    def predict(self, symbol: str, cur: Cursor[Token]) -> int:
+        """
+        Walks the decision trie of `symbol` over the upcoming tokens.
+        """
+        decision = self.tables.table[symbol]
+        position = cur.current
+        while isinstance(decision, dict):
+            t = cur.seq[position] if position < cur.total else None
+            for key in terminal_keys(t):
+                if key in decision:
+                    decision = decision[key]
+                    break
+            else:
+                expected = ", ".join(decision)
+                raise ValueError(f"Unexpected {'end of input' if t is None else f'token: {t}'} in {symbol}, "
+                                 f"expected one of {expected}")
+            position += 1
+        return decision
@@ -0,0 +1,175 @@
+import operator
+from typing import List
+
+from scaner import Token, TokenType, Operators, is_paren
+from tree import TreeNode, postorder
+
+# Python semantics of every operator the parser emits; shared by constant
+# folding here and by the compiler's stack-program fallback.
+BINARY_FUNCTIONS = {
+    Operators.PLUS: operator.add,
+    Operators.MINUS: operator.sub,
+    Operators.MULTIPLY: operator.mul,
+    Operators.DIVIDE: operator.truediv,
+    Operators.LESS: operator.lt,
+    Operators.LESS_OR_EQUAL: operator.le,
+    Operators.GREATER: operator.gt,
+    Operators.GREATER_OR_EQUAL: operator.ge,
+    Operators.EQUAL: operator.eq,
+    Operators.NOT_EQUAL: operator.ne,
+}
+
+UNARY_FUNCTIONS = {
+    Operators.MINUS: operator.neg,
+    Operators.NOT: operator.not_,
+}
+
+COMPARISONS = {
+    Operators.LESS,
+    Operators.LESS_OR_EQUAL,
+    Operators.GREATER,
+    Operators.GREATER_OR_EQUAL,
+    Operators.EQUAL,
+    Operators.NOT_EQUAL,
+}
+
+
+ARITHMETIC = {
+    Operators.PLUS,
+    Operators.MINUS,
+    Operators.MULTIPLY,
+    Operators.DIVIDE,
+}
+
+
+def is_int(node: TreeNode[Token], value: int) -> bool:
+    t = node.data
+    return (
+            not node.descendants
+            and t.type is TokenType.LITERAL
+            and type(t.value) is int
+            and t.value == value
+    )
+
+
+def is_numeric(node: TreeNode[Token], operands: List[bool]) -> bool:
+    """
+    Whether `node` is known to evaluate to an int or float (never a bool),
+    given the same for its operands. Identifiers are of unknown type here;
+    optimize decides what to assume about them.
+    """
+    t = node.data
+    if not node.descendants:
+        return t.type is TokenType.LITERAL and type(t.value) in (int, float)
+    if node.size == 1:
+        return t.value == Operators.MINUS and operands[0]
+    return t.value in ARITHMETIC and all(operands)
+
+
+def is_literal(node: TreeNode[Token]) -> bool:
+    return not node.descendants and node.data.type is TokenType.LITERAL
+
+
+def is_boolean(node: TreeNode[Token]) -> bool:
+    t = node.data
+    if is_literal(node):
+        return isinstance(t.value, bool)
+    if node.size == 2:
+        return t.value in COMPARISONS
+    return node.size == 1 and t.value == Operators.NOT
+
+
+def constant(value) -> TreeNode[Token]:
+    # Token.create reads a str as an identifier
+    return TreeNode(Token.from_literal(value) if isinstance(value, str) else Token.create(value))
+
+
+def simplify_unary(node: TreeNode[Token], operand: TreeNode[Token]) -> TreeNode[Token]:
+    op = node.data.value
+    if is_literal(operand):
+        try:
+            return constant(UNARY_FUNCTIONS[op](operand.data.value))
+        except TypeError:
+            pass
+
+    # NOT NOT x is x only when x is already a boolean
+    if op == Operators.NOT and operand.size == 1 and operand.data.value == Operators.NOT \
+            and is_boolean(operand.descendants[0]):
+        return operand.descendants[0]
+
+    folded = TreeNode(node.data)
+    folded.add(operand)
+    return folded
+
+
+def simplify_binary(
+        node: TreeNode[Token],
+        left: TreeNode[Token],
+        right: TreeNode[Token],
+        left_numeric: bool,
+        right_numeric: bool
+) -> TreeNode[Token]:
+    op = node.data.value
+    if is_literal(left) and is_literal(right):
+        try:
+            return constant(BINARY_FUNCTIONS[op](left.data.value, right.data.value))
+        except (ArithmeticError, TypeError):
+            pass
+
+    # `True + 0` is 1 and `'ab' * 1` is fine but `'ab' + 0` is an error, so
+    # an identity holds only for an int literal and an operand known numeric
+    if op == Operators.PLUS:
+        if is_int(right, 0) and left_numeric:
+            return left
+        if is_int(left, 0) and right_numeric:
+            return right
+    elif op == Operators.MINUS and is_int(right, 0) and left_numeric:
+        return left
+    elif op == Operators.MULTIPLY:
+        if is_int(right, 1) and left_numeric:
+            return left
+        if is_int(left, 1) and right_numeric:
+            return right
+
+    folded = TreeNode(node.data)
+    folded.add(left)
+    folded.add(right)
+    return folded
+
+
+def optimize(tree: TreeNode[Token], numeric_identifiers: bool = True) -> TreeNode[Token]:
+    """
+    Folds constant subtrees, drops grouping nodes and applies `x + 0`,
+    `0 + x`, `x - 0`, `x * 1`, `1 * x` (int literals, x known to be numeric)
+    and `NOT NOT <boolean>` in one post-order pass. Returns a new tree;
+    leaves are shared with the input. Folds that raise, such as division
+    by a literal zero or an int too large for a float, are left in place
+    to fail at evaluation.
+
+    Identifiers count as numeric: columns used in arithmetic are assumed to
+    hold ints or floats. With a bool or string column `flag + 0` would be
+    simplified to `flag` rather than give 1 or fail, so pass
+    `numeric_identifiers=False` when rows may hold such values.
+    """
+    results: List[TreeNode[Token]] = []
+    # whether each entry of `results` is known to be numeric; simplifying
+    # never changes that, so it is decided on the input node
+    numeric: List[bool] = []
+
+    for node in postorder(tree):
+        if not node.descendants:
+            results.append(node)
+            numeric.append(numeric_identifiers and node.data.type is TokenType.IDENTIFIER or is_numeric(node, []))
+        elif is_paren(node.data):
+            continue
+        elif node.size == 1:
+            numeric.append(is_numeric(node, [numeric.pop()]))
+            results.append(simplify_unary(node, results.pop()))
+        else:
+            operands = numeric[-2:]
+            del numeric[-2:]
+            numeric.append(is_numeric(node, operands))
+            right = results.pop()
+            results.append(simplify_binary(node, results.pop(), right, *operands))
+
+    return results.pop()
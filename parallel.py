@@ -0,0 +1,95 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from parser import parse_flat
+from scaner import Token
+from token_buffer import scan_buffer
+from tree import FlatTree
+
+ParsedExpression = FlatTree[Token]
+
+
+def parse_chunk(texts: List[str]) -> List[ParsedExpression]:
+    """
+    Worker entry point. Results are FlatTrees over TokenBuffers, which pickle
+    as a handful of arrays plus the source text instead of an object graph.
+    """
+    return [parse_flat(scan_buffer(text)) for text in texts]
+
+
+def chunked(texts: Iterable[str], chunksize: int) -> Iterator[List[str]]:
+    iterator = iter(texts)
+    while chunk := list(islice(iterator, chunksize)):
+        yield chunk
+
+
+def parse_many(
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunksize: int = 256,
+        ordered: bool = True
+) -> Iterator[Union[ParsedExpression, Tuple[int, ParsedExpression]]]:
+    """
+    Scans and parses independent expressions across a process pool.
+
+    Yields FlatTrees in input order, or `(index, tree)` pairs as chunks finish
+    when `ordered` is false; call `to_node()` on a result for a TreeNode.
+    `texts` is consumed lazily with at most two chunks per worker in flight,
+    so arbitrarily long inputs run in bounded memory. A ValueError from any
+    expression is raised from the iterator.
+    """
+    if chunksize <= 0:
+        raise ValueError(f"Chunk size must be positive: {chunksize}")
+
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(texts, chunksize)
+
+    if workers == 1:
+        index = 0
+        for chunk in chunks:
+            for tree in parse_chunk(chunk):
+                yield tree if ordered else (index, tree)
+                index += 1
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        max_in_flight = workers * 2
+        if ordered:
+            yield from collect_ordered(executor, chunks, max_in_flight)
+        else:
+            yield from collect_completed(executor, chunks, max_in_flight)
+
+
+def collect_ordered(executor: ProcessPoolExecutor, chunks: Iterator[List[str]], max_in_flight: int):
+    in_flight: deque[Future] = deque()
+    for chunk in chunks:
+        in_flight.append(executor.submit(parse_chunk, chunk))
+        if len(in_flight) >= max_in_flight:
+            yield from in_flight.popleft().result()
+
+    while in_flight:
+        yield from in_flight.popleft().result()
+
+
+def collect_completed(executor: ProcessPoolExecutor, chunks: Iterator[List[str]], max_in_flight: int):
+    in_flight = {}
+    offset = 0
+
+    def drain():
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            start = in_flight.pop(future)
+            for i, tree in enumerate(future.result()):
+                yield start + i, tree
+
+    for chunk in chunks:
+        in_flight[executor.submit(parse_chunk, chunk)] = offset
+        offset += len(chunk)
+        if len(in_flight) >= max_in_flight:
+            yield from drain()
+
+    while in_flight:
+        yield from drain()
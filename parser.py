@@ -1,11 +1,13 @@
+import time
 from enum import Enum, auto
-from typing import Sequence, List
+from typing import Sequence, List, Tuple
 
 from cursor import Cursor
+from instrumentation import HOOKS, PARSE, CallStats, emit
 from scaner import Token, Operators, TokenType
-from tree import TreeNode
+from tree import TreeNode, FlatTree, preorder, height, height_flat
 
-# TARGET RULES:
+# TARGET RULES (equality..factor are driven by BINARY_OPERATORS):
 
 # expression→ equality ;
 # equality→ comparison ( ( "!=" | "==" ) comparison )* ;
@@ -13,7 +15,7 @@ from tree import TreeNode
 # term→ factor ( ( "-" | "+" ) factor )* ;
 # factor→ unary ( ( "/" | "*" ) unary )* ;
 # unary→ ( "!" | "-" ) unary | primary ;
-# primary → NUMBER | STRING | "true" | "false" | "nil" | "(" expression ")" ;
+# primary → NUMBER | STRING | "true" | "false" | "nil" | IDENTIFIER | "(" expression ")" ;
 
 
 class ExpressionType(Enum):
@@ -21,113 +23,71 @@ class ExpressionType(Enum):
     GROUPING = auto()
     LITERAL = auto()
     UNARY = auto()
+    IDENTIFIER = auto()
+    ERROR = auto()
 
 
-def match_any(cur: Cursor[Token], operators: List[Operators]) -> bool:
-    if not cur.peek():
-        return False
-    for operator in operators:
-        if (t := cur.peek()) and t.value == operator:
-            cur.next()
-            return True
-    return False
-
-
-def parse_expression(cur: Cursor[Token]) -> TreeNode[Token]:
-    return parse_equality(cur)
-
+class Associativity(Enum):
+    LEFT = auto()
+    RIGHT = auto()
 
-def parse_equality(cur: Cursor[Token]) -> TreeNode[Token]:
-    """
-    == !+
-    """
 
-    left = parse_comparison(cur)
+# operator -> (precedence, associativity); higher binds tighter
+BINARY_OPERATORS = {
+    Operators.EQUAL: (1, Associativity.LEFT),
+    Operators.NOT_EQUAL: (1, Associativity.LEFT),
+    Operators.LESS: (2, Associativity.LEFT),
+    Operators.LESS_OR_EQUAL: (2, Associativity.LEFT),
+    Operators.GREATER: (2, Associativity.LEFT),
+    Operators.GREATER_OR_EQUAL: (2, Associativity.LEFT),
+    Operators.PLUS: (3, Associativity.LEFT),
+    Operators.MINUS: (3, Associativity.LEFT),
+    Operators.DIVIDE: (4, Associativity.LEFT),
+    Operators.MULTIPLY: (4, Associativity.LEFT),
+}
 
-    while match_any(cur, operators=[Operators.EQUAL, Operators.NOT_EQUAL]):
-        equality = TreeNode(cur.previous())
+UNARY_OPERATORS = {
+    Operators.NOT: 5,
+    Operators.MINUS: 5,
+}
 
-        right = parse_comparison(cur)
-        equality.add(left)
-        equality.add(right)
 
-        return equality
-
-    return left
-
-
-def parse_comparison(cur: Cursor[Token]) -> TreeNode[Token]:
+def parse_expression(cur: Cursor[Token], min_precedence: int = 0) -> TreeNode[Token]:
     """
-    < <= > >=
+    Precedence climbing over BINARY_OPERATORS: one loop iteration per operator,
+    recursion only for the right operand.
     """
+    left = parse_unary(cur)
 
-    left = parse_term(cur)
-
-    while match_any(cur, operators=[
-        Operators.LESS,
-        Operators.LESS_OR_EQUAL,
-        Operators.GREATER,
-        Operators.LESS_OR_EQUAL
-    ]):
-        comparison = TreeNode(cur.previous())
-
-        right = parse_term(cur)
-        comparison.add(left)
-        comparison.add(right)
-
-        return comparison
-
-    return left
-
-
-def parse_term(cur: Cursor[Token]) -> TreeNode[Token]:
-    """
-    + -
-    """
-    left = parse_factor(cur)
-
-    while match_any(cur, operators=[
-        Operators.PLUS,
-        Operators.MINUS]
+    while (
+            (t := cur.peek()) is not None
+            and t.type is TokenType.OPERATOR
+            and (binding := BINARY_OPERATORS.get(t.value))
     ):
-        term = TreeNode(cur.previous())
-
-        right = parse_factor(cur)
-        term.add(left)
-        term.add(right)
+        precedence, associativity = binding
+        if precedence < min_precedence:
+            break
 
-        return term
-    return left
-
-
-def parse_factor(cur: Cursor[Token]) -> TreeNode[Token]:
-    """
-    / *
-    """
-    left = parse_unary(cur)
+        cur.next()
+        node = TreeNode(t)
 
-    while match_any(cur, operators=[
-        Operators.DIVIDE,
-        Operators.MULTIPLY
-    ]):
-        factor = TreeNode(cur.previous())
+        next_precedence = precedence + 1 if associativity == Associativity.LEFT else precedence
+        right = parse_expression(cur, next_precedence)
+        node.add(left)
+        node.add(right)
 
-        right = parse_unary(cur)
-        factor.add(left)
-        factor.add(right)
+        left = node
 
-        return factor
     return left
 
 
 def parse_unary(cur: Cursor[Token]) -> TreeNode[Token]:
-    if match_any(cur, operators=[
-        Operators.NOT,
-        Operators.MINUS
-    ]):
-        unary = TreeNode(cur.previous())
+    t = cur.peek()
+    if t is not None and t.type is TokenType.OPERATOR and t.value in UNARY_OPERATORS:
+        cur.next()
+        unary = TreeNode(t)
 
-        right = parse_unary(cur)
+        right = parse_expression(cur, UNARY_OPERATORS[t.value])
         unary.add(right)
 
         return unary
@@ -136,8 +96,10 @@ def parse_unary(cur: Cursor[Token]) -> TreeNode[Token]:
 
 def parse_primary(cur: Cursor[Token]) -> TreeNode[Token]:
     t = cur.peek()
+    if t is None:
+        raise ValueError("Unexpected end of input")
 
-    if t.type == TokenType.LITERAL:
+    if t.type == TokenType.LITERAL or t.type == TokenType.IDENTIFIER:
         cur.next()
         return TreeNode(cur.previous())
 
@@ -152,10 +114,164 @@ def parse_primary(cur: Cursor[Token]) -> TreeNode[Token]:
 
         return group
 
+    raise ValueError(f"Unexpected token: {t}")
+
+
+class TreeNodeBuilder:
+    def node(self, kind: ExpressionType, index: int, t: Token) -> TreeNode[Token]:
+        return TreeNode(t)
+
+    def link(self, parent: TreeNode[Token], children: Sequence[TreeNode[Token]]) -> None:
+        parent.descendants.extend(children)
+
+    def finish(self, root: TreeNode[Token]) -> TreeNode[Token]:
+        return root
+
+
+class FlatTreeBuilder:
+    def __init__(self, tokens: Sequence[Token]):
+        self.tree = FlatTree(tokens)
+
+    def node(self, kind: ExpressionType, index: int, t: Token) -> int:
+        return self.tree.add(kind.value, index)
+
+    def link(self, parent: int, children: Sequence[int]) -> None:
+        self.tree.link(parent, children)
+
+    def finish(self, root: int) -> FlatTree[Token]:
+        self.tree.root = root
+        return self.tree
+
+
+def parse_expression_iterative(cur: Cursor[Token], builder=None):
+    """
+    Same grammar and trees as parse_expression, driven by explicit operand and
+    operator stacks so nesting depth is bounded by memory, not the recursion
+    limit. Each pending operator keeps the minimum precedence its right
+    operand accepts, exactly like a parse_expression frame would.
+
+    Nodes are created through `builder` (TreeNode by default), which lets
+    parse_flat emit straight into a FlatTree arena.
+    """
+    builder = builder or TreeNodeBuilder()
+    make, link = builder.node, builder.link
+
+    operands = []
+    # (min_precedence, node, arity); arity 0 marks an open paren
+    pending: List[Tuple[int, object, int]] = []
+    right_paren = Token.create(Operators.RIGHT_PAREN)
+
+    def reduce(precedence: int) -> None:
+        while pending and pending[-1][2] and pending[-1][0] > precedence:
+            _, node, arity = pending.pop()
+            if arity == 2:
+                right = operands.pop()
+                link(node, (operands.pop(), right))
+            else:
+                link(node, (operands.pop(),))
+            operands.append(node)
+
+    while True:
+        # operand position: prefix operators and parens stack up until a literal
+        t = cur.peek()
+        if t is None:
+            raise ValueError("Unexpected end of input")
+
+        index = cur.current
+        if t.type is TokenType.LITERAL:
+            cur.next()
+            operands.append(make(ExpressionType.LITERAL, index, t))
+        elif t.type is TokenType.IDENTIFIER:
+            cur.next()
+            operands.append(make(ExpressionType.IDENTIFIER, index, t))
+        elif t.type is TokenType.OPERATOR and t.value in UNARY_OPERATORS:
+            cur.next()
+            pending.append((UNARY_OPERATORS[t.value], make(ExpressionType.UNARY, index, t), 1))
+            continue
+        elif t.type is TokenType.OPERATOR and t.value == Operators.LEFT_PAREN:
+            cur.next()
+            pending.append((0, make(ExpressionType.GROUPING, index, t), 0))
+            continue
+        else:
+            raise ValueError(f"Unexpected token: {t}")
+
+        # operator position: binary operators, closing parens or the end
+        while True:
+            t = cur.peek()
+            binding = BINARY_OPERATORS.get(t.value) \
+                if t is not None and t.type is TokenType.OPERATOR else None
+
+            if binding:
+                precedence, associativity = binding
+                reduce(precedence)
+                index = cur.current
+                cur.next()
+                next_precedence = precedence + 1 if associativity == Associativity.LEFT else precedence
+                pending.append((next_precedence, make(ExpressionType.BINARY, index, t), 2))
+                break
+
+            reduce(-1)
+            if not pending:
+                return builder.finish(operands.pop())
+
+            _, group, _ = pending.pop()
+            cur.consume(right_paren)
+            link(group, (operands.pop(),))
+            operands.append(group)
+
+
+def expression_type(node: TreeNode[Token]) -> ExpressionType:
+    t = node.data
+    if not isinstance(t, Token):
+        return ExpressionType.ERROR
+    if t.type is TokenType.OPERATOR and t.value == Operators.LEFT_PAREN:
+        return ExpressionType.GROUPING
+    if node.size == 2:
+        return ExpressionType.BINARY
+    if node.size == 1:
+        return ExpressionType.UNARY
+    if t.type is TokenType.IDENTIFIER:
+        return ExpressionType.IDENTIFIER
+    return ExpressionType.LITERAL
+
+
+def to_flat(node: TreeNode[Token]) -> FlatTree[Token]:
+    return FlatTree.from_node(node, kind_of=lambda n: expression_type(n).value)
+
+
+def expect_end(cur: Cursor[Token]) -> None:
+    if (t := cur.peek()) is not None:
+        raise ValueError(f"Unexpected token: {t}")
+
+
+def parse(tokens: Sequence[Token], iterative: bool = False) -> TreeNode[Token]:
+    started = time.perf_counter() if HOOKS else 0.0
+
+    cur = Cursor(tokens)
+    tree = parse_expression_iterative(cur) if iterative else parse_expression(cur)
+    expect_end(cur)
+
+    if HOOKS:
+        seconds = time.perf_counter() - started
+        nodes = sum(1 for _ in preorder(tree))
+        emit(CallStats(PARSE, seconds, tokens=cur.current, nodes=nodes, max_depth=height(tree)))
+    return tree
+
+
+def parse_flat(tokens: Sequence[Token]) -> FlatTree[Token]:
+    """
+    Parses straight into a FlatTree whose items index `tokens`.
+    """
+    started = time.perf_counter() if HOOKS else 0.0
 
-def parse(tokens: Sequence[Token]) -> TreeNode[Token]:
     cur = Cursor(tokens)
-    return parse_expression(cur)
+    tree = parse_expression_iterative(cur, FlatTreeBuilder(tokens))
+    expect_end(cur)
+
+    if HOOKS:
+        seconds = time.perf_counter() - started
+        emit(CallStats(PARSE, seconds, tokens=cur.current, nodes=len(tree), max_depth=height_flat(tree)))
+    return tree
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from cursor import Cursor
+from diagnostics import Diagnostic
+from parser import BINARY_OPERATORS, UNARY_OPERATORS, Associativity
+from scaner import Token, TokenType, Operators
+from tree import TreeNode
+
+
+@dataclass
+class ParseResult:
+    tree: Optional[TreeNode]
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.diagnostics
+
+
+def is_error(node: TreeNode) -> bool:
+    return isinstance(node.data, Diagnostic)
+
+
+def is_operator(t: Optional[Token], op: Operators) -> bool:
+    return t is not None and t.type is TokenType.OPERATOR and t.value == op
+
+
+class RecoveringParser:
+    """
+    Same grammar and trees as parse_expression_iterative, but problems are
+    recorded instead of raised. A missing operand becomes an error node
+    holding its Diagnostic; after an unexpected token the parser
+    resynchronizes at the closing paren of the enclosing group or, at the
+    top level, at the end of the statement. Nesting is kept on explicit
+    stacks, so depth is bounded by memory, and every token is looked at once.
+    """
+
+    def __init__(self, tokens: Sequence[Token]):
+        self.tokens = tokens
+        self.cur = Cursor(tokens)
+        self.diagnostics: List[Diagnostic] = []
+        self._span = getattr(tokens, 'span', None)
+
+    def error(self, message: str, index: int) -> TreeNode[Diagnostic]:
+        span = None
+        if self._span is not None and len(self.tokens):
+            if index < len(self.tokens):
+                span = self._span(index)
+            else:
+                end = self._span(len(self.tokens) - 1)[1]
+                span = (end, end)
+
+        diagnostic = Diagnostic(message, index, span)
+        self.diagnostics.append(diagnostic)
+        return TreeNode(diagnostic)
+
+    def parse(self) -> ParseResult:
+        cur, error = self.cur, self.error
+
+        operands: List[TreeNode] = []
+        # (min_precedence, node, arity, token index); arity 0 marks an open paren
+        pending: List[Tuple[int, TreeNode, int, int]] = []
+        groups = 0
+
+        def reduce(precedence: int) -> None:
+            while pending and pending[-1][2] and pending[-1][0] > precedence:
+                _, node, arity, _ = pending.pop()
+                if arity == 2:
+                    right = operands.pop()
+                    node.descendants.extend((operands.pop(), right))
+                else:
+                    node.add(operands.pop())
+                operands.append(node)
+
+        while True:
+            # operand position
+            t = cur.peek()
+            index = cur.current
+            if t is None:
+                operands.append(error("Unexpected end of input", index))
+            elif t.type is TokenType.LITERAL or t.type is TokenType.IDENTIFIER:
+                cur.next()
+                operands.append(TreeNode(t))
+            elif t.type is TokenType.OPERATOR and t.value in UNARY_OPERATORS:
+                cur.next()
+                pending.append((UNARY_OPERATORS[t.value], TreeNode(t), 1, index))
+                continue
+            elif is_operator(t, Operators.LEFT_PAREN):
+                cur.next()
+                pending.append((0, TreeNode(t), 0, index))
+                groups += 1
+                continue
+            elif t.type is TokenType.OPERATOR and (
+                    t.value in BINARY_OPERATORS or groups and t.value == Operators.RIGHT_PAREN
+            ):
+                # leave the operator or closing paren in place, so the rest
+                # of the expression still parses around the missing operand
+                operands.append(error(f"Expected operand before {t}", index))
+            else:
+                cur.next()
+                operands.append(error(f"Unexpected token: {t}", index))
+
+            # operator position
+            while True:
+                t = cur.peek()
+                if is_operator(t, Operators.RIGHT_PAREN) and not groups:
+                    error(f"Unmatched {t}", cur.current)
+                    cur.next()
+                    continue
+
+                binding = BINARY_OPERATORS.get(t.value) \
+                    if t is not None and t.type is TokenType.OPERATOR else None
+                if binding:
+                    precedence, associativity = binding
+                    reduce(precedence)
+                    cur.next()
+                    next_precedence = precedence + 1 if associativity == Associativity.LEFT else precedence
+                    pending.append((next_precedence, TreeNode(t), 2, cur.current - 1))
+                    break
+
+                reduce(-1)
+                if not pending:
+                    if t is not None:
+                        error(f"Unexpected token: {t}", cur.current)
+                        cur.current = cur.total
+                    return ParseResult(operands.pop(), self.diagnostics)
+
+                _, group, _, opening = pending.pop()
+                groups -= 1
+                if is_operator(t, Operators.RIGHT_PAREN):
+                    cur.next()
+                elif t is None:
+                    error(f"Unclosed {group.data}", opening)
+                else:
+                    error(f"Expected {Operators.RIGHT_PAREN} but found: {t}", cur.current)
+                    self.skip_group()
+                group.add(operands.pop())
+                operands.append(group)
+
+    def skip_group(self) -> None:
+        """
+        Skips to just past the paren closing the current group.
+        """
+        cur = self.cur
+        nested = 0
+        while (t := cur.peek()) is not None:
+            cur.next()
+            if is_operator(t, Operators.LEFT_PAREN):
+                nested += 1
+            elif is_operator(t, Operators.RIGHT_PAREN):
+                if not nested:
+                    return
+                nested -= 1
+
+
+def parse_recovering(tokens: Sequence[Token]) -> ParseResult:
+    """
+    Parses `tokens` without stopping at the first problem: the tree contains
+    error nodes where operands are missing and `diagnostics` lists every
+    problem in order. An empty `diagnostics` means `tree` equals parse(tokens).
+    """
+    return RecoveringParser(tokens).parse()
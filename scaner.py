@@ -1,10 +1,15 @@
 import logging
+import re
+import time
 from dataclasses import dataclass
 from enum import auto
-from functools import lru_cache
-from typing import Union, List, Optional
+from functools import partial
+from typing import Union, List, Optional, Iterator, Iterable, TextIO
 
-from cursor import Cursor
+from cursor import StrCursor
+from instrumentation import HOOKS, SCAN, CallStats, emit
+from interning import InternPool
+from sql_keywords import RESERVED, NON_RESERVED, lookup
 from utils import BaseEnum
 
 LOGGER = logging.getLogger(__name__)
@@ -12,6 +17,7 @@ LOGGER = logging.getLogger(__name__)
 
 class TerminalCharacter(BaseEnum):
     SPACE = ' '
+    EXCLAMATION_MARK = '!'
     DOUBLE_QUOTE = '"'
     PERCENT = '%'
     AMPERSAND = '&'
@@ -55,25 +61,34 @@ class Operators(BaseEnum):
     ASSIGN = "="
     LEFT_PAREN = "("
     RIGHT_PAREN = ")"
+    COMMA = ","
+    SEMICOLON = ";"
+    PERIOD = "."
 
     def __repr__(self):
         return self.value
 
 
-class Keywords(BaseEnum):
-    SELECT = auto()
+# Every SQL:2003 key word, named and valued by its spelling.
+Keywords = BaseEnum('Keywords', [(word, word) for word in RESERVED + NON_RESERVED], module=__name__)
+
+# Key words the grammar gives a meaning of their own, scanned as KEYWORD
+# tokens. Every other key word, reserved or not, stays an identifier: words
+# such as `value`, `date` or `user` are common column names in expressions.
+GRAMMAR_KEYWORDS = frozenset({"SELECT"})
 
 
 class TokenType(BaseEnum):
     LITERAL = auto()
     OPERATOR = auto()
     KEYWORD = auto()
+    IDENTIFIER = auto()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Token:
     type: TokenType
-    value: Union[Operators, Keywords, int, float, bool]
+    value: Union[Operators, Keywords, int, float, bool, str]
 
     @staticmethod
     def from_operator(value):
@@ -84,8 +99,15 @@ class Token:
         return Token(TokenType.LITERAL, value)
 
     @staticmethod
-    @lru_cache(maxsize=None)
-    def create(value) -> 'Token':
+    def from_keyword(value):
+        return Token(TokenType.KEYWORD, value)
+
+    @staticmethod
+    def from_identifier(value):
+        return Token(TokenType.IDENTIFIER, value)
+
+    @staticmethod
+    def new(value) -> 'Token':
         if isinstance(value, Operators):
             return Token.from_operator(value)
 
@@ -96,11 +118,43 @@ class Token:
         ):
             return Token.from_literal(value)
 
+        if isinstance(value, Keywords):
+            return Token.from_keyword(value)
+
+        if isinstance(value, str):
+            return Token.from_identifier(value)
+
+    @staticmethod
+    def create(value) -> 'Token':
+        """
+        Shared token for `value`: operators, booleans and key words are
+        flyweights, numbers and identifiers come from TOKEN_POOL. Keys carry
+        the type so `1`, `1.0` and `True` stay apart. A str is an identifier;
+        string literals are built with from_literal and not pooled.
+        """
+        key = (type(value), value)
+        if (token := FLYWEIGHTS.get(key)) is not None:
+            return token
+        return TOKEN_POOL.intern(key, new_token)
+
     def __repr__(self):
         return f"`{self.value.__repr__()}` : {self.type.__repr__()}"
 
 
-def get_token(cur: Cursor[str]) -> Optional[Token]:
+def new_token(key) -> Token:
+    return Token.new(key[1])
+
+
+FLYWEIGHTS = {
+    (type(value), value): Token.new(value)
+    for value in (*Operators, *Keywords, True, False)
+}
+
+# numbers and identifiers; resize for long-running processes as needed
+TOKEN_POOL: InternPool = InternPool(capacity=4096)
+
+
+def get_token(cur: StrCursor) -> Optional[Token]:
     match cur.peek():
         case TerminalCharacter.PLUS:
             cur.next()
@@ -116,87 +170,247 @@ def get_token(cur: Cursor[str]) -> Optional[Token]:
             return Token.create(Operators.DIVIDE)
         case TerminalCharacter.LESS_THAN:
             cur.next()
+            if cur.advance_if(TerminalCharacter.GREATER_THAN.value):
+                return Token.create(Operators.NOT_EQUAL)
             op = Operators.LESS_OR_EQUAL if cur.advance_if(TerminalCharacter.EQUALS.value) else Operators.LESS
             return Token.create(op)
         case TerminalCharacter.GREATER_THAN:
             cur.next()
-            op = Operators.GREATER_OR_EQUAL if cur.advance_if(TerminalCharacter.EQUALS.value) else Operators.LESS
+            op = Operators.GREATER_OR_EQUAL if cur.advance_if(TerminalCharacter.EQUALS.value) else Operators.GREATER
             return Token.create(op)
         case TerminalCharacter.EQUALS:
             cur.next()
             op = Operators.EQUAL if cur.advance_if(TerminalCharacter.EQUALS.value) else Operators.ASSIGN
             return Token.create(op)
+        case TerminalCharacter.EXCLAMATION_MARK:
+            cur.next()
+            if not cur.advance_if(TerminalCharacter.EQUALS.value):
+                raise ValueError(f"Unknown token: `{TerminalCharacter.EXCLAMATION_MARK}`")
+            return Token.create(Operators.NOT_EQUAL)
         case TerminalCharacter.LEFT_PAREN:
             cur.next()
             return Token.create(Operators.LEFT_PAREN)
         case TerminalCharacter.RIGHT_PAREN:
             cur.next()
             return Token.create(Operators.RIGHT_PAREN)
-        case c if c.isdigit():
+        case TerminalCharacter.COMMA:
+            cur.next()
+            return Token.create(Operators.COMMA)
+        case TerminalCharacter.SEMICOLON:
+            cur.next()
+            return Token.create(Operators.SEMICOLON)
+        case TerminalCharacter.PERIOD:
+            cur.next()
+            return Token.create(Operators.PERIOD)
+        case TerminalCharacter.QUOTE:
+            return Token.from_literal(scan_string(cur))
+        case c if DIGIT.fullmatch(c):
             return Token.create(scan_number(cur))
         case c if c.isalpha():
-            text = scan_alpha_numeric(cur)
-            if text.upper() in Keywords:
-                return Token.create(Keywords(text.upper()))
-            return Token.create(cast_boolean(text))
-        case TerminalCharacter.SPACE:
-            cur.next()
+            return scan_word(scan_alpha_numeric(cur))
+        case c if c.isspace():
+            cur.take_while(WHITESPACE)
             return None
         case c:
             raise ValueError(f"Unknown token: `{c}`")
 
 
-def scan_number(cur: Cursor[str]) -> Union[int, float]:
-    num = ''
+# character classes of the runs the character scanner consumes in bulk;
+# str.isdigit and \d would also take digits such as '²' and '٣'
+DIGIT = re.compile(r"[0-9]")
+DIGIT_OR_POINT = re.compile(r"[0-9.]")
+LETTER = re.compile(r"[A-Za-z]")
+WORD_CHAR = re.compile(r"[A-Za-z0-9_]")
+WHITESPACE = re.compile(r"\s")
+
 
-    is_digit = lambda: c.isdigit() if (c := cur.peek()) else False
-    is_point = lambda: c == TerminalCharacter.PERIOD if (c := cur.peek()) else False
+def scan_number(cur: StrCursor) -> Union[int, float]:
+    start, end = cur.take_while(DIGIT_OR_POINT)
+    return cast_number(cur.slice(start, end))
 
-    is_float = False
-    while (has_point := is_point()) or is_digit():
-        is_float |= has_point
-        num += cur.advance()
 
-    return float(num) if is_float else int(num)
+def scan_alpha_numeric(cur: StrCursor) -> str:
+    if (c := cur.peek()) is None or not LETTER.fullmatch(c):
+        raise ValueError(f"Unknown token: `{c}`")
 
+    start = cur.current
+    cur.next()
+    _, end = cur.take_while(WORD_CHAR)
+    return cur.slice(start, end)
 
-def scan_alpha_numeric(cur: Cursor[str]) -> str:
-    text = ''
 
-    is_letter = lambda: (65 <= ord(c) <= 90) or (97 <= ord(c) <= 122) \
-        if (c := cur.peek()) else False
+def scan_string(cur: StrCursor) -> str:
+    start = cur.current
+    cur.next()
+    # a doubled quote stands for one quote and does not end the literal
+    while cur.skip_to(TerminalCharacter.QUOTE.value):
+        cur.next()
+        if not cur.advance_if(TerminalCharacter.QUOTE.value):
+            break
+    return cast_string(cur.slice(start, cur.current))
 
-    while is_letter():
-        text += cur.advance()
 
-    return text
+BOOLEANS = {
+    "TRUE": True,
+    "FALSE": False
+}
+
+
+def scan_word(text: str) -> Token:
+    word = lookup(text)
+    if word is None:
+        return Token.create(text)
+    if word == Operators.NOT.value:
+        return Token.create(Operators.NOT)
+    if word in BOOLEANS:
+        return Token.create(BOOLEANS[word])
+    if word in GRAMMAR_KEYWORDS:
+        return Token.create(Keywords[word])
+    return Token.create(text)
+
+
+def cast_number(raw_number: str) -> Union[int, float]:
+    if TerminalCharacter.PERIOD.value in raw_number:
+        return float(raw_number)
+    return int(raw_number)
+
+
+def cast_string(raw_string: str) -> str:
+    """
+    Value of a quoted string literal: quotes stripped, `''` read as `'`.
+    """
+    quote = TerminalCharacter.QUOTE.value
+    if len(raw_string) < 2 or raw_string.count(quote) % 2:
+        raise ValueError(f"Unterminated string literal: `{raw_string}`")
+    return raw_string[1:-1].replace(quote * 2, quote)
 
 
 def cast_boolean(raw_bool: str) -> bool:
-    normalized_raw = raw_bool.lower()
-    booleans = {
-        "true": True,
-        "false": False
-    }
-    if normalized_raw not in booleans:
+    normalized_raw = raw_bool.upper()
+    if normalized_raw not in BOOLEANS:
         raise ValueError(f"Invalid boolean value: {raw_bool}")
-    return booleans[normalized_raw]
+    return BOOLEANS[normalized_raw]
+
+
+# Single-pass lexer: one compiled master pattern with a named group per token
+# class, so the per-character work happens inside the regex engine.
+SCANNED_OPERATORS = (
+    Operators.PLUS,
+    Operators.MINUS,
+    Operators.MULTIPLY,
+    Operators.DIVIDE,
+    Operators.LESS,
+    Operators.LESS_OR_EQUAL,
+    Operators.GREATER,
+    Operators.GREATER_OR_EQUAL,
+    Operators.EQUAL,
+    Operators.NOT_EQUAL,
+    Operators.ASSIGN,
+    Operators.LEFT_PAREN,
+    Operators.RIGHT_PAREN,
+    Operators.COMMA,
+    Operators.SEMICOLON,
+    Operators.PERIOD,
+)
+
+# other spellings of scanned operators: SQL writes `!=` as `<>`
+OPERATOR_ALIASES = {"<>": Operators.NOT_EQUAL}
+
+OPERATOR_TOKENS = {op.value: Token.create(op) for op in SCANNED_OPERATORS}
+OPERATOR_TOKENS.update((alias, Token.create(op)) for alias, op in OPERATOR_ALIASES.items())
+
+TOKEN_PATTERN = re.compile(
+    r"(?P<NUMBER>[0-9][0-9.]*)"
+    r"|(?P<WORD>[A-Za-z][A-Za-z0-9_]*)"
+    r"|(?P<STRING>'[^']*(?:''[^']*)*'?)"
+    r"|(?P<OPERATOR>{})"
+    r"|(?P<SPACE>\s+)"
+    r"|(?P<UNKNOWN>.)".format(
+        '|'.join(re.escape(op) for op in sorted(OPERATOR_TOKENS, key=len, reverse=True))
+    ),
+    re.DOTALL
+)
+
+
+def tokenize(text: str) -> Iterator[Token]:
+    return tokenize_matches(TOKEN_PATTERN.finditer(text))
+
+
+def tokenize_matches(matches: Iterable[re.Match]) -> Iterator[Token]:
+    operator_tokens = OPERATOR_TOKENS
+    create = Token.create
+
+    for m in matches:
+        kind = m.lastgroup
+        if kind == 'SPACE':
+            continue
+
+        lexeme = m.group()
+        if kind == 'OPERATOR':
+            yield operator_tokens[lexeme]
+        elif kind == 'NUMBER':
+            yield create(cast_number(lexeme))
+        elif kind == 'WORD':
+            yield scan_word(lexeme)
+        elif kind == 'STRING':
+            yield Token.from_literal(cast_string(lexeme))
+        else:
+            raise ValueError(f"Unknown token: `{lexeme}`")
+
+
+# longest lexeme iter_scan carries over between chunks
+MAX_LEXEME = 1 << 20
+
+
+def iter_scan(
+        source: Union[TextIO, Iterable[str]],
+        chunk_size: int = 64 * 1024
+) -> Iterator[Token]:
+    """
+    Lazily scans a text file object or an iterable of text chunks.
+
+    The last lexeme of every chunk may continue in the next one (`12` + `3.4`,
+    `<` + `=`, `'it'` + `'s'`), so it is carried over instead of being emitted; only that tail
+    is kept in memory between reads. Trailing whitespace is dropped, and a
+    lexeme longer than MAX_LEXEME characters is an error.
+    """
+    if hasattr(source, 'read'):
+        empty = source.read(0)
+        if not isinstance(empty, str):
+            raise ValueError("iter_scan needs a text stream, open the file in text mode")
+        chunks = iter(partial(source.read, chunk_size), empty)
+    else:
+        chunks = source
+
+    pending = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+
+        matches = list(TOKEN_PATTERN.finditer(pending + chunk))
+        last = matches.pop()
+        pending = '' if last.lastgroup == 'SPACE' else last.group()
+        if len(pending) > MAX_LEXEME:
+            raise ValueError(f"Lexeme longer than {MAX_LEXEME} characters")
+
+        yield from tokenize_matches(matches)
+
+    if pending:
+        yield from tokenize(pending)
 
 
 def scan(text: str) -> List[Token]:
-    LOGGER.debug("Input: `{}`".format(text))
-
-    cur = Cursor(text)
-    tokens = []
+    LOGGER.debug("Input: `%s`", text)
 
-    while cur.has_any:
-        if t := get_token(cur):
-            tokens.append(t)
+    started = time.perf_counter() if HOOKS else 0.0
+    tokens = list(tokenize(text))
+    if HOOKS:
+        emit(CallStats(SCAN, time.perf_counter() - started, tokens=len(tokens)))
 
-    LOGGER.debug("Tokens: {}".format(tokens))
+    LOGGER.debug("Tokens: %s", tokens)
 
     return tokens
 
 
 def is_paren(token: Token) -> bool:
-    token.type == TokenType.OPERATOR and token.value.value == Operators.LEFT_PAREN
\ No newline at end of file
+    return token.type is TokenType.OPERATOR and token.value == Operators.LEFT_PAREN
@@ -0,0 +1,368 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import stat
+import struct
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from binary_ast import encode_tree, decode_tree
+from parser import parse_flat
+from scaner import Token
+from token_buffer import TokenBuffer, scan_buffer
+from tree import FlatTree, TreeNode
+
+# Wire protocol, both directions: u32 little endian body length, then the
+# body. Requests are an op byte followed by UTF-8 source text; responses are
+# a status byte followed by the payload. A connection carries one request at
+# a time, clients get concurrency from a pool of connections.
+#
+# SCAN payload: u32 token count, then the TokenBuffer kinds (u8 each), starts
+# and ends (i64 each). PARSE payload: one binary_ast record. ERROR payload: a
+# UTF-8 message.
+
+FRAME = struct.Struct('<I')
+COUNT = struct.Struct('<I')
+MAX_FRAME = 16 << 20
+
+SCAN = 1
+PARSE = 2
+OPS = (SCAN, PARSE)
+
+OK = 0
+ERROR = 1
+
+
+def encode_tokens(buffer: TokenBuffer) -> bytes:
+    return COUNT.pack(len(buffer)) + buffer.kinds.tobytes() \
+        + buffer.starts.tobytes() + buffer.ends.tobytes()
+
+
+def decode_tokens(text: str, payload: bytes) -> TokenBuffer:
+    count, = COUNT.unpack_from(payload)
+    buffer = TokenBuffer(text)
+    offset = COUNT.size
+    buffer.kinds.frombytes(payload[offset:offset + count])
+    offset += count
+    buffer.starts.frombytes(payload[offset:offset + count * 8])
+    offset += count * 8
+    buffer.ends.frombytes(payload[offset:offset + count * 8])
+    return buffer
+
+
+def process_request(op: int, text: str) -> Tuple[int, bytes]:
+    try:
+        buffer = scan_buffer(text)
+        if op == SCAN:
+            return OK, encode_tokens(buffer)
+        return OK, encode_tree(parse_flat(buffer))
+    except ValueError as e:
+        return ERROR, str(e).encode()
+
+
+def process_batch(requests: List[Tuple[int, str]]) -> List[Tuple[int, bytes]]:
+    """
+    Worker entry point: one round trip to the pool serves a whole micro-batch.
+    """
+    return [process_request(op, text) for op, text in requests]
+
+
+@dataclass
+class ServiceStats:
+    requests: int = 0
+    cache_hits: int = 0
+    batches: int = 0
+    batched_requests: int = 0
+
+
+class ParseServer:
+    """
+    Serves scan and parse requests over a Unix domain socket.
+
+    Requests from all connections queue up and are handed to the worker pool
+    in micro-batches of up to `batch_size`, collected for `batch_delay`
+    seconds after the first one arrives. Encoded responses of successful
+    requests are kept in one LRU cache shared by all clients, holding at most
+    `cache_size` entries and `cache_bytes` of request text plus response;
+    a single entry larger than `cache_bytes` is not cached. With `workers=1`
+    batches run on the event loop thread.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            workers: Optional[int] = None,
+            batch_size: int = 64,
+            batch_delay: float = 0.001,
+            cache_size: int = 1024,
+            cache_bytes: int = 64 << 20
+    ):
+        if batch_size <= 0:
+            raise ValueError(f"Batch size must be positive: {batch_size}")
+
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.cache_size = cache_size
+        self.cache_bytes = cache_bytes
+        self.cache: OrderedDict[Tuple[int, str], bytes] = OrderedDict()
+        self.cached_bytes = 0
+        self.stats = ServiceStats()
+
+        self.executor: Optional[Executor] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.tasks = set()
+        self.connections = set()
+
+    async def start(self) -> None:
+        await self.remove_stale_socket()
+
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.workers * 2)
+        if self.workers > 1:
+            # forked workers would inherit, and keep open, accepted client sockets
+            context = multiprocessing.get_context('forkserver')
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        self.spawn(self.batch_loop())
+        self.server = await asyncio.start_unix_server(self.handle, path=self.path)
+
+    async def remove_stale_socket(self) -> None:
+        """
+        Removes a socket left behind at `path` by a server that is gone.
+        Anything else there, or a server still answering, is an error.
+        """
+        try:
+            mode = os.lstat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise ValueError(f"Not a socket: {self.path}")
+
+        try:
+            _, writer = await asyncio.open_unix_connection(self.path)
+        except ConnectionRefusedError:
+            os.unlink(self.path)
+            return
+        writer.close()
+        raise ValueError(f"A server is already listening on {self.path}")
+
+    async def serve_forever(self) -> None:
+        await self.server.serve_forever()
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            for writer in self.connections:
+                writer.close()
+            await self.server.wait_closed()
+            self.server = None
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+        if os.path.exists(self.path) and stat.S_ISSOCK(os.lstat(self.path).st_mode):
+            os.unlink(self.path)
+
+    async def __aenter__(self) -> 'ParseServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def submit(self, op: int, text: str) -> Tuple[int, bytes]:
+        self.stats.requests += 1
+        key = (op, text)
+        if (payload := self.cache.get(key)) is not None:
+            self.cache.move_to_end(key)
+            self.stats.cache_hits += 1
+            return OK, payload
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((op, text, future))
+        return await future
+
+    async def batch_loop(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            if self.batch_delay:
+                await asyncio.sleep(self.batch_delay)
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            await self.slots.acquire()
+            self.spawn(self.run_batch(batch))
+
+    async def run_batch(self, batch) -> None:
+        try:
+            requests = [(op, text) for op, text, _ in batch]
+            if self.executor is None:
+                results = process_batch(requests)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(self.executor, process_batch, requests)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.slots.release()
+
+        self.stats.batches += 1
+        self.stats.batched_requests += len(batch)
+        for (op, text, future), (status, payload) in zip(batch, results):
+            if status == OK:
+                self.remember((op, text), payload)
+            if not future.done():
+                future.set_result((status, payload))
+
+    def remember(self, key: Tuple[int, str], payload: bytes) -> None:
+        size = len(key[1]) + len(payload)
+        if not self.cache_size or size > self.cache_bytes or key in self.cache:
+            return
+
+        self.cache[key] = payload
+        self.cached_bytes += size
+        while len(self.cache) > self.cache_size or self.cached_bytes > self.cache_bytes:
+            (_, text), evicted = self.cache.popitem(last=False)
+            self.cached_bytes -= len(text) + len(evicted)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections.add(writer)
+        try:
+            while True:
+                try:
+                    length, = FRAME.unpack(await reader.readexactly(FRAME.size))
+                    if not 0 < length <= MAX_FRAME:
+                        # the body is not read, so the stream cannot resync: reply and hang up
+                        message = f"Request frame of {length} bytes, must be 1 to {MAX_FRAME}"
+                        writer.write(FRAME.pack(len(message) + 1) + bytes((ERROR,)) + message.encode())
+                        await writer.drain()
+                        break
+                    body = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    break
+
+                op = body[0]
+                try:
+                    text = body[1:].decode()
+                except UnicodeDecodeError:
+                    status, payload = ERROR, b"Request text is not valid UTF-8"
+                else:
+                    if op in OPS:
+                        status, payload = await self.submit(op, text)
+                    else:
+                        status, payload = ERROR, f"Unknown op: {op}".encode()
+
+                writer.write(FRAME.pack(len(payload) + 1) + bytes((status,)) + payload)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+
+
+class ParseClient:
+    """
+    Client for ParseServer keeping up to `pool_size` open connections; each
+    connection serves one request at a time. Server-side scan and parse
+    errors, and requests too large for one frame, are raised as ValueError.
+    """
+
+    def __init__(self, path: str, pool_size: int = 8):
+        if pool_size <= 0:
+            raise ValueError(f"Pool size must be positive: {pool_size}")
+
+        self.path = path
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.slots = asyncio.Semaphore(pool_size)
+
+    async def request(self, op: int, text: str) -> bytes:
+        body = bytes((op,)) + text.encode()
+        if len(body) > MAX_FRAME:
+            raise ValueError(f"Request of {len(body)} bytes exceeds the {MAX_FRAME} byte frame limit")
+
+        async with self.slots:
+            connection = self.idle.pop() if self.idle else await asyncio.open_unix_connection(self.path)
+            reader, writer = connection
+            try:
+                writer.write(FRAME.pack(len(body)) + body)
+                await writer.drain()
+
+                length, = FRAME.unpack(await reader.readexactly(FRAME.size))
+                response = await reader.readexactly(length)
+            except BaseException:
+                writer.close()
+                raise
+            self.idle.append(connection)
+
+        if response[0] != OK:
+            raise ValueError(response[1:].decode())
+        return response[1:]
+
+    async def scan(self, text: str) -> TokenBuffer:
+        return decode_tokens(text, await self.request(SCAN, text))
+
+    async def parse_flat(self, text: str) -> FlatTree[Token]:
+        return decode_tree(await self.request(PARSE, text))
+
+    async def parse(self, text: str) -> TreeNode[Token]:
+        return (await self.parse_flat(text)).to_node()
+
+    async def close(self) -> None:
+        while self.idle:
+            _, writer = self.idle.pop()
+            writer.close()
+            await writer.wait_closed()
+
+    async def __aenter__(self) -> 'ParseClient':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+async def serve(path: str, **options) -> None:
+    async with ParseServer(path, **options) as server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = argparse.ArgumentParser(description="Scan and parse service on a Unix domain socket")
+    args.add_argument("socket", help="path of the Unix socket to listen on")
+    args.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args.add_argument("--batch-size", type=int, default=64)
+    args.add_argument("--batch-delay", type=float, default=0.001, help="seconds to collect a batch")
+    args.add_argument("--cache-size", type=int, default=1024, help="most cached responses")
+    args.add_argument("--cache-bytes", type=int, default=64 << 20, help="most request and response bytes cached")
+    options = args.parse_args(argv)
+
+    try:
+        asyncio.run(serve(
+            options.socket,
+            workers=options.workers,
+            batch_size=options.batch_size,
+            batch_delay=options.batch_delay,
+            cache_size=options.cache_size,
+            cache_bytes=options.cache_bytes,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
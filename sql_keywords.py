@@ -0,0 +1,109 @@
+from typing import Dict, List, Optional, Tuple
+
+# SQL:2003 (ISO/IEC 9075-2:2003, 5.2) key words. END-EXEC is left out: it is
+# not a single word token.
+RESERVED: Tuple[str, ...] = (
+    "ABS", "ALL", "ALLOCATE", "ALTER", "AND", "ANY", "ARE", "ARRAY", "AS", "ASENSITIVE", "ASYMMETRIC", "AT",
+    "ATOMIC", "AUTHORIZATION", "AVG", "BEGIN", "BETWEEN", "BIGINT", "BINARY", "BLOB", "BOOLEAN", "BOTH", "BY",
+    "CALL", "CALLED", "CARDINALITY", "CASCADED", "CASE", "CAST", "CEIL", "CEILING", "CHAR", "CHAR_LENGTH",
+    "CHARACTER", "CHARACTER_LENGTH", "CHECK", "CLOB", "CLOSE", "COALESCE", "COLLATE", "COLLECT", "COLUMN",
+    "COMMIT", "CONDITION", "CONNECT", "CONSTRAINT", "CONVERT", "CORR", "CORRESPONDING", "COUNT", "COVAR_POP",
+    "COVAR_SAMP", "CREATE", "CROSS", "CUBE", "CUME_DIST", "CURRENT", "CURRENT_DATE",
+    "CURRENT_DEFAULT_TRANSFORM_GROUP", "CURRENT_PATH", "CURRENT_ROLE", "CURRENT_TIME", "CURRENT_TIMESTAMP",
+    "CURRENT_TRANSFORM_GROUP_FOR_TYPE", "CURRENT_USER", "CURSOR", "CYCLE", "DATE", "DAY", "DEALLOCATE", "DEC",
+    "DECIMAL", "DECLARE", "DEFAULT", "DELETE", "DENSE_RANK", "DEREF", "DESCRIBE", "DETERMINISTIC", "DISCONNECT",
+    "DISTINCT", "DOUBLE", "DROP", "DYNAMIC", "EACH", "ELEMENT", "ELSE", "END", "ESCAPE", "EVERY", "EXCEPT",
+    "EXEC", "EXECUTE", "EXISTS", "EXP", "EXTERNAL", "EXTRACT", "FALSE", "FETCH", "FILTER", "FLOAT", "FLOOR",
+    "FOR", "FOREIGN", "FREE", "FROM", "FULL", "FUNCTION", "FUSION", "GET", "GLOBAL", "GRANT", "GROUP",
+    "GROUPING", "HAVING", "HOLD", "HOUR", "IDENTITY", "IN", "INDICATOR", "INNER", "INOUT", "INSENSITIVE",
+    "INSERT", "INT", "INTEGER", "INTERSECT", "INTERSECTION", "INTERVAL", "INTO", "IS", "JOIN", "LANGUAGE",
+    "LARGE", "LATERAL", "LEADING", "LEFT", "LIKE", "LN", "LOCAL", "LOCALTIME", "LOCALTIMESTAMP", "LOWER",
+    "MATCH", "MAX", "MEMBER", "MERGE", "METHOD", "MIN", "MINUTE", "MOD", "MODIFIES", "MODULE", "MONTH",
+    "MULTISET", "NATIONAL", "NATURAL", "NCHAR", "NCLOB", "NEW", "NO", "NONE", "NORMALIZE", "NOT", "NULL",
+    "NULLIF", "NUMERIC", "OCTET_LENGTH", "OF", "OLD", "ON", "ONLY", "OPEN", "OR", "ORDER", "OUT", "OUTER",
+    "OVER", "OVERLAPS", "OVERLAY", "PARAMETER", "PARTITION", "PERCENT_RANK", "PERCENTILE_CONT",
+    "PERCENTILE_DISC", "POSITION", "POWER", "PRECISION", "PREPARE", "PRIMARY", "PROCEDURE", "RANGE", "RANK",
+    "READS", "REAL", "RECURSIVE", "REF", "REFERENCES", "REFERENCING", "REGR_AVGX", "REGR_AVGY", "REGR_COUNT",
+    "REGR_INTERCEPT", "REGR_R2", "REGR_SLOPE", "REGR_SXX", "REGR_SXY", "REGR_SYY", "RELEASE", "RESULT",
+    "RETURN", "RETURNS", "REVOKE", "RIGHT", "ROLLBACK", "ROLLUP", "ROW", "ROW_NUMBER", "ROWS", "SAVEPOINT",
+    "SCOPE", "SCROLL", "SEARCH", "SECOND", "SELECT", "SENSITIVE", "SESSION_USER", "SET", "SIMILAR",
+    "SMALLINT", "SOME", "SPECIFIC", "SPECIFICTYPE", "SQL", "SQLEXCEPTION", "SQLSTATE", "SQLWARNING", "SQRT",
+    "START", "STATIC", "STDDEV_POP", "STDDEV_SAMP", "SUBMULTISET", "SUBSTRING", "SUM", "SYMMETRIC", "SYSTEM",
+    "SYSTEM_USER", "TABLE", "TABLESAMPLE", "THEN", "TIME", "TIMESTAMP", "TIMEZONE_HOUR", "TIMEZONE_MINUTE",
+    "TO", "TRAILING", "TRANSLATE", "TRANSLATION", "TREAT", "TRIGGER", "TRIM", "TRUE", "UESCAPE", "UNION",
+    "UNIQUE", "UNKNOWN", "UNNEST", "UPDATE", "UPPER", "USER", "USING", "VALUE", "VALUES", "VAR_POP",
+    "VAR_SAMP", "VARCHAR", "VARYING", "WHEN", "WHENEVER", "WHERE", "WIDTH_BUCKET", "WINDOW", "WITH", "WITHIN",
+    "WITHOUT", "YEAR",
+)
+
+NON_RESERVED: Tuple[str, ...] = (
+    "A", "ABSOLUTE", "ACTION", "ADA", "ADD", "ADMIN", "AFTER", "ALWAYS", "ASC", "ASSERTION", "ASSIGNMENT",
+    "ATTRIBUTE", "ATTRIBUTES", "BEFORE", "BERNOULLI", "BREADTH", "C", "CASCADE", "CATALOG", "CATALOG_NAME",
+    "CHAIN", "CHARACTER_SET_CATALOG", "CHARACTER_SET_NAME", "CHARACTER_SET_SCHEMA", "CHARACTERISTICS",
+    "CHARACTERS", "CLASS_ORIGIN", "COBOL", "COLLATION", "COLLATION_CATALOG", "COLLATION_NAME",
+    "COLLATION_SCHEMA", "COLUMN_NAME", "COMMAND_FUNCTION", "COMMAND_FUNCTION_CODE", "COMMITTED",
+    "CONDITION_NUMBER", "CONNECTION", "CONNECTION_NAME", "CONSTRAINT_CATALOG", "CONSTRAINT_NAME",
+    "CONSTRAINT_SCHEMA", "CONSTRAINTS", "CONSTRUCTOR", "CONTAINS", "CONTINUE", "CURSOR_NAME", "DATA",
+    "DATETIME_INTERVAL_CODE", "DATETIME_INTERVAL_PRECISION", "DEFAULTS", "DEFERRABLE", "DEFERRED", "DEFINED",
+    "DEFINER", "DEGREE", "DEPTH", "DERIVED", "DESC", "DESCRIPTOR", "DIAGNOSTICS", "DISPATCH", "DOMAIN",
+    "DYNAMIC_FUNCTION", "DYNAMIC_FUNCTION_CODE", "EQUALS", "EXCEPTION", "EXCLUDE", "EXCLUDING", "FINAL",
+    "FIRST", "FOLLOWING", "FORTRAN", "FOUND", "G", "GENERAL", "GENERATED", "GO", "GOTO", "GRANTED",
+    "HIERARCHY", "IMMEDIATE", "IMPLEMENTATION", "INCLUDING", "INCREMENT", "INITIALLY", "INPUT", "INSTANCE",
+    "INSTANTIABLE", "INVOKER", "ISOLATION", "K", "KEY", "KEY_MEMBER", "KEY_TYPE", "LAST", "LENGTH", "LEVEL",
+    "LOCATOR", "M", "MAP", "MATCHED", "MAXVALUE", "MESSAGE_LENGTH", "MESSAGE_OCTET_LENGTH", "MESSAGE_TEXT",
+    "MINVALUE", "MORE", "MUMPS", "NAME", "NAMES", "NESTING", "NEXT", "NORMALIZED", "NULLABLE", "NULLS",
+    "NUMBER", "OBJECT", "OCTETS", "OPTION", "OPTIONS", "ORDERING", "ORDINALITY", "OTHERS", "OUTPUT",
+    "OVERRIDING", "PAD", "PARAMETER_MODE", "PARAMETER_NAME", "PARAMETER_ORDINAL_POSITION",
+    "PARAMETER_SPECIFIC_CATALOG", "PARAMETER_SPECIFIC_NAME", "PARAMETER_SPECIFIC_SCHEMA", "PARTIAL", "PASCAL",
+    "PATH", "PLACING", "PLI", "PRECEDING", "PRESERVE", "PRIOR", "PRIVILEGES", "PUBLIC", "READ", "RELATIVE",
+    "REPEATABLE", "RESTART", "RESTRICT", "RETURNED_CARDINALITY", "RETURNED_LENGTH", "RETURNED_OCTET_LENGTH",
+    "RETURNED_SQLSTATE", "ROLE", "ROUTINE", "ROUTINE_CATALOG", "ROUTINE_NAME", "ROUTINE_SCHEMA", "ROW_COUNT",
+    "SCALE", "SCHEMA", "SCHEMA_NAME", "SCOPE_CATALOG", "SCOPE_NAME", "SCOPE_SCHEMA", "SECTION", "SECURITY",
+    "SELF", "SEQUENCE", "SERIALIZABLE", "SERVER_NAME", "SESSION", "SETS", "SIMPLE", "SIZE", "SOURCE", "SPACE",
+    "SPECIFIC_NAME", "STATE", "STATEMENT", "STRUCTURE", "STYLE", "SUBCLASS_ORIGIN", "TABLE_NAME", "TEMPORARY",
+    "TIES", "TOP_LEVEL_COUNT", "TRANSACTION", "TRANSACTION_ACTIVE", "TRANSACTIONS_COMMITTED",
+    "TRANSACTIONS_ROLLED_BACK", "TRANSFORM", "TRANSFORMS", "TRIGGER_CATALOG", "TRIGGER_NAME", "TRIGGER_SCHEMA",
+    "TYPE", "UNBOUNDED", "UNCOMMITTED", "UNDER", "UNNAMED", "USAGE", "USER_DEFINED_TYPE_CATALOG",
+    "USER_DEFINED_TYPE_CODE", "USER_DEFINED_TYPE_NAME", "USER_DEFINED_TYPE_SCHEMA", "VIEW", "WORK", "WRITE",
+    "ZONE",
+)
+
+RESERVED_SET = frozenset(RESERVED)
+
+
+def build_buckets(words: Tuple[str, ...]) -> List[Optional[Dict[str, str]]]:
+    """
+    One dict per word length mapping the upper and lower case spelling of
+    each key word to its canonical (upper case) form; None where no key word
+    has that length.
+    """
+    buckets: List[Optional[Dict[str, str]]] = [None] * (max(map(len, words)) + 1)
+    for word in words:
+        bucket = buckets[len(word)]
+        if bucket is None:
+            bucket = buckets[len(word)] = {}
+        bucket[word] = bucket[word.lower()] = word
+    return buckets
+
+
+# Built once at import; lookups never rebuild or raise.
+BUCKETS = build_buckets(RESERVED + NON_RESERVED)
+
+
+def lookup(word: str) -> Optional[str]:
+    """
+    Canonical spelling of `word` if it is a key word, ignoring case.
+
+    Words of a length no key word has miss on the bucket check. Single case
+    words, nearly every identifier and key word in practice, are looked up
+    as written; only mixed case ones are upper-cased first.
+    """
+    if len(word) >= len(BUCKETS) or (bucket := BUCKETS[len(word)]) is None:
+        return None
+    if word.isupper() or word.islower():
+        return bucket.get(word)
+    return bucket.get(word.upper())
+
+
+def is_reserved(word: str) -> bool:
+    return lookup(word) in RESERVED_SET
@@ -0,0 +1,130 @@
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+from diagnostics import Diagnostic
+from parser import parse_flat
+from recovery import ParseResult, parse_recovering
+from scaner import Token
+from token_buffer import scan_buffer
+from tree import FlatTree
+
+Span = Tuple[int, int]
+
+# Everything that can hide a `;`: quoted strings and identifiers (doubled
+# quotes escape), line and block comments. Unterminated ones run to the end.
+STATEMENT_TOKEN = re.compile(
+    r"(?P<QUOTED>'(?:[^']|'')*(?:'|\Z)|\"(?:[^\"]|\"\")*(?:\"|\Z))"
+    r"|(?P<COMMENT>--[^\n]*|/\*.*?(?:\*/|\Z))"
+    r"|(?P<END>;)"
+    r"|(?P<CODE>[^\s'\";/-]+|[/-])",
+    re.DOTALL
+)
+
+
+def split_statements(text: str) -> List[Span]:
+    """
+    [start, end) offsets of the `;`-separated statements of a script,
+    ignoring separators inside quotes and comments. Spans are trimmed of
+    surrounding whitespace and comments; empty statements are dropped.
+    """
+    spans: List[Span] = []
+    start = end = -1
+
+    for m in STATEMENT_TOKEN.finditer(text):
+        kind = m.lastgroup
+        if kind == 'COMMENT':
+            continue
+        if kind == 'END':
+            if start >= 0:
+                spans.append((start, end))
+                start = -1
+            continue
+        if start < 0:
+            start = m.start()
+        end = m.end()
+
+    if start >= 0:
+        spans.append((start, end))
+    return spans
+
+
+def parse_segment(segment: Tuple[str, List[Span]]) -> List[Union[FlatTree[Token], ValueError]]:
+    """
+    Worker entry point: parses statements of one piece of a script. Errors
+    are returned in place so the caller can report the first one in order.
+    """
+    text, spans = segment
+    results = []
+    for start, end in spans:
+        try:
+            results.append(parse_flat(scan_buffer(text, start, end)))
+        except ValueError as e:
+            results.append(e)
+    return results
+
+
+def rebase(tree: FlatTree[Token], text: str, offset: int) -> FlatTree[Token]:
+    buffer = tree.data
+    buffer.source = text
+    if offset:
+        buffer.starts = array('q', map(offset.__add__, buffer.starts))
+        buffer.ends = array('q', map(offset.__add__, buffer.ends))
+    return tree
+
+
+def parse_script(
+        text: str,
+        workers: Optional[int] = 1,
+        chunksize: int = 64
+) -> List[FlatTree[Token]]:
+    """
+    Splits a script into statements and scans and parses each on its own,
+    in order. With `workers` other than 1 (None for the CPU count) chunks of
+    statements are parsed in a process pool; each worker receives only the
+    text its chunk covers. Token offsets always refer to `text`.
+
+    The first failing statement raises ValueError naming its position.
+    """
+    if chunksize <= 0:
+        raise ValueError(f"Chunk size must be positive: {chunksize}")
+
+    spans = split_statements(text)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(spans) <= chunksize:
+        results = parse_segment((text, spans))
+    else:
+        chunks = [spans[i:i + chunksize] for i in range(0, len(spans), chunksize)]
+        segments = []
+        for chunk in chunks:
+            offset = chunk[0][0]
+            segments.append((text[offset:chunk[-1][1]], [(start - offset, end - offset) for start, end in chunk]))
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk, parsed in zip(chunks, executor.map(parse_segment, segments)):
+                offset = chunk[0][0]
+                results.extend(r if isinstance(r, ValueError) else rebase(r, text, offset) for r in parsed)
+
+    for index, ((start, end), result) in enumerate(zip(spans, results)):
+        if isinstance(result, ValueError):
+            raise ValueError(f"Statement {index + 1} at {start}:{end}: {result}") from result
+    return results
+
+
+def check_script(text: str) -> List[ParseResult]:
+    """
+    Validates every statement of a script in one pass: each result holds the
+    statement's tree (with error nodes) and its scan and parse diagnostics,
+    spans pointing into `text` and sorted by position. Never raises for bad input.
+    """
+    results = []
+    for start, end in split_statements(text):
+        errors: List[Diagnostic] = []
+        result = parse_recovering(scan_buffer(text, start, end, errors))
+        result.diagnostics = sorted(errors + result.diagnostics, key=lambda d: d.span or (end, end))
+        results.append(result)
+    return results
@@ -0,0 +1,173 @@
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Hashable, Optional, Sequence, Tuple
+
+from instrumentation import HOOKS, TEMPLATE_CACHE, CallStats, emit
+from parser import parse_flat
+from scaner import Token, TokenType, scan
+from tree import FlatTree, TreeNode
+
+Fingerprint = Tuple[Hashable, ...]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    maxsize: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUPolicy:
+    def __init__(self):
+        self.entries: OrderedDict[Fingerprint, FlatTree] = OrderedDict()
+
+    def get(self, key: Fingerprint) -> Optional[FlatTree]:
+        template = self.entries.get(key)
+        if template is not None:
+            self.entries.move_to_end(key)
+        return template
+
+    def put(self, key: Fingerprint, template: FlatTree) -> None:
+        self.entries[key] = template
+
+    def evict(self) -> None:
+        self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class LFUPolicy:
+    """
+    O(1) least-frequently-used eviction: keys are bucketed by hit count and
+    ties inside a bucket go to the least recently used key.
+    """
+
+    def __init__(self):
+        self.entries: dict[Fingerprint, Tuple[FlatTree, int]] = {}
+        self.buckets: defaultdict[int, OrderedDict[Fingerprint, None]] = defaultdict(OrderedDict)
+        self.min_count = 0
+
+    def get(self, key: Fingerprint) -> Optional[FlatTree]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        template, count = entry
+        bucket = self.buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[count]
+            if self.min_count == count:
+                self.min_count = count + 1
+
+        self.buckets[count + 1][key] = None
+        self.entries[key] = (template, count + 1)
+        return template
+
+    def put(self, key: Fingerprint, template: FlatTree) -> None:
+        self.entries[key] = (template, 1)
+        self.buckets[1][key] = None
+        self.min_count = 1
+
+    def evict(self) -> None:
+        bucket = self.buckets[self.min_count]
+        key, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self.buckets[self.min_count]
+        del self.entries[key]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+POLICIES = {
+    "lru": LRUPolicy,
+    "lfu": LFUPolicy,
+}
+
+
+def fingerprint(tokens: Sequence[Token]) -> Fingerprint:
+    """
+    Shape of a token stream: literals are reduced to their Python type, so
+    `x > 5` and `x > 7` share a fingerprint while `x > 5.0` does not.
+    """
+    return tuple(
+        (TokenType.LITERAL, type(t.value)) if t.type is TokenType.LITERAL else (t.type, t.value)
+        for t in tokens
+    )
+
+
+class TemplateCache:
+    """
+    Caches parsed expression shapes in front of scan + parse.
+
+    A template is a FlatTree whose items are token positions, so a hit binds
+    the freshly scanned literals by rebuilding the tree over the new tokens
+    without running the parser.
+    """
+
+    def __init__(self, maxsize: int = 1024, policy: str = "lru"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        if maxsize <= 0:
+            raise ValueError(f"Cache size must be positive: {maxsize}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self._store = POLICIES[policy]()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def parse(self, text: str) -> TreeNode[Token]:
+        return self.parse_tokens(scan(text))
+
+    def parse_tokens(self, tokens: Sequence[Token]) -> TreeNode[Token]:
+        started = time.perf_counter() if HOOKS else 0.0
+        key = fingerprint(tokens)
+
+        template = self._store.get(key)
+        hit = template is not None
+        if hit:
+            self._hits += 1
+            tree = template.to_node(tokens)
+        else:
+            self._misses += 1
+            template = parse_flat(tokens)
+
+            if len(self._store) >= self.maxsize:
+                self._store.evict()
+                self._evictions += 1
+            self._store.put(key, template)
+
+            tree = template.to_node()
+
+        if HOOKS:
+            seconds = time.perf_counter() - started
+            emit(CallStats(TEMPLATE_CACHE, seconds, tokens=len(tokens), nodes=len(template), cache_hit=hit))
+        return tree
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._store),
+            maxsize=self.maxsize,
+        )
+
+    def clear(self) -> None:
+        self._store = POLICIES[self.policy]()
+        self._hits = self._misses = self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._store)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from binary_ast import ASTWriter, ASTReader, encode_tree, decode_tree
+from parser import parse, parse_flat
+from scaner import scan, Token
+from token_buffer import scan_buffer
+from tree import preorder
+
+
+def tokens_of(node):
+    return [n.data for n in preorder(node)]
+
+
+class BinaryASTTestCase(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".past")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_record_round_trip(self):
+        text = "(price * 2.5 - 99999999999999999999999) >= -3 == NOT archived != True <> 'it''s'"
+        tree = parse(scan(text))
+
+        decoded = decode_tree(encode_tree(tree))
+
+        self.assertListEqual(tokens_of(decoded.to_node()), tokens_of(tree))
+        self.assertIsInstance(decoded.value(decoded.root), Token)
+
+    def test_file_random_access(self):
+        texts = [f"x{i} + {i} * ({i}.5 - y)" for i in range(100)]
+
+        with ASTWriter(self.path) as writer:
+            for i, text in enumerate(texts):
+                writer.write(parse_flat(scan_buffer(text)) if i % 2 else parse(scan(text)))
+
+        with ASTReader(self.path) as reader:
+            self.assertEqual(len(reader), 100)
+            self.assertListEqual(tokens_of(reader[57]), tokens_of(parse(scan(texts[57]))))
+            self.assertListEqual(tokens_of(reader[-1]), tokens_of(parse(scan(texts[-1]))))
+            with self.assertRaises(IndexError):
+                reader.flat(100)
+
+    def test_rejects_foreign_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b"not an ast file at all")
+
+        with self.assertRaises(ValueError):
+            ASTReader(self.path)
+
+    def test_rejects_short_file(self):
+        for content in [b"", b"PA", b"not an ast"]:
+            with open(self.path, 'wb') as f:
+                f.write(content)
+
+            with self.assertRaises(ValueError):
+                ASTReader(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
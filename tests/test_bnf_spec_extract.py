@@ -0,0 +1,146 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import bnf_spec_extract
+from bnf_spec_extract import PageCache, page_lines, write_topics
+
+try:
+    import pdfminer
+except ImportError:
+    pdfminer = None
+
+CHAPTER_LINES = [
+    "ISO/IEC 9075-2:2003 (E)",
+    "page header",
+    "11 Schema definition and manipulation",
+    "11.1 <schema definition>",
+    "Function",
+    "Define a persistent schema.",
+    "Format",
+    "<schema definition> ::=",
+    "©ISO/IEC 2003 – All rights reserved",
+    "CREATE SCHEMA <schema name clause>",
+    "Syntax Rules",
+    "None.",
+    "11.2 <drop schema statement>",
+    "Function",
+    "Destroy a schema.",
+]
+
+
+class WriteTopicsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_sections_are_written_under_their_topics(self):
+        paths = list(write_topics(CHAPTER_LINES, "11", self.output))
+
+        main = os.path.join(self.output, "11 Schema definition and manipulation")
+        self.assertListEqual(paths, [
+            os.path.join(main, "11.1 <schema definition>", "Function"),
+            os.path.join(main, "11.1 <schema definition>", "Format"),
+            os.path.join(main, "11.2 <drop schema statement>", "Function"),
+        ])
+        self.assertEqual(self.read(paths[0]), "Define a persistent schema.")
+        self.assertEqual(self.read(paths[1]), "<schema definition> ::=\nCREATE SCHEMA <schema name clause>")
+        self.assertEqual(self.read(paths[2]), "Destroy a schema.")
+        # "None." sections are left out
+        self.assertFalse(os.path.exists(os.path.join(main, "11.1 <schema definition>", "Syntax Rules")))
+
+    def test_sections_are_written_as_they_end(self):
+        paths = write_topics(CHAPTER_LINES, "11", self.output)
+
+        function = next(paths)
+        self.assertTrue(os.path.exists(function))
+        self.assertFalse(os.path.exists(os.path.join(os.path.dirname(function), "Format")))
+
+    def test_sections_before_a_main_topic(self):
+        lines = ["11.3 <view definition>", "Function", "Define a view."]
+
+        path, = write_topics(lines, "11", self.output)
+
+        self.assertEqual(path, os.path.join(self.output, "NOT FOUND", "11.3 <view definition>", "Function"))
+
+
+class PageCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = PageCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get("ab12"))
+
+        self.cache.put("ab12", ["first line", "second line"])
+
+        self.assertEqual(self.cache.get("ab12"), ["first line", "second line"])
+        self.assertIsNone(self.cache.get("ab13"))
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "ab", "ab12.json")))
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.put("cd34", ["line"])
+        with open(self.cache.path("cd34"), "w") as f:
+            f.write("{not json")
+
+        self.assertIsNone(self.cache.get("cd34"))
+
+    def test_disabled(self):
+        cache = PageCache(None)
+        cache.put("ef56", ["line"])
+        self.assertIsNone(cache.get("ef56"))
+
+    def test_page_lines_extracts_only_changed_pages(self):
+        keys = {3: "k3", 4: "k4", 5: "k5"}
+        extracted = []
+
+        def extract_pages(pdf_path, numbers):
+            extracted.extend(numbers)
+            return [(number, [f"page {number} ({keys[number]})"]) for number in numbers]
+
+        def run():
+            with mock.patch.object(bnf_spec_extract, "page_keys", lambda pdf_path, pages: dict(keys)), \
+                    mock.patch.object(bnf_spec_extract, "extract_pages", extract_pages):
+                return list(page_lines("spec.pdf", [3, 4, 5], self.cache))
+
+        self.assertListEqual(run(), ["page 3 (k3)", "page 4 (k4)", "page 5 (k5)"])
+        self.assertListEqual(extracted, [3, 4, 5])
+
+        extracted.clear()
+        self.assertListEqual(run(), ["page 3 (k3)", "page 4 (k4)", "page 5 (k5)"])
+        self.assertListEqual(extracted, [])
+
+        # a page whose content hash changed is extracted again
+        keys[4] = "k4 edited"
+        extracted.clear()
+        self.assertListEqual(run(), ["page 3 (k3)", "page 4 (k4 edited)", "page 5 (k5)"])
+        self.assertListEqual(extracted, [4])
+
+    @unittest.skipUnless(pdfminer, "pdfminer is not installed")
+    def test_page_key_follows_content_and_version(self):
+        def page(*streams):
+            return SimpleNamespace(page_obj=SimpleNamespace(contents=[SimpleNamespace(get_data=lambda s=s: s)
+                                                                      for s in streams]))
+
+        key = bnf_spec_extract.page_key(page(b"BT (a) Tj ET"))
+        self.assertEqual(bnf_spec_extract.page_key(page(b"BT (a) Tj ET")), key)
+        self.assertNotEqual(bnf_spec_extract.page_key(page(b"BT (b) Tj ET")), key)
+
+        with mock.patch.object(bnf_spec_extract, "EXTRACTOR_VERSION", bnf_spec_extract.EXTRACTOR_VERSION + 1):
+            self.assertNotEqual(bnf_spec_extract.page_key(page(b"BT (a) Tj ET")), key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from byte_lexer import scan_bytes, scan_file, OffsetIndex
+from scaner import scan
+from token_buffer import scan_buffer
+
+
+class ByteLexerTestCase(unittest.TestCase):
+    TEXT = "(1231 + 13.25) <= False == NOT True * price != 7\n\tAND x_1 >= SELECT"
+
+    def test_tokens_match_scan(self):
+        buffer = scan_bytes(self.TEXT.encode())
+
+        self.assertListEqual(list(buffer), scan(self.TEXT))
+        self.assertEqual(list(buffer.kinds), list(scan_buffer(self.TEXT).kinds))
+
+    def test_offsets_are_bytes_and_map_to_characters(self):
+        text = "é + 1 -- ünï ✓ 42"
+        errors = []
+
+        buffer = scan_bytes(text.encode(), errors=errors)
+
+        self.assertEqual([e.message for e in errors], ["Unknown token: `é`", "Unknown token: `ü`",
+                                                       "Unknown token: `ï`", "Unknown token: `✓`"])
+        self.assertEqual(buffer.value(-1), 42)
+        last = len(buffer) - 1
+        start, end = buffer.char_span(last)
+        self.assertEqual(text[start:end], "42")
+        self.assertEqual(buffer.span(last)[0], len(text.encode()) - 2)
+
+    def test_offset_index_checkpoints(self):
+        text = "aé✓" * 1000
+        data = text.encode()
+        index = OffsetIndex(data, step=7)
+
+        for chars in [3000, 0, 1500, 3, 2999]:
+            offset = len(text[:chars].encode())
+            self.assertEqual(index.char_offset(offset), chars)
+        with self.assertRaises(ValueError):
+            index.char_offset(len(data) + 1)
+
+        index = OffsetIndex(b"\xef\xbb\xbf" + data, start=3, step=7)
+        for chars in [0, 3000, 1500, 2]:
+            self.assertEqual(index.char_offset(3 + len(text[:chars].encode())), chars)
+
+    def test_scan_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dump.sql")
+            with open(path, 'wb') as f:
+                f.write(b"\xef\xbb\xbf" + self.TEXT.encode())
+            empty = os.path.join(directory, "empty.sql")
+            open(empty, 'wb').close()
+
+            buffer = scan_file(path)
+            tokens = list(buffer)
+            copy = pickle.loads(pickle.dumps(scan_bytes(bytes(buffer.source), 3)))
+            self.assertEqual(buffer.char_span(1), (1, 5))
+            buffer.source.close()
+
+            self.assertListEqual(tokens, scan(self.TEXT))
+            self.assertEqual(buffer.span(0), (3, 4))
+            self.assertListEqual(list(copy), tokens)
+            self.assertEqual(copy.char_span(1), (1, 5))
+            self.assertEqual(len(scan_file(empty)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
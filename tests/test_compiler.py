@@ -0,0 +1,64 @@
+import unittest
+
+from compiler import compile_tree, compile_expression, compile_program
+from parser import parse
+from scaner import scan
+
+
+class CompilerTestCase(unittest.TestCase):
+    def test_compile_arithmetic(self):
+        for text, expected in [
+            ("1 + 2 * 3", 7),
+            ("(1 + 2) * 3", 9),
+            ("10 - 4 - 3", 3),
+            ("10 - (4 - 3)", 9),
+            ("-(2 + 3) * 2", -10),
+            ("8 / 2 / 2", 2.0),
+        ]:
+            self.assertEqual(compile_tree(parse(scan(text)))({}), expected, text)
+
+    def test_compile_predicate(self):
+        predicate = compile_expression("price * qty > 100 == NOT archived")
+
+        self.assertTrue(predicate({"price": 20, "qty": 6, "archived": False}))
+        self.assertFalse(predicate({"price": 20, "qty": 4, "archived": False}))
+        self.assertFalse(predicate({"price": 20, "qty": 6, "archived": True}))
+
+    def test_reserved_words_as_column_names(self):
+        predicate = compile_expression("value > 5")
+        self.assertTrue(predicate({"value": 6}))
+
+        row = {"date": 1, "year": 2, "count": 3, "user": 4, "time": 5}
+        self.assertEqual(compile_expression("date + year * count - user / time")(row), 1 + 2 * 3 - 4 / 5)
+
+    def test_compile_comparisons_do_not_chain(self):
+        # Python would read `1 < 2 == True` as `1 < 2 and 2 == True`
+        self.assertTrue(compile_expression("1 < 2 == True")({}))
+        self.assertTrue(compile_expression("x != 1")({"x": 2}))
+
+    def test_compile_cache(self):
+        compile_expression.cache_clear()
+
+        first = compile_expression("x + 1")
+        second = compile_expression("x + 1")
+
+        self.assertIs(first, second)
+        self.assertEqual(compile_expression.cache_info().hits, 1)
+
+    def test_compile_deep_expression(self):
+        depth = 5000
+        text = "(" * depth + "x" + " + 1)" * depth
+
+        compiled = compile_tree(parse(scan(text), iterative=True))
+
+        self.assertEqual(compiled({"x": 1}), depth + 1)
+
+    def test_program_matches_generated_code(self):
+        tree = parse(scan("-(a + 2) * 3 <= b / 4 != NOT c"))
+        row = {"a": 1, "b": 8, "c": False}
+
+        self.assertEqual(compile_program(tree)(row), compile_tree(tree)(row))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import re
+import unittest
+
+from cursor import Cursor, StrCursor
+from scaner import scan, get_token, scan_number, scan_alpha_numeric
+
+DIGIT = re.compile(r"[0-9]")
+
+
+class CursorTestCase(unittest.TestCase):
+    def test_take_while(self):
+        for cur, digit in ((Cursor("123abc"), str.isdigit), (StrCursor("123abc"), DIGIT)):
+            self.assertEqual(cur.take_while(digit), (0, 3))
+            self.assertEqual(cur.take_while(digit), (3, 3))
+            self.assertEqual(cur.take_while(str.isalpha), (3, 6))
+            self.assertFalse(cur.has_any)
+
+    def test_take_while_stops_at_stop(self):
+        for cur, digit in ((Cursor("1234", start=1, stop=3), str.isdigit), (StrCursor("1234", start=1, stop=3), DIGIT)):
+            self.assertEqual(cur.take_while(digit), (1, 3))
+            self.assertEqual(cur.slice(1, 3), "23")
+
+    def test_skip_to(self):
+        for cur in (Cursor([1, 2, 3, 2]), StrCursor("abcb")):
+            item = cur.seq[1]
+            self.assertTrue(cur.skip_to(item))
+            self.assertEqual(cur.current, 1)
+            cur.next()
+            self.assertTrue(cur.skip_to(item))
+            self.assertEqual(cur.current, 3)
+            cur.next()
+            self.assertFalse(cur.skip_to(item))
+            self.assertEqual(cur.current, cur.total)
+
+    def test_str_cursor_skips_to_substring(self):
+        cur = StrCursor("a /* b */ c")
+        self.assertTrue(cur.skip_to("*/"))
+        self.assertEqual(cur.current, 7)
+
+
+class StrCursorScannerTestCase(unittest.TestCase):
+    def test_get_token_matches_scan(self):
+        text = "((1+2)*3.25)<=(4>=5)==False  \n\t NOT x_1 != (y)"
+
+        cur = StrCursor(text)
+        tokens = []
+        while cur.has_any:
+            if t := get_token(cur):
+                tokens.append(t)
+
+        self.assertListEqual(tokens, scan(text))
+
+    def test_long_literals(self):
+        digits = "7" * 10_000
+        self.assertEqual(scan_number(StrCursor(digits + ".5 ")), float(digits + ".5"))
+
+        name = "a" + "b_1" * 10_000
+        cur = StrCursor(name + "+")
+        self.assertEqual(scan_alpha_numeric(cur), name)
+        self.assertEqual(cur.peek(), "+")
+
+    def test_only_ascii_digits(self):
+        for text in ["\u00b2", "1\u0663", "\u0663"]:
+            with self.assertRaises(ValueError, msg=text):
+                cur = StrCursor(text)
+                while cur.has_any:
+                    get_token(cur)
+            with self.assertRaises(ValueError, msg=text):
+                scan(text)
+
+    def test_word_must_start_with_letter(self):
+        with self.assertRaises(ValueError):
+            scan_alpha_numeric(StrCursor("_x"))
+
+
+if __name__ == '__main__':
+    unittest.main()
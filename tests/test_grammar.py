@@ -0,0 +1,261 @@
+import os
+import tempfile
+import unittest
+
+from grammar import grammar_from_sources, build_tables, load_or_build, ParseTables, IDENTIFIER, STRING
+from ll_engine import LLParser
+from scaner import scan, Token
+from tree import preorder
+
+SCHEMA_FORMAT = """
+<schema definition> ::=
+CREATE SCHEMA <schema name clause>
+[ <schema character set specification> ]
+[ <schema element>... ]
+
+<schema name clause> ::=
+<schema name>
+| AUTHORIZATION <schema authorization identifier>
+| <schema name> AUTHORIZATION <schema authorization identifier>
+
+<schema authorization identifier> ::= <identifier>
+
+<schema character set specification> ::= DEFAULT CHARACTER SET <identifier>
+
+<schema element> ::= <view definition> | <domain definition>
+
+<view definition> ::= CREATE VIEW <identifier> <left paren> <column list> <right paren>
+
+<domain definition> ::= CREATE DOMAIN <identifier> [ AS ] <data type> !! See the Syntax Rules.
+
+<data type> ::= INT | VARCHAR <left paren> <unsigned integer> <right paren>
+"""
+
+NAME_FORMAT = """
+<schema name> ::= <identifier> | <schema name> <period> <identifier>
+
+<column list> ::= <identifier> [ { <identifier> }... ]
+"""
+
+# ISO 9075-2, 6.26 and 6.3, trimmed
+EXPRESSION_FORMAT = """
+<numeric value expression> ::=
+<term>
+| <numeric value expression> <plus sign> <term>
+| <numeric value expression> <minus sign> <term>
+
+<term> ::=
+<factor>
+| <term> <asterisk> <factor>
+| <term> <solidus> <factor>
+
+<factor> ::= [ <sign> ] <numeric primary>
+
+<sign> ::= <plus sign> | <minus sign>
+
+<numeric primary> ::=
+<unsigned numeric literal>
+| <column reference>
+| <left paren> <numeric value expression> <right paren>
+
+<column reference> ::= <identifier>
+"""
+
+# ISO 9075-2, 21.1, 11.1, 11.3, 11.22, 11.24 and 12.2, trimmed; PATH takes a
+# string here as in test_schema_parser
+DIRECT_SQL_FORMAT = """
+<direct SQL script> ::= <direct SQL statement>...
+
+<direct SQL statement> ::= <directly executable statement> <semicolon>
+
+<directly executable statement> ::=
+<schema definition>
+| <table definition>
+| <view definition>
+| <domain definition>
+| <grant privilege statement>
+
+<schema definition> ::= CREATE SCHEMA <schema name clause> [ <schema character set or path> ]
+
+<schema name clause> ::=
+<identifier>
+| AUTHORIZATION <identifier>
+| <identifier> AUTHORIZATION <identifier>
+
+<schema character set or path> ::=
+<schema character set specification>
+| <schema path specification>
+| <schema character set specification> <schema path specification>
+| <schema path specification> <schema character set specification>
+
+<schema character set specification> ::= DEFAULT CHARACTER SET <identifier>
+
+<schema path specification> ::= PATH <character string literal>
+
+<table definition> ::= CREATE TABLE <table name> <table element list>
+
+<table element list> ::= <left paren> <column definition> [ { <comma> <column definition> }... ] <right paren>
+
+<column definition> ::= <identifier> <data type> [ PRIMARY KEY ]
+
+<data type> ::= INT | VARCHAR <left paren> <unsigned integer> <right paren>
+
+<view definition> ::= CREATE VIEW <table name> AS <query specification>
+
+<query specification> ::= SELECT <select list> FROM <table name>
+
+<select list> ::= <identifier> [ { <comma> <identifier> }... ]
+
+<domain definition> ::= CREATE DOMAIN <table name> [ AS ] <data type> [ <domain constraint> ]
+
+<domain constraint> ::= CHECK <left paren> <comparison predicate> <right paren>
+
+<comparison predicate> ::= <value expression> <comp op> <value expression>
+
+<comp op> ::= <equals operator> | <not equals operator> | <less than operator> | <greater than operator>
+
+<value expression> ::= <identifier> | <unsigned numeric literal> | <character string literal>
+
+<grant privilege statement> ::= GRANT <action> ON <table name> TO <identifier>
+
+<action> ::= SELECT | INSERT | DELETE
+
+<table name> ::= <identifier> [ <period> <identifier> ]
+"""
+
+FIELD_REFERENCE_FORMAT = """
+<value expression primary> ::=
+<parenthesized value expression>
+| <nonparenthesized value expression primary>
+
+<parenthesized value expression> ::= <left paren> <value expression primary> <right paren>
+
+<nonparenthesized value expression primary> ::=
+<unsigned numeric literal>
+| <field reference>
+
+<field reference> ::= <value expression primary> <period> <identifier>
+"""
+
+
+def names(node):
+    return [n.data for n in preorder(node) if isinstance(n.data, str)]
+
+
+def leaves(node):
+    return [n.data for n in preorder(node) if isinstance(n.data, Token)]
+
+
+class GrammarTestCase(unittest.TestCase):
+    def setUp(self):
+        self.grammar = grammar_from_sources([SCHEMA_FORMAT, NAME_FORMAT], "<schema definition>")
+        self.tables = build_tables(self.grammar)
+        self.parser = LLParser(self.tables)
+
+    def test_ebnf_is_desugared(self):
+        helpers = [name for name in self.grammar.rules if name in self.grammar.synthetic]
+        self.assertTrue(helpers)
+        production, = self.grammar.rules["<schema definition>"]
+        self.assertEqual(production[:3], ("CREATE", "SCHEMA", "<schema name clause>"))
+        self.assertTrue(all(s in self.grammar.synthetic for s in production[3:]))
+        self.assertIn(IDENTIFIER, self.grammar.terminals())
+        self.assertIn("(", self.grammar.terminals())
+
+    def test_left_recursion_is_removed(self):
+        for production in self.grammar.rules["<schema name>"]:
+            self.assertNotEqual(production[:1], ("<schema name>",))
+
+    def test_common_prefixes_are_factored(self):
+        self.assertEqual(self.tables.conflicts, [])
+        firsts = [p[:1] for p in self.grammar.rules["<schema name clause>"]]
+        self.assertEqual(len(firsts), len(set(firsts)))
+
+    def test_parse_schema_definition(self):
+        text = "CREATE SCHEMA my_schema AUTHORIZATION user1 DEFAULT CHARACTER SET utf8 " \
+               "CREATE VIEW v (a b c) CREATE DOMAIN d AS VARCHAR(255) CREATE DOMAIN e INT"
+
+        tree = self.parser.parse(scan(text))
+
+        self.assertEqual(tree.data, "<schema definition>")
+        self.assertEqual(leaves(tree), scan(text))
+        self.assertEqual(names(tree).count("<schema element>"), 3)
+        self.assertNotIn(True, [name in self.grammar.synthetic for name in names(tree)])
+
+    def test_prediction_uses_non_reserved_words_as_key_words(self):
+        tree = self.parser.parse(scan("CREATE SCHEMA AUTHORIZATION admin"))
+        self.assertIn("<schema authorization identifier>", names(tree))
+
+    def test_errors(self):
+        for text in ["CREATE SCHEMA", "CREATE TABLE t", "CREATE SCHEMA s CREATE DOMAIN d VARCHAR(x)"]:
+            with self.assertRaises(ValueError):
+                self.parser.parse(scan(text))
+
+    def test_undefined_nonterminal(self):
+        with self.assertRaises(ValueError):
+            grammar_from_sources([SCHEMA_FORMAT], "<schema definition>")
+
+    def test_iso_expression_grammar(self):
+        grammar = grammar_from_sources([EXPRESSION_FORMAT], "<numeric value expression>")
+        tables = build_tables(grammar)
+        text = "-price * (2 + qty) / 4 - 1"
+
+        tree = LLParser(tables).parse(scan(text))
+
+        self.assertEqual(tables.conflicts, [])
+        self.assertEqual(leaves(tree), scan(text))
+        self.assertEqual(names(tree).count("<column reference>"), 2)
+
+    def test_statements_of_the_schema_tests(self):
+        grammar = grammar_from_sources([DIRECT_SQL_FORMAT], "<direct SQL script>")
+        tables = build_tables(grammar)
+        parser = LLParser(tables)
+        self.assertEqual(tables.conflicts, [])
+        self.assertTrue({",", ";", ".", "!=", STRING} <= grammar.terminals())
+
+        for text in [
+            "CREATE SCHEMA AUTHORIZATION user1;",
+            "CREATE SCHEMA my_schema AUTHORIZATION user1;",
+            "CREATE SCHEMA my_schema DEFAULT CHARACTER SET utf8mb4 PATH '/usr/local/share';",
+            "CREATE SCHEMA my_schema PATH '/usr/local/share' DEFAULT CHARACTER SET utf8mb4;",
+            "CREATE SCHEMA my_schema; CREATE TABLE my_schema.my_table (id INT PRIMARY KEY, name VARCHAR(100));",
+            "CREATE SCHEMA my_schema; CREATE VIEW my_schema.my_view AS SELECT id, name FROM my_schema.my_table;",
+            "CREATE SCHEMA my_schema; CREATE DOMAIN my_schema.my_domain AS VARCHAR(255) CHECK (VALUE <> '');",
+            "CREATE SCHEMA my_schema; GRANT SELECT ON my_schema.my_table TO user1;",
+        ]:
+            tree = parser.parse(scan(text))
+            self.assertEqual(leaves(tree), scan(text))
+            self.assertEqual(names(tree).count("<direct SQL statement>"), text.count(";"))
+
+        tree = parser.parse(scan("CREATE DOMAIN d INT CHECK (VALUE <> '');"))
+        self.assertIn("<comp op>", names(tree))
+        self.assertEqual(leaves(tree)[-4:-2], scan("!= ''"))
+
+        with self.assertRaises(ValueError):
+            parser.parse(scan("CREATE SCHEMA my_schema"))
+
+    def test_indirect_left_recursion_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "left recursion: .*<field reference>"):
+            grammar_from_sources([FIELD_REFERENCE_FORMAT], "<value expression primary>")
+
+        with self.assertRaisesRegex(ValueError, "left recursion: <a> .*-> <a>"):
+            grammar_from_sources(["<a> ::= [ <b> ] <a> <b> | <b>  <b> ::= x"], "<a>")
+
+    def test_tables_are_cached_on_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, text in [("schema", SCHEMA_FORMAT), ("names", NAME_FORMAT)]:
+                os.makedirs(os.path.join(directory, name))
+                with open(os.path.join(directory, name, "Format"), "w") as f:
+                    f.write(text)
+            cache = os.path.join(directory, "tables.json")
+
+            built = load_or_build([directory], "<schema definition>", cache)
+            loaded = ParseTables.load(cache)
+            self.assertEqual(loaded, built)
+            self.assertEqual(load_or_build([directory], "<schema definition>", cache), built)
+
+            tree = LLParser(loaded).parse(scan("CREATE SCHEMA s"))
+            self.assertEqual(leaves(tree), scan("CREATE SCHEMA s"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+
+from incremental import Edit, IncrementalDocument
+from parser import parse
+from scaner import scan
+from token_buffer import scan_buffer
+from tree import preorder
+
+
+def shape(node):
+    return [(n.data, len(n.descendants)) for n in preorder(node)]
+
+
+class IncrementalDocumentTestCase(unittest.TestCase):
+    def assertMatchesFullParse(self, document):
+        self.assertListEqual(list(document.tokens), scan(document.text))
+        fresh = scan_buffer(document.text)
+        spans = [document.tokens.span(i) for i in range(len(document.tokens))]
+        self.assertEqual(spans, [fresh.span(i) for i in range(len(fresh))])
+        self.assertListEqual(shape(document.tree), shape(parse(scan(document.text))))
+
+    def test_operand_edit_reparses_only_the_operand(self):
+        document = IncrementalDocument("1 + (2 * 3) - (price + 4)")
+
+        document.apply(Edit(offset=5, deleted=1, inserted="20"))
+
+        self.assertEqual(document.text, "1 + (20 * 3) - (price + 4)")
+        self.assertEqual(document.last_relexed, (3, 4))
+        self.assertEqual(document.last_reparsed, (3, 4))
+        self.assertMatchesFullParse(document)
+
+        document.apply(Edit(offset=0, deleted=1, inserted="-x"))
+        self.assertEqual(document.last_reparsed, (0, 2))
+        self.assertMatchesFullParse(document)
+
+    def test_operator_edit_reparses_the_group(self):
+        document = IncrementalDocument("1 + (2 * 3) - (price + 4)")
+
+        document.apply(Edit(offset=7, deleted=1, inserted="+ 4 *"))
+
+        self.assertEqual(document.text, "1 + (2 + 4 * 3) - (price + 4)")
+        self.assertEqual(document.last_reparsed, (2, 9))
+        self.assertMatchesFullParse(document)
+
+    def test_token_count_change_shifts_later_groups(self):
+        document = IncrementalDocument("(1 + 2) * (3 - 4)")
+
+        document.apply(Edit(offset=3, deleted=1, inserted="+ 5 *"))
+        self.assertMatchesFullParse(document)
+
+        document.apply(Edit(offset=document.text.index("3"), deleted=1, inserted="30"))
+        self.assertEqual(document.last_reparsed, (9, 10))
+        self.assertMatchesFullParse(document)
+
+    def test_nested_groups(self):
+        document = IncrementalDocument("((1 + 2) * (3 + (4 - 5))) == 9")
+
+        for offset, deleted, inserted in [(17, 1, "40"), (2, 1, "x"), (12, 0, "NOT 7 + "), (0, 0, "-")]:
+            document.apply(Edit(offset, deleted, inserted))
+            self.assertMatchesFullParse(document)
+
+    def test_edit_merging_tokens(self):
+        document = IncrementalDocument("(12 + 34)")
+
+        document.apply(Edit(offset=3, deleted=3, inserted=""))
+
+        self.assertEqual(document.text, "(1234)")
+        self.assertMatchesFullParse(document)
+
+    def test_large_document_work_is_bounded_by_the_edit(self):
+        text = " + ".join(f"(x{i} * {i} - NOT y{i})" for i in range(5000))
+        document = IncrementalDocument(text)
+        middle = text.index("(x2500 ")
+
+        edits = [
+            Edit(len(text) - 2, 1, "z"),
+            Edit(middle + 1, 5, "price"),
+            Edit(middle + 7, 1, "/"),
+            Edit(middle + 6, 0, " + 7"),
+            Edit(middle, 0, "  "),
+            Edit(2, 0, "1"),
+        ]
+        for edit in edits:
+            document.apply(edit)
+            relexed, reparsed = document.last_relexed, document.last_reparsed
+            self.assertLessEqual(relexed[1] - relexed[0], 3)
+            self.assertLessEqual(reparsed[1] - reparsed[0], 10)
+
+        self.assertMatchesFullParse(document)
+
+    def test_paren_edits_fall_back_to_full_parse(self):
+        document = IncrementalDocument("1 + 2 * 3")
+
+        document.apply(Edit(offset=4, deleted=5, inserted="(2 * 3)"))
+
+        self.assertEqual(document.text, "1 + (2 * 3)")
+        self.assertEqual(document.last_reparsed, (0, 7))
+        self.assertMatchesFullParse(document)
+
+    def test_invalid_intermediate_state(self):
+        document = IncrementalDocument("(1 + 2)")
+
+        with self.assertRaises(ValueError):
+            document.apply(Edit(offset=5, deleted=1, inserted=""))
+        self.assertIsNone(document.tree)
+
+        document.apply(Edit(offset=5, deleted=0, inserted="3"))
+        self.assertMatchesFullParse(document)
+
+        with self.assertRaises(ValueError):
+            document.apply(Edit(offset=20, deleted=0, inserted="1"))
+
+    def test_typing_one_character_at_a_time(self):
+        document = IncrementalDocument("")
+        self.assertIsNone(document.tree)
+
+        text = "x != (1 + 2)"
+        for offset, c in enumerate(text):
+            try:
+                document.apply(Edit(offset, 0, c))
+            except ValueError:
+                self.assertIsNone(document.tree)
+            self.assertEqual(document.text, text[:offset + 1])
+            if offset == 2:
+                self.assertEqual([(e.message, e.span) for e in document.errors], [("Unknown token: `!`", (2, 3))])
+
+        self.assertEqual(document.errors, [])
+        self.assertMatchesFullParse(document)
+
+    def test_unscannable_and_unparseable_text(self):
+        for text in ["", "1 +", "(1", "1 @ 2"]:
+            self.assertIsNone(IncrementalDocument(text).tree, text)
+
+        document = IncrementalDocument("1 @ 2")
+        self.assertEqual(len(document.errors), 1)
+        with self.assertRaises(ValueError):
+            document.apply(Edit(offset=0, deleted=0, inserted="3 + "))
+        self.assertEqual(document.text, "3 + 1 @ 2")
+
+        document.apply(Edit(offset=6, deleted=1, inserted="*"))
+        self.assertEqual(document.errors, [])
+        self.assertMatchesFullParse(document)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import logging
+import unittest
+
+import instrumentation
+from instrumentation import LatencyHistogram, collect, add_hook, remove_hook
+from parser import parse, parse_flat
+from scaner import scan
+from template_cache import TemplateCache
+from token_buffer import scan_buffer
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def test_scan_and_parse_report_counts(self):
+        with collect() as records:
+            tokens = scan("(1 + 2) * -x")
+            parse(tokens)
+            parse(tokens, iterative=True)
+            parse_flat(scan_buffer("1 + 2"))
+
+        self.assertEqual([r.stage for r in records], ["scan", "parse", "parse", "scan", "parse"])
+        scan_stats, recursive, iterative, _, flat = records
+        self.assertEqual(scan_stats.tokens, 8)
+        self.assertEqual((recursive.tokens, recursive.nodes, recursive.max_depth), (8, 7, 4))
+        self.assertEqual((iterative.nodes, iterative.max_depth), (7, 4))
+        self.assertEqual((flat.tokens, flat.nodes, flat.max_depth), (3, 3, 2))
+        self.assertTrue(all(r.seconds >= 0 for r in records))
+
+    def test_template_cache_hits(self):
+        cache = TemplateCache()
+        with collect() as records:
+            cache.parse("1 + x")
+            cache.parse("2 + x")
+
+        hits = [r.cache_hit for r in records if r.stage == instrumentation.TEMPLATE_CACHE]
+        self.assertEqual(hits, [False, True])
+
+    def test_no_hooks_after_collect(self):
+        with collect():
+            pass
+        self.assertEqual(instrumentation.HOOKS, [])
+
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram()
+        add_hook(histogram)
+        try:
+            for _ in range(3):
+                parse(scan("1 + 2"))
+        finally:
+            remove_hook(histogram)
+
+        exported = histogram.export()
+        self.assertEqual(sum(exported["scan"].values()), 3)
+        self.assertEqual(sum(exported["parse"].values()), 3)
+        self.assertTrue(all(bound & (bound - 1) == 0 for bound in exported["parse"]))
+
+    def test_debug_logging_is_lazy(self):
+        with self.assertLogs("scaner", level=logging.DEBUG) as logs:
+            scan("1 + 2")
+        self.assertIn("Tokens: [", logs.output[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import dataclasses
+import unittest
+
+from interning import InternPool
+from scaner import Token, TokenType, Operators, Keywords, TOKEN_POOL, scan
+
+
+class InternPoolTestCase(unittest.TestCase):
+    def test_least_recently_used_is_evicted(self):
+        pool = InternPool(capacity=2)
+        make = lambda key: [key]
+
+        a = pool.intern("a", make)
+        pool.intern("b", make)
+        self.assertIs(pool.intern("a", make), a)
+        pool.intern("c", make)
+
+        self.assertIsNone(pool.get("b"))
+        self.assertIs(pool.get("a"), a)
+        stats = pool.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions, stats.size), (1, 3, 1, 2))
+        self.assertEqual(stats.hit_rate, 0.25)
+
+    def test_resize_and_disable(self):
+        pool = InternPool(capacity=3)
+        for key in "abc":
+            pool.intern(key, str.upper)
+
+        pool.resize(1)
+        self.assertEqual(list(pool.entries), ["c"])
+
+        pool.resize(0)
+        self.assertEqual(pool.intern("d", str.upper), "D")
+        self.assertEqual(len(pool), 0)
+
+        with self.assertRaises(ValueError):
+            InternPool(capacity=-1)
+
+
+class TokenInterningTestCase(unittest.TestCase):
+    def setUp(self):
+        self.capacity = TOKEN_POOL.capacity
+
+    def tearDown(self):
+        TOKEN_POOL.resize(self.capacity)
+
+    def test_tokens_are_immutable(self):
+        token = Token.create(Operators.PLUS)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            token.value = Operators.MINUS
+        self.assertFalse(hasattr(token, '__dict__'))
+
+    def test_flyweights(self):
+        for value in [Operators.PLUS, True, False, Keywords.SELECT]:
+            self.assertIs(Token.create(value), Token.create(value))
+        self.assertIs(Token.create(Keywords.SELECT).type, TokenType.KEYWORD)
+        self.assertIs(Token.create("SELECT").type, TokenType.IDENTIFIER)
+
+    def test_literal_types_kept_apart(self):
+        self.assertIs(Token.create(1).value.__class__, int)
+        self.assertIs(Token.create(1.0).value.__class__, float)
+        self.assertIs(Token.create(True).value, True)
+
+    def test_pool_stays_bounded(self):
+        TOKEN_POOL.resize(64)
+
+        scan(" + ".join(str(n) for n in range(1000)))
+
+        self.assertEqual(len(TOKEN_POOL), 64)
+        self.assertIs(Token.create(999), Token.create(999))
+        self.assertIs(Token.create(Operators.PLUS), scan("+")[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from lazy import parse_lazy, match_parens, LazyGroup
+from parser import parse
+from scaner import scan
+from token_buffer import scan_buffer
+from tree import preorder
+
+
+def values(node):
+    return [n.data.value for n in preorder(node)]
+
+
+class ParenIndexTestCase(unittest.TestCase):
+    def test_scan_buffer_matches_parens(self):
+        text = "((1 + 2) * (3)) - (4"
+        parens = {}
+
+        buffer = scan_buffer(text, parens=parens)
+
+        self.assertEqual(parens, {0: 10, 1: 5, 7: 9})
+        self.assertEqual(match_parens(list(buffer)), parens)
+        self.assertEqual(match_parens(scan(") (1)")), {1: 3})
+
+
+class LazyParseTestCase(unittest.TestCase):
+    def test_same_tree_as_parse(self):
+        for text in ["1 + 2 * 3", "((1 + 2) * -(x - 4)) >= NOT (flag) == (((7)))", "-(1) / (2)"]:
+            tokens = scan(text)
+            self.assertListEqual(values(parse_lazy(tokens)), values(parse(tokens)), text)
+
+            parens = {}
+            buffer = scan_buffer(text, parens=parens)
+            self.assertListEqual(values(parse_lazy(buffer, parens)), values(parse(tokens)), text)
+
+    def test_groups_are_parsed_on_access(self):
+        text = "(" * 200 + "1" + " + 1)" * 200 + " * (2)"
+        parens = {}
+        buffer = scan_buffer(text, parens=parens)
+
+        root = parse_lazy(buffer, parens)
+        left, right = root.descendants
+
+        self.assertIsInstance(left, LazyGroup)
+        self.assertFalse(left.parsed)
+        self.assertFalse(right.parsed)
+        self.assertEqual(right.descendants[0].data.value, 2)
+        self.assertTrue(right.parsed)
+        self.assertFalse(left.parsed)
+
+    def test_errors_inside_groups_are_deferred(self):
+        root = parse_lazy(scan("(1 2) + 3"))
+
+        with self.assertRaises(ValueError):
+            root.descendants[0].descendants
+
+        for text in ["(1 + 2", "()"]:
+            with self.assertRaises(ValueError):
+                values(parse_lazy(scan(text)))
+
+    def test_unbalanced_paren_fails_at_once(self):
+        for text in ["(" * 3000 + "1", "1 + (2 * (3)"]:
+            with self.assertRaisesRegex(ValueError, r"Unbalanced '\('"):
+                parse_lazy(scan(text))
+
+    def test_trailing_tokens(self):
+        for text in ["(1) 2", "1 + 2)", "(1) (2)"]:
+            with self.assertRaises(ValueError, msg=text):
+                parse_lazy(scan(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
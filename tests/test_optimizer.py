@@ -0,0 +1,86 @@
+import unittest
+
+from compiler import compile_tree
+from optimizer import optimize
+from parser import parse
+from scaner import scan, Token, TokenType, Operators
+from tree import preorder
+
+
+def optimized(text: str):
+    return optimize(parse(scan(text)))
+
+
+class OptimizerTestCase(unittest.TestCase):
+    def test_fold_constants(self):
+        for text, expected in [
+            ("(1 + 2) * 3", 9),
+            ("NOT NOT True", True),
+            ("-(4 - 6) / 4", 0.5),
+            ("1 < 2 == True", True),
+        ]:
+            tree = optimized(text)
+            self.assertFalse(tree.descendants, text)
+            self.assertEqual(tree.data, Token(TokenType.LITERAL, expected), text)
+
+    def test_folded_literal_keeps_type(self):
+        self.assertIs(optimized("2 - 1").data.value.__class__, int)
+        self.assertIs(optimized("1 == 1").data.value.__class__, bool)
+
+    def test_remove_grouping(self):
+        tree = optimized("((x))")
+        self.assertEqual(tree.data, Token(TokenType.IDENTIFIER, "x"))
+
+    def test_identities_need_int_literal_and_numeric_operand(self):
+        for text in ["1 / 0 * 1", "1 * (1 / 0)", "1 / 0 + 0", "0 + (1 / 0 - 0)", "(1 / 0) * (3 - 2) + (0 * 5)"]:
+            tree = optimized(text)
+            self.assertEqual(tree.data.value, Operators.DIVIDE, text)
+
+        # 1.0 and True are not int literals, comparisons are not numeric
+        for text in ["(1 / 0) * 1.0", "(1 / 0) + False", "(x > 2) + 0", "1 * (x == y)"]:
+            tree = optimized(text)
+            self.assertIn(tree.data.value, (Operators.MULTIPLY, Operators.PLUS), text)
+            self.assertEqual(len(tree.descendants), 2, text)
+
+    def test_identities_on_identifiers(self):
+        for text in ["x * 1", "1 * x", "x + 0", "0 + x", "x - 0", "((x * 1) + 0) - 0"]:
+            self.assertEqual(optimized(text).data, Token(TokenType.IDENTIFIER, "x"), text)
+        self.assertEqual(optimized("(x * 2) + 0").data.value, Operators.MULTIPLY)
+        self.assertEqual(optimized("-x * 1").data.value, Operators.MINUS)
+
+        # without the numeric assumption x may be a bool or a string
+        for text in ["x * 1", "1 * x", "x + 0", "x - 0", "(x * 2) + 0"]:
+            tree = optimize(parse(scan(text)), numeric_identifiers=False)
+            self.assertIn(tree.data.value, (Operators.MULTIPLY, Operators.PLUS, Operators.MINUS), text)
+            self.assertEqual(len(tree.descendants), 2, text)
+
+        flag_plus_zero = parse(scan("flag + 0"))
+        self.assertEqual(compile_tree(optimize(flag_plus_zero, numeric_identifiers=False))({"flag": True}), 1)
+        self.assertIs(compile_tree(optimize(flag_plus_zero))({"flag": True}), True)
+
+    def test_not_not_only_for_booleans(self):
+        self.assertEqual(optimized("NOT NOT (x > 1)").data.value, Operators.GREATER)
+        self.assertEqual(optimized("NOT NOT x").data.value, Operators.NOT)
+
+    def test_division_by_zero_not_folded(self):
+        tree = optimized("1 / (2 - 2)")
+        self.assertEqual(tree.data.value, Operators.DIVIDE)
+
+    def test_overflow_not_folded(self):
+        tree = optimized('1' + '0' * 400 + ' / 3')
+        self.assertEqual(tree.data.value, Operators.DIVIDE)
+
+    def test_optimized_tree_evaluates_the_same(self):
+        text = "(price * 1 + 0) * (2 + 3) > (10 - 0) == NOT NOT (qty >= 1)"
+        row = {"price": 3, "qty": 2}
+
+        tree = parse(scan(text))
+        result = optimize(tree)
+
+        self.assertEqual(compile_tree(result)(row), compile_tree(tree)(row))
+        self.assertLess(sum(1 for _ in preorder(result)), sum(1 for _ in preorder(tree)))
+        self.assertFalse(any(n.data.value == Operators.LEFT_PAREN for n in preorder(result)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from parallel import parse_many
+from parser import parse
+from scaner import scan
+from tree import preorder
+
+TEXTS = [f"(x{i} + {i}) * {i}.5 >= {i} == NOT flag" for i in range(50)]
+
+
+def values(node):
+    return [n.data.value for n in preorder(node)]
+
+
+class ParseManyTestCase(unittest.TestCase):
+    def test_ordered_results_match_parse(self):
+        for workers in (1, 2):
+            results = list(parse_many(TEXTS, workers=workers, chunksize=7))
+
+            self.assertEqual(len(results), len(TEXTS))
+            for text, tree in zip(TEXTS, results):
+                self.assertListEqual(values(tree.to_node()), values(parse(scan(text))))
+
+    def test_unordered_results_carry_index(self):
+        results = dict(parse_many(iter(TEXTS), workers=2, chunksize=4, ordered=False))
+
+        self.assertEqual(sorted(results), list(range(len(TEXTS))))
+        self.assertListEqual(values(results[13].to_node()), values(parse(scan(TEXTS[13]))))
+
+    def test_errors_are_raised(self):
+        with self.assertRaises(ValueError):
+            list(parse_many(["1 +", "2"], workers=2, chunksize=1))
+        with self.assertRaises(ValueError):
+            list(parse_many(["2", "(1) 2"], workers=2, chunksize=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
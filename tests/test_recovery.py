@@ -0,0 +1,100 @@
+import sys
+import unittest
+
+from parser import parse, to_flat, ExpressionType
+from recovery import parse_recovering, is_error
+from scaner import scan
+from statements import check_script
+from token_buffer import scan_buffer
+from tree import preorder
+
+
+def values(node):
+    return [n.data.value for n in preorder(node)]
+
+
+class RecoveringParserTestCase(unittest.TestCase):
+    def test_valid_input_matches_parse(self):
+        for text in ["1 + 2 * 3", "(x - 1) / -2 >= 4 == NOT flag", "((((7))))"]:
+            result = parse_recovering(scan(text))
+
+            self.assertTrue(result.ok)
+            self.assertListEqual(values(result.tree), values(parse(scan(text))))
+
+    def test_missing_operand_becomes_error_node(self):
+        result = parse_recovering(scan("1 + * 2"))
+
+        self.assertEqual(len(result.diagnostics), 1)
+        self.assertEqual(result.diagnostics[0].index, 2)
+        plus = result.tree
+        multiply = plus.descendants[1]
+        self.assertTrue(is_error(multiply.descendants[0]))
+        self.assertEqual(multiply.descendants[1].data.value, 2)
+        self.assertIn(ExpressionType.ERROR.value, to_flat(plus).kinds)
+
+    def test_syncs_at_closing_paren(self):
+        result = parse_recovering(scan("(1 2 3) + (4 SELECT) * ()"))
+
+        self.assertEqual([d.index for d in result.diagnostics], [2, 8, 12])
+        self.assertEqual(result.tree.descendants[1].data.value.value, "*")
+
+    def test_paren_problems(self):
+        cases = {
+            "(1 + 2": ("Unclosed", 0),
+            "1 + 2 ) * 3": ("Unmatched", 3),
+            "1 2": ("Unexpected token", 1),
+            "": ("Unexpected end of input", 0),
+        }
+        for text, (message, index) in cases.items():
+            diagnostics = parse_recovering(scan(text)).diagnostics
+
+            self.assertEqual(len(diagnostics), 1, text)
+            self.assertIn(message, diagnostics[0].message)
+            self.assertEqual(diagnostics[0].index, index)
+
+    def test_nesting_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 100
+
+        result = parse_recovering(scan("(" * depth + "1" + ")" * depth))
+        self.assertTrue(result.ok)
+        self.assertEqual(sum(1 for _ in preorder(result.tree)), depth + 1)
+
+        result = parse_recovering(scan("(" * depth + "1 +"))
+        self.assertEqual(len(result.diagnostics), depth + 1)
+        self.assertIn("end of input", result.diagnostics[0].message)
+        self.assertEqual(result.diagnostics[-1].index, 0)
+
+    def test_buffer_spans(self):
+        text = "  1 + (2 *"
+
+        result = parse_recovering(scan_buffer(text))
+
+        self.assertEqual([d.span for d in result.diagnostics], [(10, 10), (6, 7)])
+
+
+class CheckScriptTestCase(unittest.TestCase):
+    def test_reports_every_problem_in_one_pass(self):
+        text = "1 + @ 2;\n(3 +;\nok;\n1.2.3 * x"
+
+        results = check_script(text)
+
+        self.assertEqual([r.ok for r in results], [False, False, True, False])
+        spans = [d.span for r in results for d in r.diagnostics]
+        self.assertEqual([text[a:b] for a, b in spans], ["@", "(", "", "1.2.3", "*"])
+        # the unknown character is skipped, the rest of the statement parses
+        self.assertListEqual(values(results[0].tree), values(parse(scan("1 + 2"))))
+
+    def test_deep_script_does_not_raise(self):
+        depth = sys.getrecursionlimit() + 100
+
+        results = check_script("(" * depth + "1" + ")" * depth + "; " + "(" * depth + "1 +")
+
+        self.assertEqual([r.ok for r in results], [True, False])
+
+    def test_scan_buffer_still_raises_by_default(self):
+        with self.assertRaises(ValueError):
+            scan_buffer("1 + @")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,11 @@
+import io
 import logging
 import unittest
 
-from parser import parse
-from scaner import Operators, TokenType, Token, scan
-from tree import display, TreeNode
+from parser import parse, parse_flat, to_flat, ExpressionType
+from cursor import StrCursor
+from scaner import Operators, TokenType, Token, scan, get_token, iter_scan
+from tree import display, TreeNode, height
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -93,8 +95,90 @@ class ScannerTestCase(unittest.TestCase):
         self.assertTrue(isinstance(tokens, list))
 
     def test_scan_not_separated_literals(self):
+        tokens = scan("TrueFalse")
+        self.assertListEqual(tokens, [
+            Token(TokenType.IDENTIFIER, "TrueFalse"),
+        ])
+
+    def test_scan_identifiers_and_not(self):
+        tokens = scan("NOT price_2 != not_a")
+        self.assertListEqual(tokens, [
+            Token(TokenType.OPERATOR, Operators.NOT),
+            Token(TokenType.IDENTIFIER, "price_2"),
+            Token(TokenType.OPERATOR, Operators.NOT_EQUAL),
+            Token(TokenType.IDENTIFIER, "not_a"),
+        ])
+
+        with self.assertRaises(ValueError):
+            scan("1 ! 2")
+
+    def test_scan_matches_character_scanner(self):
+        for text in [
+            "+ - * / ( ) True False < > <= >= == = 1 1.2",
+            "((1+2)*3.25)<=(4>=5)==False",
+            "  12   >   3 ",
+            "True1 = 2.5",
+            "NOT x_1 != (y)",
+            "s.t, 'it''s' <> ''; x<>'a'",
+        ]:
+            cur = StrCursor(text)
+            expected = []
+            while cur.has_any:
+                if t := get_token(cur):
+                    expected.append(t)
+
+            self.assertListEqual(scan(text), expected)
+
+    def test_scan_sql_punctuation_and_strings(self):
+        tokens = scan("s.t, name <> 'it''s';")
+        self.assertListEqual(tokens, [
+            Token(TokenType.IDENTIFIER, "s"),
+            Token(TokenType.OPERATOR, Operators.PERIOD),
+            Token(TokenType.IDENTIFIER, "t"),
+            Token(TokenType.OPERATOR, Operators.COMMA),
+            Token(TokenType.IDENTIFIER, "name"),
+            Token(TokenType.OPERATOR, Operators.NOT_EQUAL),
+            Token(TokenType.LITERAL, "it's"),
+            Token(TokenType.OPERATOR, Operators.SEMICOLON),
+        ])
+        self.assertEqual(scan("''"), [Token(TokenType.LITERAL, "")])
+
+        for text in ["'open", "'it''s", "'"]:
+            with self.assertRaisesRegex(ValueError, "Unterminated string literal"):
+                scan(text)
+
+    def test_scan_literal_types_not_shared(self):
+        tokens = scan("True 1 1.0")
+        self.assertIs(tokens[0].value, True)
+        self.assertIs(type(tokens[1].value), int)
+        self.assertIs(type(tokens[2].value), float)
+
+    def test_iter_scan_tokens_across_chunks(self):
+        text = "(1231 + 13.25) <= False == True <> 'it''s a; b'"
+        expected = scan(text)
+
+        for size in range(1, len(text) + 1):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            self.assertListEqual(list(iter_scan(chunks)), expected)
+
+    def test_iter_scan_file_object(self):
+        tokens = iter_scan(io.StringIO("12 >= 3.5"), chunk_size=2)
+        self.assertListEqual(list(tokens), [
+            Token(TokenType.LITERAL, 12),
+            Token(TokenType.OPERATOR, Operators.GREATER_OR_EQUAL),
+            Token(TokenType.LITERAL, 3.5),
+        ])
+
+    def test_iter_scan_rejects_binary_files(self):
         with self.assertRaises(ValueError):
-            scan("TrueFalse")
+            list(iter_scan(io.BytesIO(b"12 >= 3.5")))
+
+    def test_iter_scan_carries_only_lexemes(self):
+        chunks = ["1"] + [" " * 1000] * 2000 + ["+ 2"]
+        self.assertListEqual(list(iter_scan(chunks)), scan("1 + 2"))
+
+        with self.assertRaises(ValueError):
+            list(iter_scan(["7" * (1 << 16)] * 20))
 
 
 class ParserTestCase(unittest.TestCase):
@@ -137,6 +221,69 @@ class ParserTestCase(unittest.TestCase):
         ast_head = parse(tokens)
         display(ast_head)
 
+    def test_parse_left_associative_chain(self):
+        ast_head = parse(scan("1 + 2 + 3 - 4"))
+
+        self.assertEqual(render(ast_head), "((1 + 2) + 3) - 4")
+
+    def test_parse_operator_precedence(self):
+        ast_head = parse(scan("1 + 2 * 3 <= -4 / 5 == True"))
+
+        self.assertEqual(render(ast_head), "((1 + (2 * 3)) <= ((-4) / 5)) == True")
+
+    def test_parse_unexpected_token(self):
+        for text in ["1 +", "* 2", ")", "(1", "(1 2)", "1 2", "1 )", "(1) 2"]:
+            with self.assertRaises(ValueError):
+                parse(scan(text))
+            with self.assertRaises(ValueError):
+                parse(scan(text), iterative=True)
+            with self.assertRaises(ValueError):
+                parse_flat(scan(text))
+
+    def test_parse_iterative_same_tree(self):
+        for text in [
+            "1 + 2 + 3 - 4",
+            "1 + 2 * 3 <= -4 / 5 == True",
+            "((True) == -(-(1 - 2)) * 3)",
+        ]:
+            tokens = scan(text)
+            self.assertEqual(render(parse(tokens, iterative=True)), render(parse(tokens)))
+
+    def test_parse_flat(self):
+        tokens = scan("(1 + 2) * -3")
+
+        flat = parse_flat(tokens)
+
+        self.assertEqual(len(flat), 7)
+        self.assertEqual(flat.kinds[flat.root], ExpressionType.BINARY.value)
+        self.assertEqual(flat.items[flat.root], 5)
+        self.assertEqual(render(flat.to_node()), render(parse(tokens)))
+        self.assertEqual(list(to_flat(parse(tokens)).kinds).count(ExpressionType.LITERAL.value), 3)
+
+    def test_parse_iterative_deep_nesting(self):
+        depth = 20000
+        tokens = scan("(" * depth + "1" + ")" * depth + " + 2")
+
+        ast_head = parse(tokens, iterative=True)
+
+        self.assertEqual(ast_head.data, Token.create(Operators.PLUS))
+        self.assertEqual(height(ast_head), depth + 2)
+
+
+def render(node: TreeNode) -> str:
+    def operand(child: TreeNode) -> str:
+        text = render(child)
+        return f"({text})" if child.descendants and child.data.value != Operators.LEFT_PAREN else text
+
+    if node.data.value == Operators.LEFT_PAREN:
+        return f"({render(node.descendants[0])})"
+    if node.size == 1:
+        return f"{node.data.value.value}{render(node.descendants[0])}"
+    if node.size == 2:
+        left, right = node.descendants
+        return f"{operand(left)} {node.data.value.value} {operand(right)}"
+    return str(node.data.value)
+
 
 if __name__ == '__main__':
     unittest.main()
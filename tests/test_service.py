@@ -0,0 +1,120 @@
+import asyncio
+import os
+import socket
+import tempfile
+import unittest
+
+from parser import parse
+from scaner import scan
+from service import ParseServer, ParseClient, FRAME, MAX_FRAME, ERROR, PARSE
+from tree import preorder
+
+TEXTS = [f"(x{i} + {i}) * {i}.5 >= {i} == NOT flag" for i in range(40)]
+
+
+def values(node):
+    return [n.data.value for n in preorder(node)]
+
+
+class ParseServiceTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "parser.sock")
+
+    async def asyncTearDown(self):
+        self.directory.cleanup()
+
+    async def test_concurrent_requests_are_batched(self):
+        async with ParseServer(self.path, workers=1, batch_delay=0.01) as server:
+            async with ParseClient(self.path, pool_size=8) as client:
+                trees = await asyncio.gather(*(client.parse(text) for text in TEXTS))
+
+        for text, tree in zip(TEXTS, trees):
+            self.assertListEqual(values(tree), values(parse(scan(text))))
+        self.assertEqual(server.stats.batched_requests, len(TEXTS))
+        self.assertLess(server.stats.batches, len(TEXTS))
+
+    async def test_scan_and_shared_cache(self):
+        async with ParseServer(self.path, workers=2) as server:
+            async with ParseClient(self.path) as first, ParseClient(self.path) as second:
+                tokens = await first.scan("  12 >= price")
+                await first.parse("1 + 2")
+                tree = await second.parse("1 + 2")
+
+        self.assertListEqual(list(tokens), scan("12 >= price"))
+        self.assertEqual(tokens.span(0), (2, 4))
+        self.assertListEqual(values(tree), values(parse(scan("1 + 2"))))
+        self.assertEqual(server.stats.cache_hits, 1)
+
+    async def test_cache_is_bounded_by_bytes(self):
+        large = " + ".join(["1"] * 500)
+        small = [f"{i} + x" for i in range(20)]
+
+        async with ParseServer(self.path, workers=1, cache_bytes=1000) as server:
+            async with ParseClient(self.path, pool_size=1) as client:
+                for _ in range(2):
+                    await client.parse(large)
+                self.assertEqual(server.stats.cache_hits, 0)
+                self.assertEqual(len(server.cache), 0)
+
+                for text in small + small[-1:]:
+                    await client.parse(text)
+
+        self.assertEqual(server.stats.cache_hits, 1)
+        self.assertLess(len(server.cache), len(small))
+        self.assertEqual(server.cached_bytes, sum(len(text) + len(payload) for (_, text), payload in server.cache.items()))
+        self.assertLessEqual(server.cached_bytes, 1000)
+        self.assertNotIn((PARSE, small[0]), server.cache)
+
+    async def test_errors_are_raised_as_value_error(self):
+        async with ParseServer(self.path, workers=1):
+            async with ParseClient(self.path, pool_size=1) as client:
+                with self.assertRaises(ValueError):
+                    await client.parse("1 +")
+                with self.assertRaises(ValueError):
+                    await client.scan("1 @ 2")
+
+                tree = await client.parse("NOT True")
+                self.assertListEqual(values(tree), values(parse(scan("NOT True"))))
+
+    async def test_oversize_frames_get_an_error(self):
+        async with ParseServer(self.path, workers=1):
+            async with ParseClient(self.path) as client:
+                with self.assertRaises(ValueError):
+                    await client.scan("1" * MAX_FRAME)
+
+            reader, writer = await asyncio.open_unix_connection(self.path)
+            writer.write(FRAME.pack(MAX_FRAME + 1))
+            length, = FRAME.unpack(await reader.readexactly(FRAME.size))
+            response = await reader.readexactly(length)
+            writer.close()
+            await writer.wait_closed()
+
+        self.assertEqual(response[0], ERROR)
+
+    async def test_start_keeps_other_files_and_live_servers(self):
+        with open(self.path, 'w') as f:
+            f.write("keep")
+        with self.assertRaises(ValueError):
+            await ParseServer(self.path, workers=1).start()
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "keep")
+        os.unlink(self.path)
+
+        async with ParseServer(self.path, workers=1):
+            with self.assertRaises(ValueError):
+                await ParseServer(self.path, workers=1).start()
+            async with ParseClient(self.path) as client:
+                await client.parse("1 + 2")
+
+    async def test_start_replaces_a_stale_socket(self):
+        with socket.socket(socket.AF_UNIX) as stale:
+            stale.bind(self.path)
+
+        async with ParseServer(self.path, workers=1):
+            async with ParseClient(self.path) as client:
+                await client.parse("1 + 2")
+
+
+if __name__ == '__main__':
+    unittest.main()
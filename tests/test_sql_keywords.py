@@ -0,0 +1,48 @@
+import pickle
+import unittest
+
+from scaner import scan, Keywords, Token, TokenType, Operators
+from sql_keywords import RESERVED, NON_RESERVED, lookup, is_reserved
+from token_buffer import scan_buffer
+
+
+class SqlKeywordsTestCase(unittest.TestCase):
+    def test_lookup_ignores_case(self):
+        for word in ["select", "SELECT", "Select", "sElEcT"]:
+            self.assertEqual(lookup(word), "SELECT")
+        self.assertEqual(lookup("schema"), "SCHEMA")
+        self.assertIsNone(lookup("price"))
+        self.assertIsNone(lookup("x" * 100))
+
+    def test_reserved_and_non_reserved_are_disjoint(self):
+        self.assertFalse(set(RESERVED) & set(NON_RESERVED))
+        self.assertTrue(is_reserved("from"))
+        self.assertFalse(is_reserved("Schema"))
+        self.assertFalse(is_reserved("my_table"))
+
+    def test_keywords_enum_covers_table(self):
+        self.assertEqual(len(Keywords), len(RESERVED) + len(NON_RESERVED))
+        self.assertEqual(Keywords.SELECT.value, "SELECT")
+        self.assertIn("WHERE", Keywords)
+        self.assertIn(Keywords.WHERE, Keywords)
+        self.assertNotIn("price", Keywords)
+        self.assertNotIn([], Keywords)
+        self.assertIs(pickle.loads(pickle.dumps(Keywords.FROM)), Keywords.FROM)
+
+    def test_scanner_emits_grammar_keywords_only(self):
+        tokens = scan("select Schema from NOT true")
+
+        self.assertEqual(tokens, [
+            Token.create(Keywords.SELECT),
+            Token.create("Schema"),
+            Token.create("from"),
+            Token.create(Operators.NOT),
+            Token.create(True),
+        ])
+        self.assertListEqual(list(scan_buffer("select Schema from NOT true")), tokens)
+        self.assertIs(tokens[1].type, TokenType.IDENTIFIER)
+        self.assertIs(tokens[2].type, TokenType.IDENTIFIER)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from parser import parse
+from scaner import scan
+from statements import split_statements, parse_script
+from tree import preorder
+
+
+def values(node):
+    return [n.data.value for n in preorder(node)]
+
+
+class SplitStatementsTestCase(unittest.TestCase):
+    def test_spans_are_trimmed(self):
+        text = "  CREATE SCHEMA s;\n CREATE TABLE s.t (id INT) ;;  "
+
+        spans = split_statements(text)
+
+        self.assertEqual([text[a:b] for a, b in spans], ["CREATE SCHEMA s", "CREATE TABLE s.t (id INT)"])
+
+    def test_separators_in_quotes_and_comments_are_ignored(self):
+        text = (
+            "INSERT INTO t VALUES ('a;b', 'it''s;');\n"
+            "-- comment; with separator\n"
+            "SELECT \"odd;name\" /* block; comment */ FROM t;\n"
+            "/* trailing; */"
+        )
+
+        spans = split_statements(text)
+
+        self.assertEqual([text[a:b] for a, b in spans], [
+            "INSERT INTO t VALUES ('a;b', 'it''s;')",
+            "SELECT \"odd;name\" /* block; comment */ FROM t",
+        ])
+
+    def test_unterminated_quote_runs_to_end(self):
+        text = "SELECT 'a; b"
+        self.assertEqual(split_statements(text), [(0, len(text))])
+
+    def test_empty_script(self):
+        self.assertEqual(split_statements(" ; -- nothing\n ;"), [])
+
+
+class ParseScriptTestCase(unittest.TestCase):
+    STATEMENTS = ["1 + 2", "(x * 3)\n == 4", "NOT flag", "-price / 2.5 >= qty"]
+
+    def test_statements_parse_in_order(self):
+        text = "; ".join(self.STATEMENTS) + "; -- done\n"
+
+        for workers in (1, 2):
+            trees = parse_script(text, workers=workers, chunksize=1)
+
+            self.assertEqual(len(trees), len(self.STATEMENTS))
+            for statement, tree in zip(self.STATEMENTS, trees):
+                self.assertListEqual(values(tree.to_node()), values(parse(scan(statement))))
+
+            # offsets point into the script for pooled and inline parsing alike
+            last = trees[-1].data
+            self.assertIs(last.source, text)
+            self.assertEqual(last.text(0), "-")
+            self.assertEqual(last.span(0)[0], text.index("-price"))
+
+    def test_first_error_names_statement(self):
+        text = "1 + 2; 3 +; 4 )"
+        for workers in (1, 2):
+            with self.assertRaisesRegex(ValueError, "Statement 2 at 7:10"):
+                parse_script(text, workers=workers, chunksize=1)
+
+    def test_trailing_tokens_are_errors(self):
+        with self.assertRaisesRegex(ValueError, "Statement 2 at 7:10"):
+            parse_script("1 + 2; 4 ); 5", workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
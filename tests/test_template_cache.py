@@ -0,0 +1,65 @@
+import unittest
+
+from parser import parse
+from scaner import scan
+from template_cache import TemplateCache, fingerprint
+from tree import preorder
+
+
+def values(node):
+    return [n.data.value for n in preorder(node)]
+
+
+class TemplateCacheTestCase(unittest.TestCase):
+    def test_literals_share_template(self):
+        cache = TemplateCache()
+
+        first = cache.parse("x > 5")
+        second = cache.parse("x > 7")
+
+        self.assertListEqual(values(second), values(parse(scan("x > 7"))))
+        self.assertNotEqual(values(first), values(second))
+
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 1, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+    def test_literal_types_and_names_change_fingerprint(self):
+        self.assertEqual(fingerprint(scan("x > 5")), fingerprint(scan("x > 7")))
+        self.assertNotEqual(fingerprint(scan("x > 5")), fingerprint(scan("x > 5.0")))
+        self.assertNotEqual(fingerprint(scan("x > 5")), fingerprint(scan("x > True")))
+        self.assertNotEqual(fingerprint(scan("x > 5")), fingerprint(scan("y > 5")))
+
+    def test_lru_eviction(self):
+        cache = TemplateCache(maxsize=2, policy="lru")
+
+        cache.parse("a + 1")
+        cache.parse("b + 1")
+        cache.parse("a + 2")
+        cache.parse("c + 1")
+        cache.parse("b + 2")
+
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions), (1, 4, 2))
+
+    def test_lfu_eviction(self):
+        cache = TemplateCache(maxsize=2, policy="lfu")
+
+        cache.parse("a + 1")
+        cache.parse("a + 2")
+        cache.parse("b + 1")
+        cache.parse("c + 1")
+        cache.parse("a + 3")
+
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions), (2, 3, 1))
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            TemplateCache(policy="fifo")
+        with self.assertRaises(ValueError):
+            TemplateCache(maxsize=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from cursor import Cursor
+from parser import parse
+from scaner import scan, Operators, Token
+from token_buffer import scan_buffer, INT_KIND, FLOAT_KIND
+
+
+class TokenBufferTestCase(unittest.TestCase):
+    def test_buffer_matches_scan(self):
+        text = "(1231 + 13.25) <= False == NOT True * price != 7 <> 'it''s', t.c;"
+
+        buffer = scan_buffer(text)
+
+        self.assertEqual(len(buffer), len(scan(text)))
+        self.assertListEqual(list(buffer), scan(text))
+
+    def test_buffer_spans_point_into_source(self):
+        text = "  12 >= 3.5"
+
+        buffer = scan_buffer(text)
+
+        self.assertEqual(buffer.span(0), (2, 4))
+        self.assertEqual(buffer.text(1), ">=")
+        self.assertEqual(buffer.kind(0), INT_KIND)
+        self.assertEqual(buffer.kind(2), FLOAT_KIND)
+        self.assertEqual(buffer.value(2), 3.5)
+
+    def test_buffer_invalid_input(self):
+        for text in ["@", "!", "1.2.3"]:
+            with self.assertRaises(ValueError):
+                scan_buffer(text)
+
+    def test_cursor_and_parse_accept_buffer(self):
+        buffer = scan_buffer("(True) == False")
+
+        cur = Cursor(buffer)
+        self.assertEqual(cur.peek(), Token.create(Operators.LEFT_PAREN))
+
+        ast_head = parse(buffer)
+        self.assertEqual(ast_head.data, Token.create(Operators.EQUAL))
+        self.assertEqual(len(ast_head.descendants), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
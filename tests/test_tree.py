@@ -0,0 +1,69 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from tree import TreeNode, FlatTree, display, display_flat, preorder, postorder, height
+
+
+def build_sample() -> TreeNode:
+    # (a + b) * c
+    root = TreeNode('*')
+    plus_node = TreeNode('+')
+    plus_node.add(TreeNode('a'))
+    plus_node.add(TreeNode('b'))
+    root.add(plus_node)
+    root.add(TreeNode('c'))
+    return root
+
+
+class TreeTestCase(unittest.TestCase):
+    def test_traversal_order(self):
+        root = build_sample()
+
+        self.assertListEqual([n.data for n in preorder(root)], ['*', '+', 'a', 'b', 'c'])
+        self.assertListEqual([n.data for n in postorder(root)], ['a', 'b', '+', 'c', '*'])
+        self.assertEqual(height(root), 3)
+
+    def test_display(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            display(build_sample())
+
+        self.assertEqual(out.getvalue(), "\n".join([
+            "└── *",
+            "    ├── +",
+            "    │   ├── a",
+            "    │   └── b",
+            "    └── c",
+        ]) + "\n")
+
+    def test_flat_tree_round_trip(self):
+        flat = FlatTree.from_node(build_sample())
+
+        self.assertEqual(len(flat), 5)
+        self.assertEqual(flat.value(flat.root), '*')
+        self.assertListEqual([flat.value(i) for i in flat.children(flat.root)], ['+', 'c'])
+        self.assertListEqual([n.data for n in preorder(flat.to_node())], ['*', '+', 'a', 'b', 'c'])
+
+    def test_display_flat_matches_display(self):
+        expected, actual = io.StringIO(), io.StringIO()
+        with redirect_stdout(expected):
+            display(build_sample())
+        with redirect_stdout(actual):
+            display_flat(FlatTree.from_node(build_sample()))
+
+        self.assertEqual(actual.getvalue(), expected.getvalue())
+
+    def test_deep_tree_beyond_recursion_limit(self):
+        root = node = TreeNode(0)
+        for i in range(1, 20000):
+            child = TreeNode(i)
+            node.add(child)
+            node = child
+
+        self.assertEqual(height(root), 20000)
+        self.assertEqual(sum(1 for _ in postorder(root)), 20000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from parser import parse
+from scaner import scan
+
+try:
+    import numpy as np
+    from vectorized import BatchEvaluator, evaluate_batch
+except ImportError:
+    np = None
+
+
+@unittest.skipUnless(np, "numpy is not installed")
+class BatchEvaluatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.columns = {
+            "price": np.array([10.0, 20.0, 30.0, 40.0]),
+            "qty": np.array([1, 6, 2, 5]),
+            "archived": np.array([False, False, True, False]),
+        }
+
+    def test_predicate_over_columns(self):
+        result = evaluate_batch(parse(scan("price * qty > 50 == NOT archived")), self.columns)
+
+        np.testing.assert_array_equal(result, [False, True, False, True])
+
+    def test_arithmetic_matches_row_evaluation(self):
+        tree = parse(scan("-(price - 5) / 2 + qty * (3 - 1)"))
+
+        result = evaluate_batch(tree, self.columns)
+
+        expected = [-(p - 5) / 2 + q * (3 - 1) for p, q in zip(self.columns["price"], self.columns["qty"])]
+        np.testing.assert_allclose(result, expected)
+
+    def test_scratch_buffers_reused(self):
+        evaluator = BatchEvaluator(parse(scan("(price + 1) * (qty + 2) - price / qty")))
+        out = np.empty(4)
+
+        evaluator(self.columns, out=out)
+        scratch = {key: buffer for key, buffer in evaluator._scratch.items()}
+        second = evaluator(self.columns, out=out)
+
+        self.assertIs(second, out)
+        self.assertEqual(evaluator._scratch.keys(), scratch.keys())
+        for key, buffer in evaluator._scratch.items():
+            self.assertIs(buffer, scratch[key])
+
+    def test_constant_and_column_expressions(self):
+        np.testing.assert_array_equal(evaluate_batch(parse(scan("(1 + 2) * qty")), self.columns), [3, 18, 6, 15])
+        np.testing.assert_array_equal(evaluate_batch(parse(scan("qty")), self.columns), [1, 6, 2, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
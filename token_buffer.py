@@ -0,0 +1,194 @@
+import re
+import time
+from array import array
+from typing import Dict, Sequence, List, Tuple, Union, Optional, overload
+
+from diagnostics import Diagnostic
+from instrumentation import HOOKS, SCAN, CallStats, emit
+from scaner import Token, TokenType, Operators, Keywords, OPERATOR_ALIASES, TOKEN_PATTERN, scan_word, cast_number, \
+    cast_string
+from utils import narrow, widen
+
+# Kind codes stored per token: operators take their position in `Operators`,
+# literal classes follow. Only INT, FLOAT, KEYWORD, IDENTIFIER and STRING need
+# their source span to build a value, every other kind maps to one shared token.
+OPERATOR_KINDS = list(Operators)
+INT_KIND = len(OPERATOR_KINDS)
+FLOAT_KIND = INT_KIND + 1
+TRUE_KIND = INT_KIND + 2
+FALSE_KIND = INT_KIND + 3
+KEYWORD_KIND = INT_KIND + 4
+IDENTIFIER_KIND = INT_KIND + 5
+STRING_KIND = INT_KIND + 6
+
+OPERATOR_CODES = {op.value: code for code, op in enumerate(OPERATOR_KINDS)}
+OPERATOR_CODES.update((alias, OPERATOR_CODES[op.value]) for alias, op in OPERATOR_ALIASES.items())
+LEFT_PAREN_KIND = OPERATOR_CODES[Operators.LEFT_PAREN.value]
+RIGHT_PAREN_KIND = OPERATOR_CODES[Operators.RIGHT_PAREN.value]
+
+SHARED_TOKENS: List[Optional[Token]] = [Token.create(op) for op in OPERATOR_KINDS] + [
+    None,
+    None,
+    Token.create(True),
+    Token.create(False),
+    None,
+    None,
+    None,
+]
+
+
+def decode_token(kind: int, raw: str) -> Token:
+    """
+    Token of a kind without a shared instance, from its source text.
+    """
+    if kind == IDENTIFIER_KIND:
+        return Token.create(raw)
+    if kind == KEYWORD_KIND:
+        return Token.create(Keywords(raw.upper()))
+    if kind == STRING_KIND:
+        return Token.from_literal(cast_string(raw))
+    return Token.create(cast_number(raw))
+
+
+class TokenBuffer(Sequence[Token]):
+    """
+    Struct-of-arrays token stream: kind codes plus [start, end) offsets into
+    the scanned source. Tokens are materialized on access.
+    """
+
+    __slots__ = ('source', 'kinds', 'starts', 'ends')
+
+    def __init__(self, source: str):
+        self.source = source
+        self.kinds = array('B')
+        self.starts = array('q')
+        self.ends = array('q')
+
+    def append(self, kind: int, start: int, end: int) -> None:
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def kind(self, index: int) -> int:
+        return self.kinds[index]
+
+    def span(self, index: int) -> Tuple[int, int]:
+        return self.starts[index], self.ends[index]
+
+    def text(self, index: int) -> str:
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def token(self, index: int) -> Token:
+        kind = self.kinds[index]
+        if (shared := SHARED_TOKENS[kind]) is not None:
+            return shared
+
+        return decode_token(kind, self.text(index))
+
+    def value(self, index: int) -> Union[Operators, Keywords, int, float, bool, str]:
+        return self.token(index).value
+
+    def __getstate__(self):
+        return self.source, self.kinds, narrow(self.starts), narrow(self.ends)
+
+    def __setstate__(self, state):
+        source, kinds, starts, ends = state
+        self.source = source
+        self.kinds = kinds
+        self.starts = widen(starts)
+        self.ends = widen(ends)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Token]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.token(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return self.token(index)
+
+    def __repr__(self):
+        return f"TokenBuffer(tokens={len(self)}, source_length={len(self.source)})"
+
+
+def word_kind(lexeme: str) -> int:
+    token = scan_word(lexeme)
+    if token.type is TokenType.IDENTIFIER:
+        return IDENTIFIER_KIND
+    if token.type is TokenType.KEYWORD:
+        return KEYWORD_KIND
+    if token.type is TokenType.OPERATOR:
+        return OPERATOR_CODES[token.value.value]
+    return TRUE_KIND if token.value else FALSE_KIND
+
+
+def match_kind(m: re.Match) -> int:
+    kind = m.lastgroup
+    lexeme = m.group()
+
+    if kind == 'OPERATOR':
+        return OPERATOR_CODES[lexeme]
+    if kind == 'NUMBER':
+        points = lexeme.count('.')
+        if points > 1:
+            raise ValueError(f"Invalid number: `{lexeme}`")
+        return FLOAT_KIND if points else INT_KIND
+    if kind == 'WORD':
+        return word_kind(lexeme)
+    if kind == 'STRING':
+        cast_string(lexeme)
+        return STRING_KIND
+    raise ValueError(f"Unknown token: `{lexeme}`")
+
+
+def scan_buffer(
+        text: str,
+        start: int = 0,
+        stop: Optional[int] = None,
+        errors: Optional[List[Diagnostic]] = None,
+        parens: Optional[Dict[int, int]] = None
+) -> TokenBuffer:
+    """
+    Scans `text[start:stop]` without copying it; offsets stay relative to
+    the whole of `text`.
+
+    With an `errors` list, invalid lexemes are recorded there and skipped
+    instead of raising ValueError. With a `parens` dict, the token index of
+    every `(` is mapped to the index of its matching `)`; unbalanced parens
+    are left out.
+    """
+    started = time.perf_counter() if HOOKS else 0.0
+    buffer = TokenBuffer(text)
+    append = buffer.append
+    opened: List[int] = []
+
+    for m in TOKEN_PATTERN.finditer(text, start, len(text) if stop is None else stop):
+        if m.lastgroup == 'SPACE':
+            continue
+        try:
+            kind = match_kind(m)
+        except ValueError as e:
+            if errors is None:
+                raise
+            errors.append(Diagnostic(str(e), len(buffer), m.span()))
+            continue
+
+        if parens is not None:
+            if kind == LEFT_PAREN_KIND:
+                opened.append(len(buffer))
+            elif kind == RIGHT_PAREN_KIND and opened:
+                parens[opened.pop()] = len(buffer)
+        append(kind, m.start(), m.end())
+
+    if HOOKS:
+        emit(CallStats(SCAN, time.perf_counter() - started, tokens=len(buffer)))
+    return buffer
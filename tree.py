@@ -1,4 +1,7 @@
-from typing import Self, List, TypeVar
+from array import array
+from typing import Self, List, TypeVar, Iterator, Tuple, Sequence, Callable, Optional
+
+from utils import narrow, widen
 
 T = TypeVar('T')
 
@@ -26,6 +29,113 @@ class TreeNode[T]:
         return self.data.__repr__()
 
 
+NO_NODE = -1
+
+
+class FlatTree[T]:
+    """
+    Arena form of a tree: kind code, index into `data`, first child and next
+    sibling per node, kept in parallel typed arrays. NO_NODE marks a missing
+    link.
+    """
+
+    def __init__(self, data: Sequence[T]):
+        self.data = data
+        self.kinds = array('B')
+        self.items = array('q')
+        self.first_child = array('q')
+        self.next_sibling = array('q')
+        self.root = NO_NODE
+
+    def add(self, kind: int, item: int) -> int:
+        self.kinds.append(kind)
+        self.items.append(item)
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        return len(self.kinds) - 1
+
+    def link(self, parent: int, children: Sequence[int]) -> None:
+        previous = NO_NODE
+        for child in children:
+            if previous == NO_NODE:
+                self.first_child[parent] = child
+            else:
+                self.next_sibling[previous] = child
+            previous = child
+
+    def children(self, index: int) -> Iterator[int]:
+        child = self.first_child[index]
+        while child != NO_NODE:
+            yield child
+            child = self.next_sibling[child]
+
+    def value(self, index: int) -> T:
+        return self.data[self.items[index]]
+
+    def to_node(self, data: Optional[Sequence[T]] = None) -> TreeNode[T]:
+        """
+        Builds TreeNodes; `data` replaces the tree's own sequence, e.g. to bind
+        a cached shape to a new token stream.
+        """
+        if self.root == NO_NODE:
+            return None
+
+        data = self.data if data is None else data
+        items, first_child, next_sibling = self.items, self.first_child, self.next_sibling
+        nodes = [TreeNode(data[item]) for item in items]
+        for parent, node in enumerate(nodes):
+            child = first_child[parent]
+            while child != NO_NODE:
+                node.add(nodes[child])
+                child = next_sibling[child]
+        return nodes[self.root]
+
+    @classmethod
+    def from_node(cls, node: TreeNode[T], kind_of: Callable[[TreeNode[T]], int] = lambda n: 0) -> 'FlatTree[T]':
+        data: List[T] = []
+        tree = cls(data)
+
+        tree.root = tree.add(kind_of(node), len(data))
+        data.append(node.data)
+
+        stack = [(node, tree.root)]
+        while stack:
+            current, index = stack.pop()
+            children = []
+            for descendant in current.descendants:
+                child = tree.add(kind_of(descendant), len(data))
+                data.append(descendant.data)
+                children.append(child)
+                stack.append((descendant, child))
+            tree.link(index, children)
+
+        return tree
+
+    def __getstate__(self):
+        return {
+            'data': self.data,
+            'kinds': self.kinds,
+            'items': narrow(self.items),
+            'first_child': narrow(self.first_child),
+            'next_sibling': narrow(self.next_sibling),
+            'root': self.root,
+        }
+
+    def __setstate__(self, state):
+        self.data = state['data']
+        self.kinds = state['kinds']
+        self.items = widen(state['items'])
+        self.first_child = widen(state['first_child'])
+        self.next_sibling = widen(state['next_sibling'])
+        self.root = state['root']
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __repr__(self):
+        return f"FlatTree(nodes={len(self)}, root={self.root})"
+
+
 # expected
 # *
 # ├── +
@@ -33,18 +143,96 @@ class TreeNode[T]:
 # │   └── b
 # └── c
 def display(node: TreeNode, indent="", is_last=True):
-    if node is None:
-        return
+    for line_indent, is_last_line, current in walk(node, indent, is_last):
+        line_start = "└── " if is_last_line else "├── "
+        print(line_indent + line_start + str(current))
+
 
-    line_start = "└── " if is_last else "├── "
+# All traversals below keep their own stack, so tree depth is limited by
+# memory rather than by the interpreter recursion limit.
+def walk(node: TreeNode, indent="", is_last=True) -> Iterator[Tuple[str, bool, TreeNode]]:
+    """
+    Pre-order traversal yielding (indent, is_last, node) as display draws them.
+    """
+    stack = [(node, indent, is_last)]
+    while stack:
+        current, indent, is_last = stack.pop()
+        if current is None:
+            continue
 
-    print(indent + line_start + str(node))
+        yield indent, is_last, current
 
-    indent += "    " if is_last else "│   "
+        child_indent = indent + ("    " if is_last else "│   ")
+        last = current.size - 1
+        for i in range(last, -1, -1):
+            stack.append((current.descendants[i], child_indent, i == last))
+
+
+def display_flat(tree: FlatTree, indent=""):
+    if tree.root == NO_NODE:
+        return
 
-    for i, descendant in enumerate(node.descendants, 1):
-        is_last = i == node.size
-        display(descendant, indent, is_last=is_last)
+    data, items, first_child, next_sibling = tree.data, tree.items, tree.first_child, tree.next_sibling
+    stack = [(tree.root, indent, True)]
+    while stack:
+        index, indent, is_last = stack.pop()
+        print(indent + ("└── " if is_last else "├── ") + str(data[items[index]]))
+
+        child_indent = indent + ("    " if is_last else "│   ")
+        children = []
+        child = first_child[index]
+        while child != NO_NODE:
+            children.append(child)
+            child = next_sibling[child]
+        for i in range(len(children) - 1, -1, -1):
+            stack.append((children[i], child_indent, i == len(children) - 1))
+
+
+def preorder(node: TreeNode) -> Iterator[TreeNode]:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.descendants))
+
+
+def postorder(node: TreeNode) -> Iterator[TreeNode]:
+    stack = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if expanded:
+            yield current
+            continue
+
+        stack.append((current, True))
+        stack.extend((descendant, False) for descendant in reversed(current.descendants))
+
+
+def height(node: TreeNode) -> int:
+    deepest = 0
+    stack = [(node, 1)]
+    while stack:
+        current, depth = stack.pop()
+        deepest = max(deepest, depth)
+        stack.extend((descendant, depth + 1) for descendant in current.descendants)
+    return deepest
+
+
+def height_flat(tree: FlatTree) -> int:
+    if tree.root == NO_NODE:
+        return 0
+
+    deepest = 0
+    first_child, next_sibling = tree.first_child, tree.next_sibling
+    stack = [(tree.root, 1)]
+    while stack:
+        index, depth = stack.pop()
+        deepest = max(deepest, depth)
+        child = first_child[index]
+        while child != NO_NODE:
+            stack.append((child, depth + 1))
+            child = next_sibling[child]
+    return deepest
 
 
 if __name__ == "__main__":
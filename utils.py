@@ -1,9 +1,17 @@
+from array import array
 from enum import Enum, EnumMeta
 from typing import Protocol
 
 
 class MetaEnum(EnumMeta):
     def __contains__(cls, item):
+        if isinstance(item, cls):
+            return True
+        try:
+            return item in cls._value2member_map_
+        except TypeError:
+            # unhashable, fall back to the enum's own lookup
+            pass
         try:
             cls(item)
         except ValueError:
@@ -30,3 +38,26 @@ class BaseEnum(Enum, metaclass=MetaEnum):
 class Str(Protocol):
     def __str__(self) -> str:
         pass
+
+
+SIGNED_TYPECODES = ('b', 'h', 'i', 'q')
+
+
+def narrow(values: array) -> array:
+    """
+    Copy of an integer array in the smallest signed typecode that holds all of
+    its values, for compact pickling.
+    """
+    if not values:
+        return array('b')
+
+    low, high = min(values), max(values)
+    for typecode in SIGNED_TYPECODES:
+        bound = 1 << (array(typecode).itemsize * 8 - 1)
+        if -bound <= low and high < bound:
+            return array(typecode, values)
+    return array(values.typecode, values)
+
+
+def widen(values: array, typecode: str = 'q') -> array:
+    return values if values.typecode == typecode else array(typecode, values)
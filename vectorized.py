@@ -0,0 +1,145 @@
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from scaner import Token, TokenType, Operators, is_paren
+from tree import TreeNode, postorder
+
+Columns = Mapping[str, np.ndarray]
+
+NUMPY_BINARY = {
+    Operators.PLUS: np.add,
+    Operators.MINUS: np.subtract,
+    Operators.MULTIPLY: np.multiply,
+    Operators.DIVIDE: np.true_divide,
+    Operators.LESS: np.less,
+    Operators.LESS_OR_EQUAL: np.less_equal,
+    Operators.GREATER: np.greater,
+    Operators.GREATER_OR_EQUAL: np.greater_equal,
+    Operators.EQUAL: np.equal,
+    Operators.NOT_EQUAL: np.not_equal,
+}
+
+NUMPY_UNARY = {
+    Operators.MINUS: np.negative,
+    Operators.NOT: np.logical_not,
+}
+
+# operand kinds of a compiled step
+CONSTANT = 0
+COLUMN = 1
+REGISTER = 2
+
+Operand = Tuple[int, Any]
+
+
+class BatchEvaluator:
+    """
+    Evaluates one parsed expression over columnar batches.
+
+    The tree is walked once into a list of ufunc steps over registers. Each
+    register is backed by a scratch array per dtype that is kept between
+    calls and written through `out=`, so intermediates do not allocate once
+    the batch size is stable. An evaluator is not safe to share between
+    threads.
+    """
+
+    def __init__(self, tree: TreeNode[Token]):
+        # (ufunc, operands, result register)
+        self.steps: List[Tuple[np.ufunc, Tuple[Operand, ...], int]] = []
+        self.registers = 0
+        self.columns: List[str] = []
+        self.result = self._compile(tree)
+        self._scratch: Dict[Tuple[int, np.dtype], np.ndarray] = {}
+        self._dtypes: Dict[Tuple[int, tuple], np.dtype] = {}
+
+    def _compile(self, tree: TreeNode[Token]) -> Operand:
+        results: List[Operand] = []
+        free: List[int] = []
+
+        for node in postorder(tree):
+            t = node.data
+
+            if not node.descendants:
+                if t.type is TokenType.IDENTIFIER:
+                    results.append((COLUMN, t.value))
+                    if t.value not in self.columns:
+                        self.columns.append(t.value)
+                elif t.type is TokenType.LITERAL:
+                    results.append((CONSTANT, t.value))
+                else:
+                    raise ValueError(f"Cannot evaluate token: {t}")
+                continue
+
+            if is_paren(t):
+                continue
+
+            table = NUMPY_UNARY if node.size == 1 else NUMPY_BINARY
+            if t.value not in table:
+                raise ValueError(f"Cannot evaluate operator: {t}")
+            ufunc = table[t.value]
+
+            operands = tuple(results[-node.size:])
+            del results[-node.size:]
+
+            if all(kind == CONSTANT for kind, _ in operands):
+                results.append((CONSTANT, ufunc(*(arg for _, arg in operands)).item()))
+                continue
+
+            # registers read by this step can be written by it: ufuncs are elementwise
+            free.extend(arg for kind, arg in operands if kind == REGISTER)
+            if free:
+                register = free.pop()
+            else:
+                register = self.registers
+                self.registers += 1
+
+            self.steps.append((ufunc, operands, register))
+            results.append((REGISTER, register))
+
+        return results.pop()
+
+    def _buffer(self, register: int, dtype: np.dtype, length: int) -> np.ndarray:
+        key = (register, dtype)
+        buffer = self._scratch.get(key)
+        if buffer is None or len(buffer) != length:
+            buffer = self._scratch[key] = np.empty(length, dtype=dtype)
+        return buffer
+
+    def _result_dtype(self, step: int, ufunc: np.ufunc, args: list) -> np.dtype:
+        signature = tuple(a.dtype if isinstance(a, np.ndarray) else type(a) for a in args)
+        dtype = self._dtypes.get((step, signature))
+        if dtype is None:
+            probe = (np.empty(0, a.dtype) if isinstance(a, np.ndarray) else a for a in args)
+            dtype = self._dtypes[(step, signature)] = ufunc(*probe).dtype
+        return dtype
+
+    def __call__(self, columns: Columns, out: Optional[np.ndarray] = None) -> np.ndarray:
+        kind, arg = self.result
+        length = len(columns[self.columns[0]]) if self.columns else (len(out) if out is not None else 1)
+
+        if kind != REGISTER:
+            value = arg if kind == CONSTANT else columns[arg]
+            if out is None:
+                return np.full(length, value) if kind == CONSTANT else np.array(value)
+            out[...] = value
+            return out
+
+        registers: Dict[int, np.ndarray] = {}
+        last = len(self.steps) - 1
+
+        for i, (ufunc, operands, register) in enumerate(self.steps):
+            args = [
+                arg if kind == CONSTANT else columns[arg] if kind == COLUMN else registers[arg]
+                for kind, arg in operands
+            ]
+
+            if i == last:
+                return ufunc(*args, out=out) if out is not None else ufunc(*args)
+
+            dtype = self._result_dtype(i, ufunc, args)
+            registers[register] = ufunc(*args, out=self._buffer(register, dtype, length))
+
+
+def evaluate_batch(tree: TreeNode[Token], columns: Columns, out: Optional[np.ndarray] = None) -> np.ndarray:
+    return BatchEvaluator(tree)(columns, out=out)